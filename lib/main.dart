@@ -4,6 +4,7 @@ import 'package:flutter_shop/screens/login_screen.dart';
 import 'package:flutter_shop/screens/register_screen.dart';
 import 'package:flutter_shop/screens/order_list_screen.dart';
 import 'package:flutter_shop/screens/order_detail_screen.dart';
+import 'package:flutter_shop/services/deep_link_service.dart';
 import 'package:go_router/go_router.dart';
 // import 'package:flutter_web_plugins/flutter_web_plugins.dart';
 
@@ -23,6 +24,8 @@ class MyApp extends StatelessWidget {
 
   final GoRouter _router = GoRouter(
     initialLocation: '/login',
+    // Deep link lirisflora://app/<route>?cart=... (xem DeepLinkService)
+    redirect: DeepLinkService().redirect,
     routes: [
       // Route chính với ShellRoute để giữ lại BottomNavigationBar
       ShellRoute(
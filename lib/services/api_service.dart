@@ -3,8 +3,12 @@ import 'package:flutter_secure_storage/flutter_secure_storage.dart';
 
 class ApiService {
   final Dio _dio = Dio();
-  final String baseUrl =
-      'https://express-lirisflora-api.onrender.com/api';
+  // Đổi backend khi build, ví dụ mock API của bộ test chạy qua adb reverse:
+  //   flutter build apk --debug --dart-define=API_URL=http://127.0.0.1:5000/api
+  final String baseUrl = const String.fromEnvironment(
+    'API_URL',
+    defaultValue: 'https://express-lirisflora-api.onrender.com/api',
+  );
   final FlutterSecureStorage _storage = FlutterSecureStorage();
 
   ApiService() {
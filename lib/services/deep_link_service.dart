@@ -0,0 +1,57 @@
+import 'package:flutter/material.dart';
+import 'package:go_router/go_router.dart';
+import '../services/cart_service.dart';
+import '../services/product_service.dart';
+
+// Deep link mở thẳng giỏ hàng / thanh toán với giỏ hàng cho trước, ví dụ:
+//   lirisflora://app/checkout?cart=White%20Rose%20Arrangement:3,Sunflower%20Bouquet:3
+// Mỗi phần tử của cart là "<id hoặc tên sản phẩm>:<số lượng>".
+class DeepLinkService {
+  static const String cartParameter = 'cart';
+  // Chỉ các route này mới nhận tham số cart
+  static const Set<String> cartRoutes = {'/cart', '/checkout'};
+
+  final CartService _cartService = CartService();
+  final ProductService _productService = ProductService();
+
+  // Dùng làm redirect của GoRouter: nạp giỏ hàng rồi bỏ tham số cart khỏi đường dẫn
+  Future<String?> redirect(BuildContext context, GoRouterState state) async {
+    final cart = state.uri.queryParameters[cartParameter];
+    if (cart == null || !cartRoutes.contains(state.uri.path)) {
+      return null;
+    }
+    await seedCart(parseCart(cart));
+    return state.uri.path;
+  }
+
+  // Thay giỏ hàng hiện tại bằng các sản phẩm trong deep link
+  Future<void> seedCart(Map<String, int> items) async {
+    final products = await _productService.fetchProducts();
+    _cartService.clearCart();
+    for (final entry in items.entries) {
+      final matches = products.where(
+        (product) => product.id == entry.key || product.name == entry.key,
+      );
+      if (matches.isEmpty) {
+        print('Deep link: không tìm thấy sản phẩm ${entry.key}');
+        continue;
+      }
+      _cartService.addToCart(matches.first, entry.value);
+    }
+    print('Deep link: đã nạp ${_cartService.getCartItemCount()} sản phẩm vào giỏ hàng');
+  }
+
+  static Map<String, int> parseCart(String value) {
+    final items = <String, int>{};
+    for (final part in value.split(',')) {
+      final separator = part.lastIndexOf(':');
+      final key = (separator > 0 ? part.substring(0, separator) : part).trim();
+      final quantity =
+          separator > 0 ? int.tryParse(part.substring(separator + 1)) ?? 1 : 1;
+      if (key.isNotEmpty && quantity > 0) {
+        items[key] = (items[key] ?? 0) + quantity;
+      }
+    }
+    return items;
+  }
+}
@@ -6,9 +6,35 @@ from appium.options.android import UiAutomator2Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, NoSuchDriverException
-from openpyxl import Workbook, load_workbook
-import subprocess
 import time
+from waits import settle
+from page_snapshot import PageSnapshot
+from element_cache import ElementCache
+from form_fill import FormFiller
+from scroller import Scroller
+from app_ready import APP_READY_TIMEOUT, AppReadiness
+from deep_link import CHECKOUT_CART, open_route
+from appium_session import APPIUM_URL
+from device_manager import device_pool
+from results_sink import ResultsSink, import_rows, write_rows_report
+from run_history import RunHistory
+from tracing import start_tracing, stop_tracing, traced_sleep
+from retry_policy import RetryPolicy
+from api_fixtures import seed
+from fake_api import start_mock_api, stop_mock_api
+from result_cache import ResultCache
+from artifacts import FailureCapture
+from harness_log import get_logger, start_logging, stop_logging
+from case_matrix import checkout_matrix
+
+log = get_logger("checkout")
+
+# Phần tử chỉ có trên màn hình danh sách sản phẩm
+PRODUCT_SCREEN_XPATH = "//android.widget.ImageView[contains(@content-desc, 'Arrangement') or contains(@content-desc, 'Bouquet')]"
+UDID = os.environ.get("APPIUM_UDID", "192.168.154.102:5555")
+# CHECKOUT_UI_PATH=1: tạo giỏ hàng qua giao diện như cũ (kiểm tra end-to-end),
+# mặc định mở thẳng trang checkout bằng deep link với giỏ hàng cho trước
+CHECKOUT_UI_PATH = os.environ.get("CHECKOUT_UI_PATH", "0") == "1"
 
 # Test data
 TEST_DATA = {
@@ -104,69 +130,109 @@ TEST_DATA = {
         "expected_error": None
     }
 }
+# CASE_MATRIX=2 (pairwise), 3, ...: thêm các case sinh từ miền giá trị của từng trường, giá trị hợp lệ lấy từ TC_CHECKOUT_07
+TEST_DATA.update(checkout_matrix(TEST_DATA["TC_CHECKOUT_07"]))
 
 # Đường dẫn file Excel
 output_dir = "output"
 file_path = os.path.join(output_dir, "test_results_checkout.xlsx")
-results = []
+RESULT_FIELDS = ["test_case", "description", "result", "status", "note"]
 
-# Tạo thư mục output nếu chưa có
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
+def open_sink():
+    """Log kết quả (output/test_results_SUITE.csv), lần đầu nhập lịch sử từ file Excel cũ"""
+    sink = ResultsSink(os.path.splitext(os.path.basename(file_path))[0], fields=RESULT_FIELDS, directory=output_dir,
+                       history=RunHistory(), suite="checkout", device=UDID)
+    sink.import_workbook(file_path, import_rows(RESULT_FIELDS))
+    return sink
 
-# Nếu file không tồn tại -> tạo mới
-if not os.path.exists(file_path):
-    wb = Workbook()
-    ws = wb.active
-    ws.append(["Test Case", "Description", "Result", "Status", "Note"])
-    wb.save(file_path)
+def build_report(sink=None, path=file_path):
+    """Dựng lại file Excel từ log: mỗi kết quả một dòng"""
+    return write_rows_report(sink or open_sink(), path,
+                             ["Test Case", "Description", "Result", "Status", "Note"], RESULT_FIELDS)
 
 class TestCheckoutAppium(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Khởi tạo kết nối Appium"""
-        print("🔗 Connecting to Appium...")
-        
-        # Kiểm tra thiết bị Android
-        try:
-            devices = subprocess.check_output("adb devices", shell=True).decode()
-            if "192.168.154.102:5555" not in devices:
-                raise Exception("Emulator-5554 not found. Please start the emulator.")
-        except subprocess.CalledProcessError:
-            raise Exception("Error running adb. Ensure Android SDK is installed and adb is in PATH.")
+        # Kết quả được ghi xuống log ngay sau mỗi case, không giữ trong bộ nhớ đến cuối
+        cls.sink = open_sink()
+        start_logging("checkout", cls.sink.run_id)
+        # Với RESULT_CACHE=1 / RERUN_FAILED=1 chỉ chạy case mới, đã đổi hoặc đang lỗi
+        cls.result_cache = ResultCache("checkout", __file__, UDID, cls.sink.history)
+        cls.cases = cls.result_cache.select(TEST_DATA)
+        if not cls.cases:
+            raise unittest.SkipTest("No test case needs to run")
+        cls.tracer = start_tracing("checkout", cls.sink.run_id)
+        cls.artifacts = FailureCapture("checkout", cls.sink.run_id, cls.sink.history, cls.tracer)
+        # Thiết bị lấy từ danh sách dùng chung; adb chỉ được gọi khi cache đã cũ
+        cls.device = device_pool().acquire(UDID)
+        log.info("📱 Using device %s", cls.device)
+        # Với API_FIXTURES=1 giỏ hàng dùng id sản phẩm thật và được kiểm tra tồn kho trước khi chạy
+        cls.mock_api = start_mock_api(UDID)
+        cls.api = seed()
+        cls.cart = cls.api.cart(CHECKOUT_CART) if cls.api is not None else CHECKOUT_CART
+        log.info("🔗 Connecting to Appium...")
 
         # Cấu hình Appium
         options = UiAutomator2Options()
         options.platform_name = "Android"
         options.device_name = "MyAndroidDevice"
-        options.udid = "192.168.154.102:5555"
+        options.udid = UDID
         options.app_package = "com.example.flutter_shop"
         options.app_activity = "com.example.flutter_shop.MainActivity"
         options.automation_name = "UiAutomator2"
         options.no_reset = True
         options.new_command_timeout = 300
+        # Logcat chỉ gồm log từ lúc tạo phiên để mốc frame đầu tiên là của lần mở app này
+        options.clear_device_logs_on_start = True
 
         # Thử kết nối với retry
         max_attempts = 3
         for attempt in range(max_attempts):
             try:
-                cls.driver = webdriver.Remote("http://localhost:4723", options=options)
+                since = time.perf_counter()
+                cls.driver = cls.tracer.instrument(webdriver.Remote(APPIUM_URL, options=options))
                 cls.wait = WebDriverWait(cls.driver, 60)
-                print("✅ Connected successfully!")
-                print("⏳ Waiting for 55 seconds before starting test...")
-                time.sleep(55)
+                cls.snapshot = PageSnapshot(cls.driver)
+                cls.cache = ElementCache(cls.driver, timeout=60, snapshot=cls.snapshot)
+                cls.filler = FormFiller(cls.driver, snapshot=cls.snapshot)
+                cls.policy = RetryPolicy(cls.driver)
+                cls.scroller = Scroller(cls.driver, snapshot=cls.snapshot, cache=cls.cache)
+                log.info("✅ Connected successfully!")
                 # Kiểm tra session còn hoạt động không
                 if not cls.driver.session_id:
                     raise Exception("Session ID is invalid")
-                cls.driver.current_activity
-                print("✅ Session is active")
-                print("🚀 Starting test execution...")
+                log.info("✅ Session is active")
                 break
             except (NoSuchDriverException, Exception) as e:
-                print(f"⚠️ Appium connection error (attempt {attempt + 1}/{max_attempts}): {str(e)}")
+                log.warning("⚠️ Appium connection error (attempt %s/%s): %s", attempt + 1, max_attempts, e)
+                # Đóng phiên của lần thử này trước khi mở phiên mới, không để lại phiên trên Appium
+                if getattr(cls, "driver", None):
+                    try:
+                        cls.driver.quit()
+                    except Exception:
+                        pass
+                    cls.driver = None
                 if attempt == max_attempts - 1:
+                    device_pool().report_failure(UDID, str(e))
                     raise Exception("Failed to connect to Appium after multiple attempts.")
-                time.sleep(5)
+                # Thiết bị đã mất thì thử kết nối lại cũng vô ích
+                problem = device_pool().check(UDID, force=True).problem()
+                if problem:
+                    raise Exception(f"Device became unavailable: {problem}")
+                traced_sleep(5, "connect retry")
+
+        # Chờ app sẵn sàng ngoài vòng retry: app chậm không phải lỗi kết nối, mở phiên mới cũng không nhanh hơn
+        log.info("⏳ Waiting up to %.0fs for the product screen...", APP_READY_TIMEOUT)
+        cls.readiness = AppReadiness(cls.driver, PRODUCT_SCREEN_XPATH)
+        try:
+            cls.readiness.wait(since)
+        except TimeoutException:
+            # setUpClass lỗi thì tearDownClass không chạy: tự đóng phiên
+            cls.driver.quit()
+            raise
+        cls.readiness.print_summary()
+        log.info("🚀 Starting test execution...")
 
     @classmethod
     def tearDownClass(cls):
@@ -174,95 +240,85 @@ class TestCheckoutAppium(unittest.TestCase):
         try:
             if hasattr(cls, 'driver') and cls.driver:
                 cls.driver.quit()
-                print("🔴 Disconnected!")
+                log.info("🔴 Disconnected!")
+                cls.cache.print_stats()
+                cls.policy.print_stats()
+                cls.scroller.print_stats()
+                cls.policy.save(cls.sink.history, cls.sink.run_id, "checkout")
+                cls.readiness.save(cls.sink.history, cls.sink.run_id, "checkout", UDID)
         except Exception as e:
-            print(f"⚠️ Error during driver quit: {str(e)}")
-        wb = load_workbook(file_path)
-        ws = wb.active
-        for result in results:
-            ws.append(result)
-        wb.save(file_path)
-        print(f"📝 Results saved to {file_path}")
-
-    def find_element_with_retry(self, by, value, retries=5, wait_time=15):
-        """Tìm phần tử với cơ chế thử lại"""
-        for attempt in range(retries):
-            try:
-                element = self.wait.until(EC.element_to_be_clickable((by, value)))
-                print(f"🔍 Found element: {value}")
-                is_displayed = element.is_displayed()
-                is_enabled = element.is_enabled()
-                print(f"ℹ️ Element state - Displayed: {is_displayed}, Enabled: {is_enabled}")
-                return element
-            except TimeoutException:
-                print(f"⚠️ Attempt {attempt + 1}/{retries}: Could not find element {value}")
-                time.sleep(2)
-        raise NoSuchElementException(f"Could not find element {value} after {retries} attempts")
-
-    def slow_swipe_up(self):
-        """Thực hiện thao tác vuốt lên chậm để cuộn trang chính xác"""
-        size = self.driver.get_window_size()
-        start_x = size["width"] * 0.5
-        start_y = size["height"] * 0.7
-        end_y = size["height"] * 0.4
-        self.driver.swipe(start_x, start_y, start_x, end_y, 1000)
-        print("📜 Slow swiped up to scroll page")
-        time.sleep(1.5)
+            log.warning("⚠️ Error during driver quit: %s", e)
+        cls.artifacts.close()
+        cls.tracer.print_summary(cls.tracer.save(cls.sink.history))
+        stop_tracing()
+        build_report(cls.sink)
+        log.info("📝 Results saved to %s", file_path)
+        if cls.api is not None:
+            cls.api.close()
+        stop_mock_api()
+        device_pool().release(UDID)
+        stop_logging()
+
+    def find_element_with_retry(self, by, value, retries=5, wait_time=None):
+        """Tìm phần tử trong deadline wait_time giây (mặc định RETRY_STEP_TIMEOUT), tối đa retries lần thử"""
+        start = time.perf_counter()
+        try:
+            element = self.policy.find(self.cache, by, value, EC.element_to_be_clickable,
+                                       timeout=wait_time, max_attempts=retries)
+        except TimeoutException as e:
+            log.warning("⚠️ Could not find element %s: %s", value, e.msg,
+                        extra={"step": "find", "duration": time.perf_counter() - start})
+            raise NoSuchElementException(f"Could not find element {value}: {e.msg}") from e
+        log.debug("🔍 Found element: %s", value, extra={"step": "find", "duration": time.perf_counter() - start})
+        return element
 
     def scroll_to_top(self):
-        """Cuộn trang checkout về đầu trang"""
-        size = self.driver.get_window_size()
-        start_x = size["width"] * 0.5
-        start_y = size["height"] * 0.4
-        end_y = size["height"] * 0.7
-        self.driver.swipe(start_x, start_y, start_x, end_y, 1000)
-        print("📜 Scrolled to top of checkout page")
-        time.sleep(1.5)
+        """Cuộn trang checkout về đầu trang (không cuộn nếu đã ở đầu trang)"""
+        if self.scroller.offset != 0:
+            self.scroller.scroll_to_top()
+            log.debug("📜 Scrolled to top of checkout page", extra={"step": "scroll"})
+            settle(self.driver)
 
     def scroll_to_element(self, xpath):
-        """Cuộn trang đến phần tử được chỉ định bởi XPath sử dụng UiAutomator hoặc swipe"""
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            try:
-                element = self.driver.find_element(AppiumBy.XPATH, xpath)
-                if element.is_displayed():
-                    print(f"📜 Element already visible: {xpath}")
-                    return
-                content_desc = element.get_attribute("content-desc") or element.get_attribute("text") or ""
-                if content_desc:
-                    self.driver.find_element(AppiumBy.ANDROID_UIAUTOMATOR,
-                        f'new UiSelector().descriptionContains("{content_desc}")'
-                    )
-                    print(f"📜 Scrolled to element: {xpath} (content-desc: {content_desc})")
-                    time.sleep(1.5)
-                    return
-                else:
-                    print(f"⚠️ Element {xpath} has no content-desc or text, attempting slow swipe")
-                    self.slow_swipe_up()
-            except NoSuchElementException:
-                print(f"⚠️ Attempt {attempt + 1}/{max_attempts}: Could not find element {xpath}, attempting slow swipe")
-                self.slow_swipe_up()
-            except ValueError as e:
-                print(f"⚠️ Scroll error: {str(e)}, attempting slow swipe")
-                self.slow_swipe_up()
-        raise NoSuchElementException(f"Could not scroll to element {xpath} after {max_attempts} attempts")
+        """Cuộn trang đến phần tử được chỉ định bởi XPath bằng một lệnh cuộn trên thiết bị"""
+        how = self.scroller.scroll_into_view(xpath)
+        if how == "in view":
+            log.debug("📜 Element already visible: %s", xpath, extra={"step": "scroll"})
+            return
+        log.debug("📜 Scrolled to element: %s (%s)", xpath, how, extra={"step": "scroll"})
+        settle(self.driver)
 
     def return_to_checkout_page(self):
         """Quay lại trang checkout bằng cách nhấn nút Back hoặc điều hướng lại từ giỏ hàng"""
+        if not CHECKOUT_UI_PATH:
+            # Trang checkout mở bằng deep link không có giỏ hàng phía sau để Back về,
+            # mở lại deep link (giỏ hàng được nạp lại như cũ)
+            if self.driver.is_keyboard_shown():
+                self.driver.hide_keyboard()
+            open_route(self.driver, "/checkout", self.cart)
+            self.cache.screen_changed()
+            self.policy.until(EC.presence_of_element_located((
+                AppiumBy.XPATH, "//android.widget.ScrollView//android.widget.EditText"
+            )))
+            self.scroller.opened("checkout")
+            log.debug("✅ Returned to checkout page")
+            self.scroll_to_top()
+            return
         try:
             # Thử nhấn Back để quay lại trang checkout
-            self.driver.back()
-            time.sleep(1)
-            self.wait.until(EC.presence_of_element_located((
+            self.cache.back()
+            self.policy.until(EC.presence_of_element_located((
                 AppiumBy.XPATH, "//android.widget.ScrollView//android.widget.EditText"
             )))
-            print("✅ Returned to checkout page")
+            # Trang checkout cũ giữ nguyên vị trí cuộn trước đó
+            self.scroller.opened("checkout", offset=None)
+            log.debug("✅ Returned to checkout page")
             self.scroll_to_top()  # Cuộn về đầu trang sau khi quay lại
         except TimeoutException:
-            print("⚠️ Could not return to checkout page, navigating from cart")
+            log.warning("⚠️ Could not return to checkout page, navigating from cart")
             # Quay lại giỏ hàng
-            self.driver.back()
-            time.sleep(1)
+            self.cache.back()
+            settle(self.driver)
             # Tìm và nhấn nút Checkout
             self.scroll_to_element("//android.widget.Button[@content-desc='Checkout']")
             checkout_button = self.find_element_with_retry(
@@ -272,93 +328,109 @@ class TestCheckoutAppium(unittest.TestCase):
                 wait_time=20
             )
             checkout_button.click()
-            time.sleep(2)
-            self.wait.until(EC.presence_of_element_located((
+            self.policy.until(EC.presence_of_element_located((
                 AppiumBy.XPATH, "//android.widget.ScrollView//android.widget.EditText"
             )))
-            print("✅ Returned to checkout page")
+            self.scroller.opened("checkout")
+            log.debug("✅ Returned to checkout page")
             self.scroll_to_top()  # Cuộn về đầu trang sau khi quay lại
 
+    def open_checkout_via_ui(self):
+        """Tạo giỏ hàng qua giao diện (thêm, tăng số lượng, xóa sản phẩm) rồi vào trang checkout"""
+        # Thêm sản phẩm 1, 2, 3, 4 vào giỏ hàng
+        products = [
+            ("White Rose Arrangement", "//android.widget.ImageView[contains(@content-desc, 'White Rose Arrangement')]/android.widget.Button"),
+            ("Sunflower Bouquet", "//android.widget.ImageView[contains(@content-desc, 'Sunflower Bouquet')]/android.widget.Button"),
+            ("White Lily Bouquet", "//android.widget.ImageView[contains(@content-desc, 'White Lily Bouquet')]/android.widget.Button"),
+            ("Pink Tulip Bouquet", "//android.widget.ImageView[contains(@content-desc, 'Pink Tulip Bouquet')]/android.widget.Button")
+        ]
+        for product_name, product_xpath in products:
+            button = self.find_element_with_retry(AppiumBy.XPATH, product_xpath)
+            button.click()
+            log.info("🛒 Added %s to cart", product_name)
+            settle(self.driver)
+
+        # Vào giỏ hàng
+        cart_button = self.find_element_with_retry(
+            AppiumBy.XPATH,
+            "//android.widget.FrameLayout[@resource-id='android:id/content']//android.widget.Button"
+        )
+        cart_button.click()
+        log.info("🛍️ Navigated to cart")
+        settle(self.driver)
+        self.scroller.opened("cart")
+
+        # Tăng số lượng sản phẩm 1 và 2 lên 3 (nhấn nút tăng 2 lần mỗi sản phẩm)
+        for product, xpath in [
+            ("White Rose Arrangement", "//android.widget.ImageView[contains(@content-desc, 'White Rose Arrangement')]/android.view.View[2]"),
+            ("Sunflower Bouquet", "//android.widget.ImageView[contains(@content-desc, 'Sunflower Bouquet')]/android.view.View[2]")
+        ]:
+            for _ in range(2):
+                increase_button = self.find_element_with_retry(AppiumBy.XPATH, xpath)
+                increase_button.click()
+                log.info("➕ Increased quantity for %s", product)
+                settle(self.driver)
+
+        # Xóa sản phẩm thứ 4
+        remove_button = self.find_element_with_retry(
+            AppiumBy.XPATH,
+            "//android.widget.ImageView[contains(@content-desc, 'Pink Tulip Bouquet')]/android.widget.Button"
+        )
+        remove_button.click()
+        log.info("🗑️ Removed Pink Tulip Bouquet from cart")
+        settle(self.driver)
+
+        # Cuộn đến nút Checkout
+        self.scroll_to_element("//android.widget.Button[@content-desc='Checkout']")
+        checkout_button = self.find_element_with_retry(
+            AppiumBy.XPATH,
+            "//android.widget.Button[@content-desc='Checkout']",
+            retries=5,
+            wait_time=20
+        )
+        checkout_button.click()
+        log.info("🛵 Proceeded to checkout")
+
+    def open_checkout(self):
+        """Tạo giỏ hàng và mở màn hình checkout"""
+        if CHECKOUT_UI_PATH:
+            self.open_checkout_via_ui()
+        else:
+            # Mở thẳng màn hình thanh toán với giỏ hàng giống luồng giao diện
+            open_route(self.driver, "/checkout", self.cart)
+            self.cache.screen_changed()
+
+        # Kiểm tra xem đã ở màn hình checkout chưa
+        try:
+            self.wait.until(EC.presence_of_element_located((
+                AppiumBy.XPATH, "//android.widget.ScrollView//android.widget.EditText"
+            )))
+            self.scroller.opened("checkout")
+            log.info("✅ Checkout screen loaded")
+        except TimeoutException:
+            raise Exception("Checkout screen did not load")
+
     def test_checkout_flow(self):
         """Test cases for checkout with failure and success scenarios after cart actions"""
-        print("\n📋 Starting cart actions for all test cases...")
+        log.info("📋 Starting cart actions for all test cases...")
 
         try:
             # Kiểm tra xem ứng dụng đã ở màn hình chính chưa
             try:
-                self.wait.until(EC.presence_of_element_located((
-                    AppiumBy.XPATH, "//android.widget.ImageView[contains(@content-desc, 'Arrangement') or contains(@content-desc, 'Bouquet')]"
-                )))
-                print("✅ App is on the main product screen")
+                self.wait.until(EC.presence_of_element_located((AppiumBy.XPATH, PRODUCT_SCREEN_XPATH)))
+                log.info("✅ App is on the main product screen")
             except TimeoutException:
                 raise Exception("App did not load the main product screen")
 
-            # Thêm sản phẩm 1, 2, 3, 4 vào giỏ hàng
-            products = [
-                ("White Rose Arrangement", "//android.widget.ImageView[contains(@content-desc, 'White Rose Arrangement')]/android.widget.Button"),
-                ("Sunflower Bouquet", "//android.widget.ImageView[contains(@content-desc, 'Sunflower Bouquet')]/android.widget.Button"),
-                ("White Lily Bouquet", "//android.widget.ImageView[contains(@content-desc, 'White Lily Bouquet')]/android.widget.Button"),
-                ("Pink Tulip Bouquet", "//android.widget.ImageView[contains(@content-desc, 'Pink Tulip Bouquet')]/android.widget.Button")
-            ]
-            for product_name, product_xpath in products:
-                button = self.find_element_with_retry(AppiumBy.XPATH, product_xpath)
-                button.click()
-                print(f"🛒 Added {product_name} to cart")
-                time.sleep(2)
-
-            # Vào giỏ hàng
-            cart_button = self.find_element_with_retry(
-                AppiumBy.XPATH,
-                "//android.widget.FrameLayout[@resource-id='android:id/content']//android.widget.Button"
-            )
-            cart_button.click()
-            print("🛍️ Navigated to cart")
-            time.sleep(2)
-
-            # Tăng số lượng sản phẩm 1 và 2 lên 3 (nhấn nút tăng 2 lần mỗi sản phẩm)
-            for product, xpath in [
-                ("White Rose Arrangement", "//android.widget.ImageView[contains(@content-desc, 'White Rose Arrangement')]/android.view.View[2]"),
-                ("Sunflower Bouquet", "//android.widget.ImageView[contains(@content-desc, 'Sunflower Bouquet')]/android.view.View[2]")
-            ]:
-                for _ in range(2):
-                    increase_button = self.find_element_with_retry(AppiumBy.XPATH, xpath)
-                    increase_button.click()
-                    print(f"➕ Increased quantity for {product}")
-                    time.sleep(1)
-
-            # Xóa sản phẩm thứ 4
-            remove_button = self.find_element_with_retry(
-                AppiumBy.XPATH,
-                "//android.widget.ImageView[contains(@content-desc, 'Pink Tulip Bouquet')]/android.widget.Button"
-            )
-            remove_button.click()
-            print("🗑️ Removed Pink Tulip Bouquet from cart")
-            time.sleep(2)
-
-            # Cuộn đến nút Checkout
-            self.scroll_to_element("//android.widget.Button[@content-desc='Checkout']")
-            checkout_button = self.find_element_with_retry(
-                AppiumBy.XPATH,
-                "//android.widget.Button[@content-desc='Checkout']",
-                retries=5,
-                wait_time=20
-            )
-            checkout_button.click()
-            print("🛵 Proceeded to checkout")
-            time.sleep(2)
-
-            # Kiểm tra xem đã ở màn hình checkout chưa
-            try:
-                self.wait.until(EC.presence_of_element_located((
-                    AppiumBy.XPATH, "//android.widget.ScrollView//android.widget.EditText"
-                )))
-                print("✅ Checkout screen loaded")
-            except TimeoutException:
-                raise Exception("Checkout screen did not load")
+            self.open_checkout()
 
             # Thực hiện các test case trên trang checkout
-            for test_case, data in TEST_DATA.items():
-                print(f"\n📋 Running test {test_case}: {data['description']}")
+            for test_case in self.cases:
+                data = TEST_DATA[test_case]
+                log.info("📋 Running test %s: %s", test_case, data['description'], extra={"step": "case"})
+                start = time.perf_counter()
+                self.tracer.begin_case(test_case)
+                self.policy.begin_case(test_case)
 
                 try:
                     # Nhập dữ liệu vào các trường, cuộn đến từng trường
@@ -372,21 +444,24 @@ class TestCheckoutAppium(unittest.TestCase):
                         ("Zip Code", "//android.widget.ScrollView/android.widget.EditText[8]", data["zip_code"]),
                         ("Note", "//android.widget.ScrollView/android.widget.EditText[9]", data["note"])
                     ]
-                    for field_name, xpath, value in fields:
+                    # Các trường đã có trên màn hình được điền và kiểm tra trong một lượt,
+                    # chỉ trường chưa hiển thị mới phải cuộn tới rồi điền riêng
+                    self.snapshot.invalidate()
+                    values = {xpath: value for _, xpath, value in fields}
+                    filled = self.filler.fill(values, verify=True, required=False)
+                    mismatches = dict(filled.mismatches)
+                    for xpath in filled.missing:
                         self.scroll_to_element(xpath)
-                        field = self.find_element_with_retry(AppiumBy.XPATH, xpath, wait_time=20, retries=5)
-                        field.click()
-                        field.clear()
-                        print(f"🧹 Cleared {field_name}")
-                        if value:  # Chỉ nhập nếu giá trị không rỗng
-                            field.send_keys(value)
-                            entered_value = field.get_attribute("text")
-                            if entered_value != value:
-                                print(f"⚠️ Warning: Entered {field_name} value '{entered_value}' does not match expected '{value}'")
-                            print(f"✍️ Entered {field_name}: {value}")
+                        self.find_element_with_retry(AppiumBy.XPATH, xpath, wait_time=20, retries=5)
+                        mismatches.update(self.filler.fill({xpath: values[xpath]}, verify=True).mismatches)
+                    for field_name, xpath, value in fields:
+                        if value:  # Trường để trống chỉ được xóa
+                            if xpath in mismatches:
+                                log.warning("⚠️ Warning: Entered %s value '%s' does not match expected '%s'",
+                                            field_name, mismatches[xpath], value, extra={"step": "fill"})
+                            log.debug("✍️ Entered %s: %s", field_name, value, extra={"step": "fill"})
                         else:
-                            print(f"✍️ Skipped {field_name}: Left empty")
-                        time.sleep(1.5)
+                            log.debug("✍️ Skipped %s: Left empty", field_name, extra={"step": "fill"})
 
                     # Cuộn đến nút Đặt Hàng và nhấn chỉ một lần
                     self.scroll_to_element("//android.widget.Button[@content-desc='Đặt Hàng']")
@@ -397,68 +472,83 @@ class TestCheckoutAppium(unittest.TestCase):
                         wait_time=15
                     )
                     place_order_button.click()
-                    print("📦 Placed order")
-                    time.sleep(1)
+                    log.info("📦 Placed order", extra={"step": "order"})
 
                     # Kiểm tra kết quả
                     if data["expected"] == "order_success":
                         try:
-                            success_message = self.wait.until(EC.visibility_of_element_located((
+                            success_message = self.policy.until(EC.visibility_of_element_located((
                                 AppiumBy.XPATH,
                                 "//android.widget.TextView[contains(@text, 'Order placed successfully')]"
                             )))
                             result = True
                             status = "Pass"
                             note = "Order placed successfully"
-                            print("✅ Test PASS: Order placed successfully")
+                            log.info("✅ Test PASS: Order placed successfully")
                         except TimeoutException:
                             result = False
                             status = "Fail"
                             note = "Failed to place order or success message not found"
-                            print("❌ Test FAIL: Failed to place order")
+                            log.warning("❌ Test FAIL: Failed to place order")
                     else:
                         try:
-                            error_message = self.wait.until(EC.visibility_of_element_located((
+                            error_message = self.policy.until(EC.visibility_of_element_located((
                                 AppiumBy.XPATH,
                                 f"//android.widget.TextView[contains(@text, '{data['expected_error']}')]"
                             )))
                             result = True
                             status = "Pass"
                             note = f"Expected failure: {data['expected_error']}"
-                            print(f"✅ Test PASS: Expected failure - {data['expected_error']}")
+                            log.info("✅ Test PASS: Expected failure - %s", data['expected_error'])
                         except TimeoutException:
                             result = False
                             status = "Fail"
                             note = f"Expected error '{data['expected_error']}' not found"
-                            print(f"❌ Test FAIL: Expected error not found")
+                            log.warning("❌ Test FAIL: Expected error not found")
 
+                    # Chụp bằng chứng trước khi rời màn hình hỏng; nén và ghi chạy nền
+                    if status == "Fail":
+                        self.artifacts.capture(self.driver, test_case, note)
                     # Quay lại trang checkout và cuộn về đầu trang cho test case tiếp theo (trừ test case thành công)
-                    if test_case != "TC_CHECKOUT_07":
+                    if data["expected"] != "order_success":
                         self.return_to_checkout_page()
+                    elif status == "Pass" and test_case != self.cases[-1]:
+                        # Đặt hàng xong thì giỏ hàng trống và app về trang chủ: tạo lại giỏ hàng cho case sau
+                        self.open_checkout()
 
                 except Exception as e:
                     result = False
                     status = "Fail"
                     note = f"Error: {str(e)}"
-                    print(f"❌ Test FAIL: {note}")
+                    log.warning("❌ Test FAIL: %s", note)
+                    # Việc dọn dẹp không tính vào deadline của case vừa hỏng
+                    self.policy.end_case()
+                    self.artifacts.capture(self.driver, test_case, note)
                     # Thử quay lại trang checkout nếu có lỗi (trừ test case thành công)
-                    if test_case != "TC_CHECKOUT_07":
+                    if data["expected"] != "order_success":
                         try:
                             self.return_to_checkout_page()
                         except Exception as nav_error:
                             note += f"; Failed to return to checkout: {str(nav_error)}"
-                            print(f"⚠️ Failed to return to checkout: {str(nav_error)}")
+                            log.warning("⚠️ Failed to return to checkout: %s", nav_error)
 
-                results.append([test_case, data["description"], result, status, note])
-                print(f"📊 Recorded result for {test_case}: {status}")
+                self.tracer.end_case()
+                self.policy.end_case()
+                duration = time.perf_counter() - start
+                self.sink.record(test_case, status, note, duration=duration,
+                                 description=data["description"], result=result)
+                self.result_cache.record(self.sink.run_id, test_case, status)
+                log.info("📊 Recorded result for %s: %s", test_case, status,
+                         extra={"test_id": test_case, "step": "result", "duration": duration})
 
         except Exception as e:
             # Ghi lại lỗi nếu quá trình chuẩn bị giỏ hàng thất bại
             result = False
             status = "Fail"
             note = f"Error in cart setup: {str(e)}"
-            print(f"❌ Test FAIL: {note}")
-            results.append(["SETUP", "Cart setup", result, status, note])
+            log.warning("❌ Test FAIL: %s", note)
+            self.artifacts.capture(self.driver, "SETUP", note)
+            self.sink.record("SETUP", status, note, description="Cart setup", result=result)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""Tạo dữ liệu test (tài khoản, giỏ hàng) qua REST API thay vì qua giao diện.
+
+    api = seed(present=[Account("Test User", "existing@example.com", "Pass@123")],
+               absent=[Account("Levantuan", "levantuan123@gmail.com", "Levantuan123@")])
+    ...
+    api.close()   # xóa các tài khoản đã tạo / suite sẽ tạo
+
+Dùng cùng endpoint với lib/services/auth_service.dart (/v1/register,
+/v1/login, /v1/current_user) và product_service.dart (/product). Mọi request
+đi qua một urllib3.PoolManager giữ kết nối keep-alive; tạo/xóa nhiều tài
+khoản chạy song song trên pool đó. Giỏ hàng của app chỉ nằm trên máy
+(CartService), nên "đổ giỏ hàng" là đổi tên sản phẩm sang id, kiểm tra
+tồn kho rồi mở bằng deep link (deep_link.open_route).
+
+API_FIXTURES=1 bật bước seed trong các suite (mặc định bật khi MOCK_API=1),
+API_URL trỏ sang backend khác (fake_api.start_mock_api tự đặt biến này).
+
+Xóa tài khoản dùng DELETE /v1/user/<id>: hiện chỉ fake_api có endpoint này,
+app và backend thật chưa có. Với backend thật (404/405) việc xóa được bỏ qua
+kèm một cảnh báo, nên tài khoản suite đăng ký qua giao diện (TC_REGISTER_12)
+vẫn còn và lần chạy sau sẽ gặp "User already exists!" cho tới khi backend có
+endpoint xóa.
+"""
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import urllib3
+from harness_log import get_logger
+
+log = get_logger("api_fixtures")
+
+DEFAULT_API_URL = "https://express-lirisflora-api.onrender.com/api"
+API_FIXTURES = os.environ.get("API_FIXTURES", os.environ.get("MOCK_API", "0")) == "1"
+# Số kết nối giữ trong pool = số request chạy song song khi tạo/xóa hàng loạt
+API_WORKERS = int(os.environ.get("API_WORKERS", "4"))
+API_TIMEOUT = float(os.environ.get("API_TIMEOUT", "60"))
+
+Account = namedtuple("Account", ["name", "email", "password"])
+
+
+def api_url():
+    """Backend hiện tại; đọc lại mỗi lần vì mock API có thể được bật sau khi import"""
+    return os.environ.get("API_URL", DEFAULT_API_URL)
+
+
+class ApiFixtureError(Exception):
+    """Backend trả về lỗi khi tạo dữ liệu test"""
+
+
+class ApiFixtures:
+    """Client REST cho bước chuẩn bị dữ liệu, nhớ những gì đã tạo để dọn dẹp"""
+
+    def __init__(self, base_url=None, workers=API_WORKERS, timeout=API_TIMEOUT):
+        self.base_url = (base_url or api_url()).rstrip("/")
+        self.workers = workers
+        # Thử lại lỗi kết nối, và lỗi 5xx tạm thời chỉ với GET/DELETE (POST đăng ký không idempotent)
+        retries = urllib3.Retry(connect=2, read=0, status=2, redirect=0, backoff_factor=0.5,
+                                status_forcelist=(502, 503, 504), raise_on_status=False)
+        self.http = urllib3.PoolManager(maxsize=workers, block=True, timeout=urllib3.Timeout(timeout),
+                                        retries=retries)
+        self.tokens = {}
+        self.owned = {}
+        self.delete_supported = True
+        self._products = None
+
+    def request(self, method, endpoint, body=None, token=None):
+        """Gửi một request, trả về (status, dữ liệu JSON hoặc text)"""
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        response = self.http.request(method, self.base_url + endpoint, headers=headers,
+                                     body=json.dumps(body).encode("utf-8") if body is not None else None)
+        text = response.data.decode("utf-8")
+        try:
+            return response.status, json.loads(text) if text else None
+        except ValueError:
+            return response.status, text
+
+    def register(self, account):
+        """Đăng ký tài khoản, trả về False nếu email đã tồn tại"""
+        status, data = self.request("POST", "/v1/register", {
+            "name": account.name, "email": account.email,
+            "password": account.password, "confirmPassword": account.password,
+        })
+        if status == 201:
+            return True
+        if status == 400 and "exist" in json.dumps(data).lower():
+            return False
+        raise ApiFixtureError(f"Register {account.email} failed: {status} {data}")
+
+    def login(self, email, password):
+        """Đăng nhập, trả về access token (None nếu sai email/mật khẩu)"""
+        status, data = self.request("POST", "/v1/login", {"email": email, "password": password})
+        if status == 200 and isinstance(data, dict) and data.get("accessToken"):
+            self.tokens[email] = data["accessToken"]
+            return data["accessToken"]
+        if status in (400, 401, 404):
+            return None
+        raise ApiFixtureError(f"Login {email} failed: {status} {data}")
+
+    def current_user(self, token):
+        status, data = self.request("GET", "/v1/current_user", token=token)
+        if status != 200 or not isinstance(data, dict):
+            raise ApiFixtureError(f"current_user failed: {status} {data}")
+        return data.get("user", data)
+
+    def ensure_user(self, account):
+        """Tạo tài khoản nếu chưa có và kiểm tra đăng nhập được bằng mật khẩu của nó"""
+        created = self.register(account)
+        if created:
+            self.owned[account.email] = account
+        if self.login(account.email, account.password) is None:
+            raise ApiFixtureError(f"Account {account.email} exists with a different password")
+        return created
+
+    def delete_user(self, account):
+        """Xóa tài khoản (đăng nhập bằng chính nó), trả về False nếu không tồn tại hoặc backend không hỗ trợ"""
+        if not self.delete_supported:
+            return False
+        token = self.tokens.get(account.email) or self.login(account.email, account.password)
+        if token is None:
+            return False
+        user = self.current_user(token)
+        status, data = self.request("DELETE", f"/v1/user/{user['_id']}", token=token)
+        if status in (404, 405):
+            # Backend chưa có endpoint xóa tài khoản: bỏ qua dọn dẹp thay vì làm hỏng cả suite
+            if self.delete_supported:
+                self.delete_supported = False
+                log.warning("⚠️ %s has no DELETE /v1/user endpoint (%s), test accounts are not removed",
+                            self.base_url, status)
+            return False
+        if status not in (200, 204):
+            raise ApiFixtureError(f"Delete {account.email} failed: {status} {data}")
+        self.tokens.pop(account.email, None)
+        self.owned.pop(account.email, None)
+        return True
+
+    def _each(self, function, accounts):
+        accounts = list(accounts)
+        if len(accounts) <= 1:
+            return [function(account) for account in accounts]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(function, accounts))
+
+    def ensure_users(self, accounts):
+        """Tạo hàng loạt tài khoản song song, trả về số tài khoản mới"""
+        return sum(self._each(self.ensure_user, accounts))
+
+    def delete_users(self, accounts):
+        """Xóa hàng loạt tài khoản song song, trả về số tài khoản đã xóa"""
+        return sum(self._each(self.delete_user, accounts))
+
+    def products(self):
+        """Danh sách sản phẩm (GET /product), chỉ tải một lần"""
+        if self._products is None:
+            status, data = self.request("GET", "/product")
+            if status != 200 or not isinstance(data, dict):
+                raise ApiFixtureError(f"Fetching products failed: {status} {data}")
+            self._products = data.get("data", [])
+        return self._products
+
+    def cart(self, items):
+        """Đổi [(tên hoặc id sản phẩm, số lượng)] sang [(id, số lượng)], kiểm tra sản phẩm còn đủ hàng"""
+        by_key = {}
+        for product in self.products():
+            by_key[product["_id"]] = by_key[product["name"]] = product
+        cart = []
+        for key, quantity in items:
+            product = by_key.get(key)
+            if product is None:
+                raise ApiFixtureError(f"Product '{key}' not found")
+            if product.get("stock") is not None and product["stock"] < quantity:
+                raise ApiFixtureError(f"Product '{key}' has only {product['stock']} in stock")
+            cart.append((product["_id"], quantity))
+        return cart
+
+    def own(self, accounts):
+        """Đánh dấu tài khoản sẽ được tạo trong lúc chạy (qua giao diện) để close() xóa"""
+        for account in accounts:
+            self.owned[account.email] = account
+
+    def cleanup(self):
+        """Xóa mọi tài khoản đã tạo hoặc đã đánh dấu, trả về số tài khoản đã xóa"""
+        return self.delete_users(list(self.owned.values()))
+
+    def close(self):
+        start = time.perf_counter()
+        deleted = self.cleanup()
+        self.http.clear()
+        log.info("🧽 API cleanup: deleted %s account(s) in %.2fs", deleted, time.perf_counter() - start)
+
+
+def seed(present=(), absent=()):
+    """Bước chuẩn bị của suite: tạo present, xóa absent (suite sẽ tự tạo lại qua giao diện).
+
+    Trả về ApiFixtures (gọi close() khi kết thúc) hoặc None nếu API_FIXTURES tắt.
+    """
+    if not API_FIXTURES:
+        return None
+    api = ApiFixtures()
+    start = time.perf_counter()
+    deleted = api.delete_users(absent)
+    created = api.ensure_users(present)
+    api.own(absent)
+    log.info("🌱 API fixtures: %s account(s) created, %s already present, %s stale account(s) removed in %.2fs (%s)",
+             created, len(present) - created, deleted, time.perf_counter() - start, api.base_url)
+    return api
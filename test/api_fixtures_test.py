@@ -0,0 +1,123 @@
+"""Kiểm tra api_fixtures trên fake_api (không cần backend thật).
+
+    python -m unittest api_fixtures_test
+"""
+import random
+import time
+import unittest
+from api_fixtures import Account, ApiFixtureError, ApiFixtures
+from deep_link import CHECKOUT_CART
+from fake_api import FakeApiServer, LatencyModel
+
+ACCOUNTS = [Account(f"User {i}", f"user{i}@example.com", "Pass@123") for i in range(8)]
+
+
+class TestApiFixtures(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeApiServer(port=0).start()
+        self.api = ApiFixtures(self.server.url)
+
+    def tearDown(self):
+        self.api.http.clear()
+        self.server.stop()
+
+    def test_ensure_users_is_idempotent(self):
+        self.assertEqual(self.api.ensure_users(ACCOUNTS), len(ACCOUNTS))
+        self.assertEqual(ApiFixtures(self.server.url).ensure_users(ACCOUNTS), 0)
+        self.assertEqual(len(self.server.users), len(ACCOUNTS))
+        token = self.api.login(ACCOUNTS[0].email, ACCOUNTS[0].password)
+        self.assertEqual(self.api.current_user(token)["email"], ACCOUNTS[0].email)
+
+    def test_existing_account_with_other_password_is_an_error(self):
+        self.api.ensure_user(ACCOUNTS[0])
+        with self.assertRaises(ApiFixtureError):
+            ApiFixtures(self.server.url).ensure_user(ACCOUNTS[0]._replace(password="Other@123"))
+
+    def test_cleanup_removes_created_and_owned_accounts(self):
+        other = ApiFixtures(self.server.url)
+        other.ensure_users(ACCOUNTS[:2])  # tạo bởi run khác, không được xóa
+        self.api.ensure_users(ACCOUNTS[2:5])
+        registered = ACCOUNTS[5]
+        self.api.own([registered])
+        self.api.register(registered)  # suite tự đăng ký trong lúc chạy
+        self.assertEqual(self.api.cleanup(), 4)
+        self.assertEqual(sorted(self.server.users), sorted(a.email for a in ACCOUNTS[:2]))
+        self.assertFalse(self.api.delete_user(registered))
+
+    def test_backend_without_delete_endpoint_skips_cleanup(self):
+        self.api.ensure_users(ACCOUNTS[:2])
+        request = self.api.request
+        calls = []
+
+        def no_delete(method, endpoint, body=None, token=None):
+            if method == "DELETE":
+                calls.append(endpoint)
+                return 404, "Cannot DELETE " + endpoint
+            return request(method, endpoint, body, token)
+
+        self.api.request = no_delete
+        self.assertEqual(self.api.cleanup(), 0)
+        self.assertFalse(self.api.delete_supported)
+        self.assertTrue(calls)
+        self.assertEqual(sorted(self.server.users), sorted(a.email for a in ACCOUNTS[:2]))
+
+    def test_cart_resolves_names_to_ids(self):
+        cart = self.api.cart(CHECKOUT_CART)
+        ids = {p["name"]: p["_id"] for p in self.server.products}
+        self.assertEqual(cart, [(ids[name], quantity) for name, quantity in CHECKOUT_CART])
+        self.assertEqual(self.api.cart(cart), cart)
+        self.assertEqual(self.server.stats()["requests"]["products"], 1)
+
+    def test_cart_rejects_unknown_product_and_low_stock(self):
+        with self.assertRaises(ApiFixtureError):
+            self.api.cart([("Blue Orchid", 1)])
+        with self.assertRaises(ApiFixtureError):
+            self.api.cart([("Sunflower Bouquet", 1000)])
+
+
+class TestMockApiFaults(unittest.TestCase):
+    def start(self, **config):
+        server = FakeApiServer(port=0, seed=7, **config).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_same_seed_gives_same_failures(self):
+        runs = []
+        for _ in range(2):
+            server = self.start(error_rate=0.3)
+            # POST không được thử lại nên thấy đúng từng lỗi bị tiêm vào
+            api = ApiFixtures(server.url)
+            runs.append([api.request("POST", "/v1/login", {"email": "", "password": ""})[0] for _ in range(20)])
+        self.assertEqual(runs[0], runs[1])
+        self.assertIn(503, runs[0])
+
+    def test_fixtures_retry_transient_errors_on_get(self):
+        server = self.start(error_rate=0.3)
+        products = ApiFixtures(server.url).products()
+        self.assertEqual(len(products), len(server.products))
+
+    def test_cold_start_delays_only_first_request(self):
+        server = self.start(cold_start=0.3)
+        api = ApiFixtures(server.url)
+        durations = []
+        for _ in range(2):
+            start = time.perf_counter()
+            api.request("GET", "/category")
+            durations.append(time.perf_counter() - start)
+        self.assertGreaterEqual(durations[0], 0.3)
+        self.assertLess(durations[1], 0.3)
+        self.assertEqual(server.stats()["cold_starts"], 1)
+
+    def test_latency_models(self):
+        rng = random.Random(1)
+        self.assertEqual(LatencyModel("0.05").sample(rng), 0.05)
+        self.assertTrue(all(0.1 <= LatencyModel("uniform:0.1:0.2").sample(rng) <= 0.2 for _ in range(50)))
+        self.assertTrue(all(LatencyModel("normal:0:1").sample(rng) >= 0 for _ in range(50)))
+        with self.assertRaises(ValueError):
+            LatencyModel("pareto:1")
+        with self.assertRaises(ValueError):
+            LatencyModel("uniform:0.1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Chờ app dùng được bằng các tín hiệu rẻ thay vì chờ cố định, ghi lại thời gian khởi động.
+
+Mỗi vòng poll chỉ kiểm tra các tín hiệu chưa thấy:
+- activity: current_activity là MainActivity (app đã resumed)
+- first_frame: logcat có dòng "Displayed <package>/..." của ActivityTaskManager;
+  FlutterActivity giữ launch screen đến khi Flutter vẽ frame đầu tiên nên dòng
+  này cũng là mốc frame đầu của Flutter (kèm thời gian khởi động do Android đo)
+- ready: phần tử của màn hình đầu tiên có trong cây giao diện
+
+App sẵn sàng khi có phần tử màn hình đầu; hai tín hiệu kia là mốc đo. App đã
+chạy sẵn (no_reset) thì không có dòng Displayed mới, khi đó chỉ thiếu
+first_frame. Thời gian tính từ lúc bắt đầu tạo phiên Appium, được in ra và
+lưu vào lịch sử:
+    python run_history.py startup --suite checkout
+"""
+import os
+import re
+import time
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from appium_session import APP_ACTIVITY, APP_PACKAGE
+from tracing import traced_sleep
+from harness_log import get_logger
+
+log = get_logger("app_ready")
+
+APP_READY_TIMEOUT = float(os.environ.get("APP_READY_TIMEOUT", "55"))
+READY_POLL = float(os.environ.get("APP_READY_POLL", "0.25"))
+
+SIGNALS = ("activity", "first_frame", "ready")
+# "Displayed com.example.flutter_shop/.MainActivity: +1s234ms" (có thể kèm "(total +...)")
+_DISPLAYED = re.compile(r"Displayed (\S+?)/\S+: \+(?:(\d+)s)?(\d+)ms")
+
+
+def parse_displayed(message, package=APP_PACKAGE):
+    """Thời gian khởi động (giây) trong dòng logcat Displayed của package, None nếu không phải"""
+    match = _DISPLAYED.search(message)
+    if not match or match.group(1) != package:
+        return None
+    return int(match.group(2) or 0) + int(match.group(3)) / 1000
+
+
+class AppReadiness:
+    """Poll activity, logcat và phần tử màn hình đầu cho đến khi app dùng được"""
+
+    def __init__(self, driver, ready_xpath, package=APP_PACKAGE, activity=APP_ACTIVITY,
+                 timeout=APP_READY_TIMEOUT, poll=READY_POLL):
+        self.driver = driver
+        self.ready_xpath = ready_xpath
+        self.package = package
+        self.activity = activity
+        self.timeout = timeout
+        self.poll = poll
+        self.signals = {}
+        self.displayed = None
+        self.logcat = True
+
+    def _activity_resumed(self):
+        current = self.driver.current_activity or ""
+        # current_activity có thể là tên ngắn (.MainActivity) hoặc đầy đủ
+        return current == self.activity or (current.startswith(".") and self.activity.endswith(current))
+
+    def _first_frame(self):
+        try:
+            entries = self.driver.get_log("logcat")
+        except WebDriverException:
+            self.logcat = False  # Server không cho đọc logcat: bỏ tín hiệu này
+            return False
+        for entry in entries:
+            seconds = parse_displayed(entry.get("message", ""), self.package)
+            if seconds is not None:
+                self.displayed = seconds
+                return True
+        return False
+
+    def _ready(self):
+        return bool(self.driver.find_elements(AppiumBy.XPATH, self.ready_xpath))
+
+    def wait(self, since=None):
+        """Chờ đến khi app sẵn sàng, trả về {tín hiệu: giây kể từ `since`}"""
+        since = time.perf_counter() if since is None else since
+        deadline = time.perf_counter() + self.timeout
+        checks = {"activity": self._activity_resumed, "first_frame": self._first_frame, "ready": self._ready}
+        while True:
+            for name in SIGNALS:
+                if name in self.signals or (name == "first_frame" and not self.logcat):
+                    continue
+                if name == "ready" and "activity" not in self.signals:
+                    break  # Chưa resumed thì chưa cần lấy cây giao diện
+                if checks[name]():
+                    self.signals[name] = time.perf_counter() - since
+            if "ready" in self.signals:
+                return self.signals
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                missing = [name for name in SIGNALS if name not in self.signals]
+                raise TimeoutException(f"App not ready after {self.timeout:.0f}s, missing signal(s): {missing}")
+            traced_sleep(min(self.poll, remaining), "app ready poll")
+
+    def metrics(self):
+        """Các mốc đo để lưu lịch sử; launch là thời gian Android đo được trong dòng Displayed"""
+        metrics = dict(self.signals)
+        if self.displayed is not None:
+            metrics["launch"] = self.displayed
+        return metrics
+
+    def print_summary(self):
+        labels = {"activity": "activity resumed", "first_frame": "first frame", "launch": "Android launch time"}
+        metrics = self.metrics()
+        details = ", ".join(f"{labels[name]} {metrics[name]:.1f}s" for name in labels if name in metrics)
+        log.info("🚀 App ready in %.1fs%s", metrics["ready"], f" ({details})" if details else "",
+                 extra={"step": "startup", "duration": metrics["ready"]})
+
+    def save(self, history, run_id, suite, device=""):
+        if history is not None and "ready" in self.signals:
+            history.record_startup(run_id, suite, device, self.metrics())
@@ -0,0 +1,52 @@
+"""Kiểm tra app_ready trên fake_appium có mô phỏng thời gian khởi động.
+
+    python -m unittest app_ready_test
+"""
+import os
+import tempfile
+import unittest
+from selenium.common.exceptions import TimeoutException
+from app_ready import AppReadiness, parse_displayed
+from fake_session import connect, start_server
+from run_history import RunHistory
+
+HOME_XPATH = "//android.widget.ImageView[contains(@content-desc, 'Bouquet')]"
+
+
+class TestAppReadiness(unittest.TestCase):
+    def start(self, startup):
+        return connect(self, start_server(self, start_screen="home", startup=startup))
+
+    def test_waits_for_first_frame_and_home_screen(self):
+        readiness = AppReadiness(self.start(0.5), HOME_XPATH, poll=0.05)
+        signals = readiness.wait()
+        self.assertGreaterEqual(signals["ready"], 0.5)
+        self.assertLess(signals["activity"], 0.5)
+        self.assertGreaterEqual(signals["first_frame"], 0.5)
+        self.assertEqual(readiness.metrics()["launch"], 0.5)
+
+    def test_timeout_names_missing_signals(self):
+        readiness = AppReadiness(self.start(0), "//*[@content-desc='Không có']", timeout=0.3, poll=0.05)
+        with self.assertRaisesRegex(TimeoutException, r"\['ready'\]"):
+            readiness.wait()
+
+    def test_metrics_go_to_history(self):
+        readiness = AppReadiness(self.start(0), HOME_XPATH, poll=0.05)
+        readiness.wait()
+        with tempfile.TemporaryDirectory() as directory:
+            history = RunHistory(os.path.join(directory, "history.sqlite"))
+            readiness.save(history, "run-1", "checkout", "fake")
+            row = history.startup_trend("checkout")[0]
+            self.assertEqual((row["run_id"], row["launch"]), ("run-1", 0.0))
+            self.assertIsNotNone(row["ready"])
+            history.close()
+
+    def test_parse_displayed(self):
+        line = "I/ActivityTaskManager: Displayed com.example.flutter_shop/.MainActivity: +1s234ms (total +2s5ms)"
+        self.assertEqual(parse_displayed(line), 1.234)
+        self.assertEqual(parse_displayed("Displayed com.example.flutter_shop/.MainActivity: +87ms"), 0.087)
+        self.assertIsNone(parse_displayed("Displayed com.android.settings/.Settings: +300ms"))
+
+
+if __name__ == "__main__":
+    unittest.main()
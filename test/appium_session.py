@@ -0,0 +1,134 @@
+import atexit
+import os
+import time
+from appium import webdriver
+from appium.options.android import UiAutomator2Options
+from harness_log import get_logger
+
+log = get_logger("appium_session")
+
+APPIUM_URL = os.environ.get("APPIUM_URL", "http://localhost:4723")
+# Lệnh adb dùng để kiểm tra thiết bị (có thể trỏ sang adb khác qua biến môi trường ADB)
+ADB = os.environ.get("ADB", "adb")
+APP_PACKAGE = "com.example.flutter_shop"
+APP_ACTIVITY = "com.example.flutter_shop.MainActivity"
+
+# Chế độ quản lý phiên:
+#   per_test - tạo driver mới cho mỗi test (hành vi cũ)
+#   class    - một phiên cho cả class test
+#   suite    - một phiên cho cả tiến trình, dùng chung giữa các class
+SESSION_MODES = ("per_test", "class", "suite")
+DEFAULT_SESSION_MODE = os.environ.get("APPIUM_SESSION_MODE", "class")
+
+# Phiên dùng chung ở chế độ suite, khóa theo (url, udid)
+_suite_sessions = {}
+
+
+def build_options(udid, **overrides):
+    """Tạo UiAutomator2Options mặc định cho app flutter_shop"""
+    options = UiAutomator2Options()
+    options.platform_name = "Android"
+    options.device_name = "MyAndroidDevice"
+    options.udid = udid
+    options.app_package = APP_PACKAGE
+    options.app_activity = APP_ACTIVITY
+    options.automation_name = "UiAutomator2"
+    options.no_reset = True
+    for name, value in overrides.items():
+        setattr(options, name, value)
+    return options
+
+
+class SessionManager:
+    """Giữ một phiên Appium và đo thời gian tạo/đóng phiên"""
+
+    def __init__(self, udid, mode=None, url=APPIUM_URL, **option_overrides):
+        mode = mode or DEFAULT_SESSION_MODE
+        if mode not in SESSION_MODES:
+            raise ValueError(f"Unknown session mode '{mode}', expected one of {SESSION_MODES}")
+        self.udid = udid
+        self.mode = mode
+        self.url = url
+        self.option_overrides = option_overrides
+        self.driver = None
+        self.cases = 0
+        self.sessions_created = 0
+        self.handshake_time = 0.0
+        self.quit_time = 0.0
+        self.reset_time = 0.0
+
+    @classmethod
+    def for_suite(cls, udid, url=APPIUM_URL, **option_overrides):
+        """Trả về manager dùng chung cho cả tiến trình (chế độ suite)"""
+        key = (url, udid)
+        if key not in _suite_sessions:
+            manager = cls(udid, mode="suite", url=url, **option_overrides)
+            _suite_sessions[key] = manager
+            atexit.register(manager.close)
+        return _suite_sessions[key]
+
+    def _create(self):
+        start = time.perf_counter()
+        self.driver = webdriver.Remote(self.url, options=build_options(self.udid, **self.option_overrides))
+        self.handshake_time += time.perf_counter() - start
+        self.sessions_created += 1
+        return self.driver
+
+    def _quit(self):
+        start = time.perf_counter()
+        try:
+            self.driver.quit()
+        finally:
+            self.driver = None
+            self.quit_time += time.perf_counter() - start
+
+    def acquire(self):
+        """Lấy driver cho một test case, chỉ tạo phiên mới khi cần"""
+        self.cases += 1
+        if self.driver is None:
+            return self._create()
+        return self.driver
+
+    def release(self):
+        """Kết thúc một test case; ở chế độ per_test thì đóng phiên"""
+        if self.mode == "per_test" and self.driver is not None:
+            self._quit()
+
+    def reset_app(self):
+        """Khởi động lại app trong phiên hiện tại thay vì tạo phiên mới"""
+        if self.driver is None:
+            return
+        start = time.perf_counter()
+        self.driver.terminate_app(APP_PACKAGE)
+        self.driver.activate_app(APP_PACKAGE)
+        self.reset_time += time.perf_counter() - start
+
+    def close(self):
+        """Đóng phiên nếu còn mở"""
+        if self.driver is not None:
+            self._quit()
+
+    def report(self):
+        """Ước lượng thời gian tiết kiệm được so với chế độ per_test"""
+        if not self.sessions_created:
+            return {"mode": self.mode, "cases": self.cases, "sessions_created": 0, "saved": 0.0}
+        per_session = (self.handshake_time + self.quit_time) / self.sessions_created
+        spent = self.handshake_time + self.quit_time + self.reset_time
+        estimated_per_test = per_session * self.cases
+        return {
+            "mode": self.mode,
+            "cases": self.cases,
+            "sessions_created": self.sessions_created,
+            "session_cost": per_session,
+            "spent": spent,
+            "estimated_per_test": estimated_per_test,
+            "saved": estimated_per_test - spent,
+        }
+
+    def print_report(self):
+        report = self.report()
+        if not report["sessions_created"]:
+            return
+        log.info("⏱️ Session mode '%s': %s session(s) for %s case(s), %.1fs spent on sessions/resets, "
+                 "~%.1fs with per-test sessions, saved ~%.1fs", report["mode"], report["sessions_created"],
+                 report["cases"], report["spent"], report["estimated_per_test"], report["saved"])
@@ -0,0 +1,67 @@
+"""Kiểm tra appium_session trên fake_appium: số phiên theo từng chế độ và báo cáo thời gian.
+
+    python -m unittest appium_session_test
+"""
+import unittest
+from unittest import mock
+import appium_session
+from appium_session import SessionManager
+from fake_session import start_server
+
+
+class TestSessionManager(unittest.TestCase):
+    def setUp(self):
+        self.server = start_server(self)
+
+    def manager(self, mode, udid="fake"):
+        manager = SessionManager(udid, mode=mode, url=self.server.url)
+        self.addCleanup(manager.close)
+        return manager
+
+    def run_cases(self, manager, count):
+        drivers = []
+        for _ in range(count):
+            drivers.append(manager.acquire())
+            manager.release()
+        return drivers
+
+    def test_per_test_opens_a_session_for_every_case(self):
+        manager = self.manager("per_test")
+        drivers = self.run_cases(manager, 3)
+        self.assertEqual(len({driver.session_id for driver in drivers}), 3)
+        self.assertEqual(self.server.sessions, {})
+        self.assertEqual(self.server.stats()["commands"]["newSession"], 3)
+        self.assertIsNone(manager.driver)
+
+    def test_class_mode_reuses_one_session(self):
+        manager = self.manager("class")
+        drivers = self.run_cases(manager, 3)
+        self.assertEqual(len({driver.session_id for driver in drivers}), 1)
+        self.assertEqual(list(self.server.sessions), [drivers[0].session_id])
+        manager.reset_app()
+        self.assertGreater(manager.reset_time, 0)
+        report = manager.report()
+        self.assertEqual((report["mode"], report["cases"], report["sessions_created"]), ("class", 3, 1))
+        self.assertAlmostEqual(report["estimated_per_test"], report["session_cost"] * 3)
+        self.assertAlmostEqual(report["saved"], report["estimated_per_test"] - report["spent"])
+        manager.close()
+        self.assertEqual(self.server.sessions, {})
+
+    def test_suite_mode_shares_the_manager_per_device(self):
+        with mock.patch.dict(appium_session._suite_sessions, clear=True), mock.patch("atexit.register"):
+            first = SessionManager.for_suite("fake", url=self.server.url)
+            self.addCleanup(first.close)
+            self.assertIs(SessionManager.for_suite("fake", url=self.server.url), first)
+            self.assertIsNot(SessionManager.for_suite("other", url=self.server.url), first)
+        self.assertEqual(first.mode, "suite")
+        self.assertIs(first.acquire(), first.acquire())
+
+    def test_report_without_sessions(self):
+        manager = self.manager("class")
+        self.assertEqual(manager.report(), {"mode": "class", "cases": 0, "sessions_created": 0, "saved": 0.0})
+        with self.assertRaisesRegex(ValueError, "Unknown session mode"):
+            SessionManager("fake", mode="per_case")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Lưu bằng chứng khi một test case hỏng: ảnh màn hình, page source, logcat, các lệnh Appium cuối.
+
+Trên thread test chỉ lấy dữ liệu từ driver (phải lấy ngay, trước khi case
+sau đổi màn hình); giải mã ảnh, nén zip và ghi đĩa chạy trên một worker
+nền nên case tiếp theo bắt đầu ngay. Mỗi case hỏng thành một file
+output/artifacts/<suite>/<run>/<test id>.zip và một dòng trong bảng
+artifacts của lịch sử SQLite:
+    python run_history.py artifacts --suite checkout
+
+Tắt bằng FAILURE_ARTIFACTS=0.
+"""
+import base64
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from run_history import RunHistory
+from harness_log import get_logger
+
+log = get_logger("artifacts")
+
+ARTIFACTS_ENABLED = os.environ.get("FAILURE_ARTIFACTS", "1") != "0"
+ARTIFACT_COMMANDS = int(os.environ.get("ARTIFACT_COMMANDS", "20"))
+LOGCAT_TAIL = int(os.environ.get("ARTIFACT_LOGCAT_LINES", "200"))
+output_dir = "output"
+ARTIFACT_DIR = os.path.join(output_dir, "artifacts")
+
+
+def _format_logcat(entries):
+    lines = []
+    for entry in entries:
+        stamp = time.strftime("%H:%M:%S", time.localtime(entry.get("timestamp", 0) / 1000))
+        lines.append(f"{stamp} {entry.get('level', '')} {entry.get('message', '')}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class FailureCapture:
+    """Thu bằng chứng của case hỏng trên thread test, nén và ghi trên worker nền"""
+
+    def __init__(self, suite, run_id, history=None, tracer=None, directory=ARTIFACT_DIR, enabled=ARTIFACTS_ENABLED):
+        self.suite = suite
+        self.run_id = run_id
+        # Worker mở kết nối SQLite riêng (sqlite3 không cho dùng chung kết nối giữa các thread)
+        self.history_path = history.path if history is not None else None
+        self.tracer = tracer
+        self.directory = os.path.join(directory, suite, run_id)
+        self.enabled = enabled
+        self.captured = {}
+        self.capture_time = 0.0
+        self.write_time = 0.0
+        self.failures = 0
+        self._history = None
+        self._executor = None
+
+    def capture(self, driver, test_id, note=""):
+        """Chụp lại trạng thái hiện tại cho `test_id` và trả về đường dẫn file zip sẽ được ghi"""
+        if not self.enabled or test_id in self.captured:
+            return self.captured.get(test_id)
+        start = time.perf_counter()
+        # Lấy lệnh trước khi chụp để danh sách không lẫn các lệnh chụp bên dưới
+        commands = self.tracer.recent(ARTIFACT_COMMANDS) if self.tracer is not None else []
+        evidence = {"commands": commands, "errors": {}}
+        for name, read in (("screenshot", driver.get_screenshot_as_base64),
+                           ("page_source", lambda: driver.page_source),
+                           ("logcat", lambda: driver.get_log("logcat")[-LOGCAT_TAIL:])):
+            try:
+                evidence[name] = read()
+            except Exception as e:
+                evidence["errors"][name] = str(e)
+        path = os.path.join(self.directory, f"{test_id}.zip")
+        self.captured[test_id] = path
+        info = {"suite": self.suite, "run_id": self.run_id, "test_id": test_id, "note": note,
+                "captured_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifacts")
+        self._executor.submit(self._write, path, info, evidence)
+        self.capture_time += time.perf_counter() - start
+        log.info("🧾 Capturing failure artifacts for %s -> %s", test_id, path)
+        return path
+
+    def _write(self, path, info, evidence):
+        """Chạy trên worker: giải mã, nén, ghi file rồi ghi link vào lịch sử"""
+        start = time.perf_counter()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+                if "screenshot" in evidence:
+                    # PNG đã nén sẵn, nén lại chỉ tốn CPU
+                    archive.writestr("screenshot.png", base64.b64decode(evidence["screenshot"]),
+                                     compress_type=zipfile.ZIP_STORED)
+                if "page_source" in evidence:
+                    archive.writestr("page_source.xml", evidence["page_source"])
+                if "logcat" in evidence:
+                    archive.writestr("logcat.txt", _format_logcat(evidence["logcat"]))
+                archive.writestr("commands.json", json.dumps(evidence["commands"], indent=2, ensure_ascii=False))
+                archive.writestr("case.json", json.dumps(dict(info, errors=evidence["errors"]), indent=2,
+                                                         ensure_ascii=False))
+            os.replace(temp_path, path)
+            if self.history_path is not None:
+                if self._history is None:
+                    self._history = RunHistory(self.history_path)
+                self._history.record_artifact(self.run_id, self.suite, info["test_id"], path, info["note"])
+        except Exception as e:
+            self.failures += 1
+            log.warning("⚠️ Could not write failure artifacts %s: %s", path, e)
+        self.write_time += time.perf_counter() - start
+
+    def _close_history(self):
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+
+    def close(self):
+        """Chờ worker ghi xong mọi artifact và in tóm tắt"""
+        if self._executor is None:
+            return
+        self._executor.submit(self._close_history)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        written = len(self.captured) - self.failures
+        log.info("🧾 %s failure artifact(s) in %s (%.1fs on the test thread, %.1fs written in background)",
+                 written, self.directory, self.capture_time, self.write_time)
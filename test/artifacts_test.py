@@ -0,0 +1,91 @@
+"""Kiểm tra artifacts với driver giả (không cần Appium).
+
+    python -m unittest artifacts_test
+"""
+import base64
+import json
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+from artifacts import FailureCapture
+from run_history import RunHistory
+from tracing import Tracer
+
+PNG = base64.b64encode(b"\x89PNG\r\n\x1a\nfake").decode("ascii")
+
+
+class StubDriver:
+    def __init__(self, source="<hierarchy/>"):
+        self.source = source
+
+    def get_screenshot_as_base64(self):
+        return PNG
+
+    @property
+    def page_source(self):
+        if isinstance(self.source, Exception):
+            raise self.source
+        return self.source
+
+    def get_log(self, log_type):
+        return [{"timestamp": 0, "level": "ERROR", "message": f"E/flutter: boom {i}"} for i in range(3)]
+
+
+class TestFailureCapture(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.history = RunHistory(os.path.join(directory.name, "history.sqlite"))
+        self.addCleanup(self.history.close)
+        self.tracer = Tracer("checkout", "run-1")
+        for name in ("findElement", "click", "getPageSource"):
+            with self.tracer.span(name, "command"):
+                pass
+
+    def capture(self, **options):
+        return FailureCapture("checkout", "run-1", self.history, self.tracer,
+                              directory=os.path.join(self.directory, "artifacts"), **options)
+
+    def test_writes_zip_in_background_and_links_it(self):
+        capture = self.capture()
+        release = threading.Event()
+        write = capture._write
+        capture._write = lambda *args: (release.wait(5), write(*args))
+        path = capture.capture(StubDriver(), "TC_CHECKOUT_03", "Expected error not found")
+        # Case sau không phải chờ việc ghi file
+        self.assertFalse(os.path.exists(path))
+        release.set()
+        capture.close()
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(sorted(archive.namelist()),
+                             ["case.json", "commands.json", "logcat.txt", "page_source.xml", "screenshot.png"])
+            self.assertEqual(archive.read("screenshot.png"), base64.b64decode(PNG))
+            commands = [c["name"] for c in json.loads(archive.read("commands.json"))]
+            self.assertEqual(commands, ["findElement", "click", "getPageSource"])
+            self.assertIn("boom 2", archive.read("logcat.txt").decode("utf-8"))
+        row = self.history.artifacts(suite="checkout")[0]
+        self.assertEqual((row["test_id"], row["path"]), ("TC_CHECKOUT_03", path))
+
+    def test_driver_errors_do_not_lose_other_evidence(self):
+        capture = self.capture()
+        path = capture.capture(StubDriver(source=RuntimeError("session gone")), "TC_CHECKOUT_01")
+        capture.close()
+        with zipfile.ZipFile(path) as archive:
+            self.assertNotIn("page_source.xml", archive.namelist())
+            self.assertIn("session gone", json.loads(archive.read("case.json"))["errors"]["page_source"])
+
+    def test_disabled_or_repeated_capture(self):
+        self.assertIsNone(self.capture(enabled=False).capture(StubDriver(), "TC_CHECKOUT_01"))
+        capture = self.capture()
+        first = capture.capture(StubDriver(), "TC_CHECKOUT_01")
+        self.assertEqual(capture.capture(StubDriver(source="<later/>"), "TC_CHECKOUT_01"), first)
+        capture.close()
+        with zipfile.ZipFile(first) as archive:
+            self.assertEqual(archive.read("page_source.xml"), b"<hierarchy/>")
+
+
+if __name__ == "__main__":
+    unittest.main()
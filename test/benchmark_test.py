@@ -0,0 +1,151 @@
+"""Benchmark harness trên fake_appium với độ trễ cố định, so với baseline.
+
+Mỗi benchmark chạy một suite trong tiến trình con, trỏ vào một
+FakeAppiumServer mới, rồi đo thời gian chạy và số lệnh server nhận được.
+Test fail nếu số lệnh hoặc thời gian vượt baseline quá ngưỡng, ví dụ khi
+ai đó thêm một time.sleep(2) vào harness.
+
+    python -m unittest benchmark_test                    # so với baseline
+    BENCH_UPDATE_BASELINE=1 python -m unittest benchmark_test   # ghi lại baseline
+    BENCH_HISTORY=output/run_history.sqlite python -m unittest benchmark_test   # lưu kết quả vào lịch sử
+
+Baseline nằm trong fixtures/benchmark_baseline.json.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from appium_session import APP_PACKAGE
+from fake_appium import FakeAppiumServer
+from run_history import RunHistory
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, "fixtures", "benchmark_baseline.json")
+BENCH_UDID = "bench-device"
+# Độ trễ cố định cho mọi lệnh, để thời gian đo được ổn định giữa các lần chạy
+BENCH_LATENCY = float(os.environ.get("BENCH_LATENCY", "0.02"))
+# Ngưỡng tăng cho phép so với baseline (tỉ lệ), thời gian có thêm một khoảng dung sai tuyệt đối
+COMMAND_THRESHOLD = float(os.environ.get("BENCH_COMMAND_THRESHOLD", "0.10"))
+TIME_THRESHOLD = float(os.environ.get("BENCH_TIME_THRESHOLD", "0.20"))
+TIME_SLACK = float(os.environ.get("BENCH_TIME_SLACK", "1.0"))
+UPDATE_BASELINE = os.environ.get("BENCH_UPDATE_BASELINE", "0") == "1"
+# File lịch sử SQLite nhận kết quả benchmark (suite "benchmark"); mặc định không ghi gì ra output/
+BENCH_HISTORY = os.environ.get("BENCH_HISTORY", "")
+
+# Tên benchmark -> test cần chạy và màn hình bắt đầu của fake server
+BENCHMARKS = {
+    "login": {"target": "login_test", "start_screen": "login"},
+    "register": {"target": "register_test.TestRegisterAppium.test_register_sequential", "start_screen": "login"},
+    "checkout": {"target": "addproduct_test.TestCheckoutAppium.test_checkout_flow", "start_screen": "home"},
+}
+
+# Trạng thái của fake_adb: chỉ có thiết bị benchmark, khỏe và đã cài app
+FAKE_ADB_STATE = {BENCH_UDID: {"state": "device", "model": "bench", "battery": 100, "screen_on": True,
+                               "packages": [APP_PACKAGE]}}
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(baseline, path=BASELINE_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def run_benchmark(name, latency=BENCH_LATENCY):
+    """Chạy một benchmark, trả về {"wall_time", "commands", "returncode", "output"}"""
+    spec = BENCHMARKS[name]
+    server = FakeAppiumServer(port=0, latency=latency, start_screen=spec["start_screen"]).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            state = os.path.join(workdir, "devices.json")
+            with open(state, "w", encoding="utf-8") as f:
+                json.dump(FAKE_ADB_STATE, f)
+            env = dict(os.environ,
+                       APPIUM_URL=server.url,
+                       APPIUM_UDID=BENCH_UDID,
+                       ADB=f'"{sys.executable}" "{os.path.join(HERE, "fake_adb.py")}"',
+                       FAKE_ADB_STATE=state,
+                       PYTHONPATH=os.pathsep.join(filter(None, [HERE, os.environ.get("PYTHONPATH")])))
+            start = time.perf_counter()
+            # Chạy trong thư mục tạm để kết quả/trace của benchmark không lẫn vào output/ thật
+            process = subprocess.run([sys.executable, "-m", "unittest", spec["target"]], cwd=workdir, env=env,
+                                     stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding="utf-8")
+            wall_time = time.perf_counter() - start
+        return {"wall_time": wall_time, "commands": server.stats()["total"],
+                "returncode": process.returncode, "output": process.stdout}
+    finally:
+        server.stop()
+
+
+class TestHarnessBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.baseline = load_baseline()
+        cls.measured = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if UPDATE_BASELINE and cls.measured:
+            cls.baseline.update({name: {key: value for key, value in result.items() if key != "status"}
+                                 for name, result in cls.measured.items()})
+            save_baseline(cls.baseline)
+            print(f"📝 Baseline updated: {BASELINE_PATH}")
+        if BENCH_HISTORY and cls.measured:
+            history = RunHistory(BENCH_HISTORY)
+            run_id = f"bench-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+            for name, result in cls.measured.items():
+                history.start_run(run_id, "benchmark")
+                history.record(run_id, "benchmark", name, result["status"],
+                               f"{result['commands']} command(s)", result["wall_time"])
+            history.close()
+
+    def check_benchmark(self, name):
+        result = run_benchmark(name)
+        tail = "\n".join(result["output"].splitlines()[-20:])
+        self.assertEqual(result["returncode"], 0, f"{name} suite failed to run:\n{tail}")
+
+        base = self.baseline.get(name)
+        print(f"\n⏱️ {name}: {result['wall_time']:.2f}s, {result['commands']} command(s)"
+              + (f" (baseline {base['wall_time']:.2f}s, {base['commands']} command(s))" if base else ""))
+        measured = {"wall_time": round(result["wall_time"], 2), "commands": result["commands"],
+                    "latency": BENCH_LATENCY, "status": "Pass"}
+        type(self).measured[name] = measured
+        if UPDATE_BASELINE:
+            return
+        if base is None:
+            self.skipTest(f"no baseline for '{name}' (run with BENCH_UPDATE_BASELINE=1)")
+        if base.get("latency") != BENCH_LATENCY:
+            self.skipTest(f"baseline for '{name}' was recorded with latency {base.get('latency')}s")
+
+        max_commands = base["commands"] * (1 + COMMAND_THRESHOLD)
+        max_time = base["wall_time"] * (1 + TIME_THRESHOLD) + TIME_SLACK
+        measured["status"] = "Fail" if result["commands"] > max_commands or result["wall_time"] > max_time else "Pass"
+        self.assertLessEqual(result["commands"], max_commands,
+                             f"{name}: {result['commands']} commands, baseline {base['commands']} "
+                             f"(+{COMMAND_THRESHOLD:.0%} allowed)")
+        self.assertLessEqual(result["wall_time"], max_time,
+                             f"{name}: {result['wall_time']:.2f}s, baseline {base['wall_time']:.2f}s "
+                             f"(+{TIME_THRESHOLD:.0%} and {TIME_SLACK}s allowed)")
+
+
+# Dynamically create test methods
+def create_test_method(name):
+    def test_method(self):
+        self.check_benchmark(name)
+    test_method.__name__ = f"test_{name}"
+    return test_method
+
+for name in BENCHMARKS:
+    setattr(TestHarnessBenchmark, f"test_{name}", create_test_method(name))
+
+if __name__ == "__main__":
+    unittest.main()
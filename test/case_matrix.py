@@ -0,0 +1,138 @@
+"""Sinh test case từ miền giá trị của từng trường, rút gọn bằng covering array (pairwise / n-wise).
+
+Mỗi trường có một danh sách lớp giá trị (hợp lệ, trống, quá dài, ký tự đặc
+biệt, Unicode, ...). Thay vì chạy mọi tổ hợp, covering_rows chọn tham lam
+từng dòng sao cho mọi bộ `strength` lớp của bất kỳ `strength` trường nào
+đều xuất hiện ít nhất một lần: với 8 trường checkout, 5 lớp mỗi trường,
+pairwise cần vài chục dòng thay cho 390625. Các dòng được sinh lần lượt
+(generator), kết quả mong đợi tính bằng validation_oracle.
+
+    CASE_MATRIX=2 python addproduct_test.py   # thêm các case pairwise sau TEST_DATA viết tay
+    CASE_MATRIX=3 python register_test.py     # 3-wise
+    CASE_MATRIX=1 python login_test.py        # mỗi lớp giá trị xuất hiện một lần
+
+Mặc định (CASE_MATRIX=0) chỉ chạy TEST_DATA viết tay.
+"""
+import os
+from itertools import combinations, product
+from validation_oracle import login_errors, register_errors
+
+CASE_MATRIX = int(os.environ.get("CASE_MATRIX", "0"))
+CHECKOUT_REQUIRED = ("last_name", "first_name", "phone", "address", "city", "district", "zip_code")
+
+
+def covering_rows(domains, strength=2):
+    """Các dòng {trường: nhãn lớp} phủ mọi tổ hợp `strength` lớp, sinh dần từng dòng
+
+    `domains` là {trường: [(nhãn, giá trị), ...]}; strength >= số trường cho toàn bộ tích Descartes.
+    """
+    fields = list(domains)
+    sizes = [len(domains[field]) for field in fields]
+    strength = min(strength, len(fields))
+    if strength <= 0:
+        return
+    combos = list(combinations(range(len(fields)), strength))
+    by_field = {i: [combo for combo in combos if i in combo] for i in range(len(fields))}
+    uncovered = {(combo, values) for combo in combos for values in product(*(range(sizes[i]) for i in combo))}
+
+    def gain(row, i, value):
+        row[i] = value
+        count = sum((combo, tuple(row[j] for j in combo)) in uncovered
+                    for combo in by_field[i] if all(j in row for j in combo))
+        del row[i]
+        return count
+
+    while uncovered:
+        # Bắt đầu từ bộ chưa phủ nhỏ nhất (ổn định giữa các lần chạy), điền các trường còn lại
+        # bằng lớp phủ thêm nhiều bộ nhất; dòng đầu tiên vì vậy là dòng toàn giá trị hợp lệ
+        combo, values = min(uncovered)
+        row = dict(zip(combo, values))
+        for i in range(len(fields)):
+            if i not in row:
+                row[i] = max(range(sizes[i]), key=lambda value: (gain(row, i, value), -value))
+        uncovered.difference_update((combo, tuple(row[j] for j in combo)) for combo in combos)
+        yield {fields[i]: domains[fields[i]][row[i]][0] for i in range(len(fields))}
+
+
+def matrix_cases(prefix, domains, expect, strength=CASE_MATRIX, base=None):
+    """(test id, dữ liệu) theo dạng TEST_DATA cho từng dòng của covering_rows
+
+    Giá trị trong `domains` có thể là hàm nhận dữ liệu đã điền của dòng (vd. nhập lại mật khẩu).
+    `expect(data)` trả về các khóa kết quả mong đợi ("expected", ...).
+    """
+    for number, row in enumerate(covering_rows(domains, strength), 1):
+        data = dict(base or {})
+        data["description"] = "Matrix: " + ", ".join(f"{field}={label}" for field, label in row.items())
+        for field, label in row.items():
+            value = dict(domains[field])[label]
+            data[field] = value(data) if callable(value) else value
+        data.update(expect(data))
+        yield f"{prefix}_{number:03d}", data
+
+
+def login_domains(account):
+    """Lớp giá trị của form login; lớp "valid" là tài khoản đã seed nên đăng nhập được"""
+    return {
+        "email": [("valid", account.email), ("empty", ""), ("too_long", "u" * 45 + "@example.com"),
+                  ("bad_format", "user@example"), ("leading_digit", "1user@example.com"),
+                  ("whitespace", "us er@example.com"), ("unicode", "ngườidùng@example.com")],
+        "password": [("valid", account.password), ("empty", ""), ("short", "Pa@1"), ("too_long", "Pass@123" * 17),
+                     ("whitespace", "Pass @123"), ("no_upper", "pass@123"), ("no_digit", "Pass@abc"),
+                     ("no_special", "Pass1234"), ("unicode", "Pass@123ư")],
+    }
+
+
+def login_matrix(account, strength=CASE_MATRIX):
+    def expect(data):
+        errors = login_errors(data["email"], data["password"])
+        if errors:
+            return {"expected": f"error:{errors[0]}"}
+        if (data["email"], data["password"]) == (account.email, account.password):
+            return {"expected": "Success"}
+        return {"expected": "error:Invalid email or password"}
+    return matrix_cases("MX_LOGIN", login_domains(account), expect, strength)
+
+
+def register_domains(existing):
+    """Lớp giá trị của form đăng ký.
+
+    Email hợp lệ duy nhất là tài khoản đã tồn tại: test_register_sequential dừng ở lần đăng ký
+    thành công đầu tiên, nên các dòng sinh ra phải giữ app ở màn hình đăng ký.
+    """
+    return {
+        "username": [("valid", existing.name), ("empty", ""), ("too_long", "Nguyen Van " * 6),
+                     ("special", "' OR '1'='1"), ("unicode", "Nguyễn Thị Ánh")],
+        "email": [("existing", existing.email), ("empty", ""), ("no_tld", "test@example"),
+                  ("whitespace", "te st@example.com"), ("unicode", "tést@example.com")],
+        "password": [("valid", existing.password), ("empty", ""), ("short", "Pa@1"), ("no_upper", "pass@123"),
+                     ("no_digit", "Pass@abc"), ("unicode", "Mật@Khẩu123")],
+        "confirm_password": [("same", lambda data: data["password"]), ("empty", ""),
+                             ("different", lambda data: data["password"] + "x")],
+    }
+
+
+def register_matrix(existing, strength=CASE_MATRIX):
+    def expect(data):
+        errors = register_errors(data["email"], data["password"], data["confirm_password"])
+        if errors:
+            return {"expected": f"error:{errors[0]}"}
+        return {"expected": "error:User already exists!" if data["email"] == existing.email else "login_screen"}
+    return matrix_cases("MX_REGISTER", register_domains(existing), expect, strength)
+
+
+def checkout_domains(valid):
+    """Lớp giá trị cho các trường checkout, lớp "valid" lấy từ một case đặt hàng thành công"""
+    domains = {}
+    for field in CHECKOUT_REQUIRED + ("note",):
+        domains[field] = [("valid", valid[field]), ("empty", ""), ("too_long", (valid[field] + " ") * 8),
+                          ("special", "!@#$%^&*()<>\"'"), ("unicode", "Đường Nguyễn Thị Minh Khai ✿")]
+    return domains
+
+
+def checkout_matrix(valid, strength=CASE_MATRIX):
+    def expect(data):
+        # Ghi chú là tùy chọn; TextFormField chỉ kiểm tra isEmpty, không trim
+        if any(data[field] == "" for field in CHECKOUT_REQUIRED):
+            return {"expected": "order_fail", "expected_error": "Required field missing"}
+        return {"expected": "order_success", "expected_error": None}
+    return matrix_cases("MX_CHECKOUT", checkout_domains(valid), expect, strength)
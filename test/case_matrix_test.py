@@ -0,0 +1,65 @@
+"""Kiểm tra case_matrix: độ phủ pairwise/n-wise và kết quả mong đợi của case sinh ra.
+
+    python -m unittest case_matrix_test
+"""
+import unittest
+from itertools import combinations, product
+from api_fixtures import Account
+from case_matrix import CHECKOUT_REQUIRED, checkout_domains, checkout_matrix, covering_rows, register_matrix
+from validation_oracle import register_errors
+
+VALID_CHECKOUT = {"last_name": "Trần", "first_name": "Sang", "phone": "0999888666", "address": "33 Xô Viết Nghệ Tĩnh",
+                  "city": "Đà Nẵng", "district": "Cẩm Lệ", "zip_code": "868866", "note": "Giao vào giờ trưa"}
+EXISTING = Account("Test User", "existing@example.com", "Pass@123")
+
+
+def covered(rows, fields, strength):
+    return {(combo, tuple(row[field] for field in combo)) for row in rows for combo in combinations(fields, strength)}
+
+
+class TestCoveringRows(unittest.TestCase):
+    def test_every_combination_of_strength_is_covered(self):
+        domains = checkout_domains(VALID_CHECKOUT)
+        fields = list(domains)
+        labels = {field: [label for label, _ in domains[field]] for field in fields}
+        for strength in (1, 2, 3):
+            rows = list(covering_rows(domains, strength))
+            expected = {(combo, values) for combo in combinations(fields, strength)
+                        for values in product(*(labels[field] for field in combo))}
+            self.assertEqual(covered(rows, fields, strength), expected)
+            self.assertLess(len(rows), 5 ** len(fields))
+        self.assertEqual(len(list(covering_rows(domains, 1))), 5)
+
+    def test_rows_are_lazy_and_start_with_valid_values(self):
+        rows = covering_rows(checkout_domains(VALID_CHECKOUT), 2)
+        self.assertEqual(set(next(rows).values()), {"valid"})
+
+    def test_full_product_when_strength_reaches_field_count(self):
+        domains = {"a": [("x", 1), ("y", 2)], "b": [("x", 1), ("y", 2), ("z", 3)]}
+        self.assertEqual(len(list(covering_rows(domains, 5))), 6)
+        self.assertEqual(list(covering_rows(domains, 0)), [])
+
+
+class TestMatrixCases(unittest.TestCase):
+    def test_checkout_expectations(self):
+        cases = dict(checkout_matrix(VALID_CHECKOUT, 2))
+        self.assertEqual(next(iter(cases)), "MX_CHECKOUT_001")
+        for data in cases.values():
+            missing = any(data[field] == "" for field in CHECKOUT_REQUIRED)
+            self.assertEqual(data["expected"], "order_fail" if missing else "order_success")
+        self.assertIn("order_success", {data["expected"] for data in cases.values()})
+
+    def test_register_cases_never_register_a_new_account(self):
+        for test_id, data in register_matrix(EXISTING, 2):
+            self.assertTrue(data["description"].startswith("Matrix: username="))
+            errors = register_errors(data["email"], data["password"], data["confirm_password"])
+            if errors:
+                self.assertEqual(data["expected"], f"error:{errors[0]}")
+            else:
+                self.assertEqual((data["email"], data["expected"]), (EXISTING.email, "error:User already exists!"))
+            if data["description"].endswith("confirm_password=same"):
+                self.assertEqual(data["confirm_password"], data["password"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""Mở thẳng một route của app bằng deep link (xem lib/services/deep_link_service.dart).
+
+    open_route(driver, "/checkout", CHECKOUT_CART)
+
+gửi lirisflora://app/checkout?cart=... qua lệnh "mobile: deepLink" của
+UiAutomator2: app nạp giỏ hàng cho trước rồi hiện màn hình thanh toán,
+không phải thêm từng sản phẩm qua giao diện.
+"""
+from urllib.parse import quote
+from appium_session import APP_PACKAGE
+from harness_log import get_logger
+
+log = get_logger("deep_link")
+
+DEEP_LINK_SCHEME = "lirisflora"
+DEEP_LINK_HOST = "app"
+# Giỏ hàng mà luồng giao diện của test_checkout_flow tạo ra:
+# thêm 4 sản phẩm, tăng 2 sản phẩm đầu lên 3, xóa Pink Tulip Bouquet
+CHECKOUT_CART = [
+    ("White Rose Arrangement", 3),
+    ("Sunflower Bouquet", 3),
+    ("White Lily Bouquet", 1),
+]
+
+
+def deep_link_url(route, cart=None):
+    """URL deep link cho route (ví dụ "/checkout"), cart là danh sách (id hoặc tên sản phẩm, số lượng)"""
+    url = f"{DEEP_LINK_SCHEME}://{DEEP_LINK_HOST}/{route.lstrip('/')}"
+    if cart:
+        items = ",".join(f"{product}:{quantity}" for product, quantity in cart)
+        url += f"?cart={quote(items, safe=':,')}"
+    return url
+
+
+def open_route(driver, route, cart=None):
+    """Mở route trong app đang test, chờ app nhận intent xong"""
+    url = deep_link_url(route, cart)
+    driver.execute_script("mobile: deepLink", {"url": url, "package": APP_PACKAGE, "waitForLaunch": True})
+    log.debug("🔗 Opened deep link %s", url, extra={"step": "navigate"})
+    return url
@@ -0,0 +1,58 @@
+"""Kiểm tra deep_link: mã hóa URL của giỏ hàng và mở route checkout trên fake_appium.
+
+    python -m unittest deep_link_test
+"""
+import unittest
+from urllib.parse import parse_qs, urlsplit
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import WebDriverException
+from deep_link import CHECKOUT_CART, deep_link_url, open_route
+from fake_session import FakeAppiumTestCase
+
+CHECKOUT_FIELD = "//android.widget.ScrollView//android.widget.EditText"
+
+
+class TestDeepLinkUrl(unittest.TestCase):
+    def test_route_without_cart(self):
+        self.assertEqual(deep_link_url("/checkout"), "lirisflora://app/checkout")
+        self.assertEqual(deep_link_url("cart", []), "lirisflora://app/cart")
+
+    def test_cart_names_and_quantities_are_encoded(self):
+        url = deep_link_url("/checkout", [("Hoa Hồng Đỏ", 2), ("Sunflower Bouquet", 10), ("p-42", 1)])
+        self.assertEqual(url, "lirisflora://app/checkout?cart="
+                              "Hoa%20H%E1%BB%93ng%20%C4%90%E1%BB%8F:2,Sunflower%20Bouquet:10,p-42:1")
+        self.assertTrue(url.isascii())
+        [cart] = parse_qs(urlsplit(url).query)["cart"]
+        self.assertEqual(cart, "Hoa Hồng Đỏ:2,Sunflower Bouquet:10,p-42:1")
+
+    def test_reserved_characters_in_names_are_escaped(self):
+        url = deep_link_url("/cart", [("Roses & Lilies?", 1)])
+        self.assertEqual(url, "lirisflora://app/cart?cart=Roses%20%26%20Lilies%3F:1")
+
+
+class TestOpenRoute(FakeAppiumTestCase):
+    server_options = {"start_screen": "home"}
+
+    def session(self):
+        return self.server.sessions[self.driver.session_id]
+
+    def test_checkout_opens_with_the_cart_preset(self):
+        url = open_route(self.driver, "/checkout", CHECKOUT_CART)
+        self.assertEqual(url, deep_link_url("/checkout", CHECKOUT_CART))
+        session = self.session()
+        self.assertEqual(session.current.name, "checkout")
+        self.assertEqual(session.cart, [name for name, quantity in CHECKOUT_CART for _ in range(quantity)])
+        self.assertTrue(self.driver.find_elements(AppiumBy.XPATH, CHECKOUT_FIELD))
+        self.assertEqual(self.commands()["execute"], 1)
+
+    def test_non_ascii_cart_round_trips(self):
+        open_route(self.driver, "/cart", [("Hoa Hồng Đỏ", 2)])
+        self.assertEqual(self.session().cart, ["Hoa Hồng Đỏ", "Hoa Hồng Đỏ"])
+
+    def test_unknown_route_is_rejected(self):
+        with self.assertRaisesRegex(WebDriverException, "Unsupported deep link"):
+            open_route(self.driver, "/orders")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,318 @@
+"""Tìm thiết bị một lần, cache trạng thái/sức khỏe và cấp thiết bị cho các class test.
+
+Mỗi lần làm mới chỉ tốn một tiến trình adb cho cả danh sách (`adb devices -l`)
+và một cho mỗi thiết bị (một `adb shell` gộp pin, màn hình, app đã cài).
+Kết quả được ghi vào output/devices.json và dùng lại trong DEVICE_CACHE_TTL
+giây, kể cả ở tiến trình suite sau, nên thường chỉ suite đầu tiên gọi adb.
+start_monitor() kiểm tra lại định kỳ trên thread nền (parallel_runner bật nó
+trong suốt lần chạy để biết thiết bị nào hỏng giữa chừng).
+
+acquire(serial) trả về thiết bị nếu nó khỏe, nếu không thì báo
+DeviceUnavailableError ngay thay vì để suite thử kết nối Appium vào một
+thiết bị đã chết. Màn hình tắt chỉ là cảnh báo vì UiAutomator2 tự bật màn
+hình khi tạo phiên.
+
+    python device_manager.py            # danh sách thiết bị và tình trạng
+    python device_manager.py --refresh  # bỏ qua cache
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shlex
+import subprocess
+import threading
+import time
+from appium_session import ADB, APP_PACKAGE
+from harness_log import get_logger
+
+log = get_logger("device_manager")
+
+DEVICE_CACHE_PATH = os.path.join("output", "devices.json")
+DEVICE_CACHE_TTL = float(os.environ.get("DEVICE_CACHE_TTL", "60"))
+DEVICE_HEALTH_INTERVAL = float(os.environ.get("DEVICE_HEALTH_INTERVAL", "30"))
+MIN_BATTERY = int(os.environ.get("DEVICE_MIN_BATTERY", "15"))
+# Một lệnh shell cho mọi kiểm tra; `;` để lệnh sau vẫn chạy khi lệnh trước lỗi
+HEALTH_COMMAND = ("dumpsys battery | grep -E 'level:|powered:'; dumpsys power | grep mWakefulness=; "
+                  "pm path {package}")
+
+
+class DeviceUnavailableError(Exception):
+    """Thiết bị không có, offline hoặc không đủ điều kiện chạy test"""
+
+
+class Device:
+    """Trạng thái adb và kết quả kiểm tra sức khỏe gần nhất của một thiết bị"""
+
+    FIELDS = ("serial", "state", "model", "battery", "charging", "screen_on", "installed", "checked_at")
+
+    def __init__(self, serial, state, model="", battery=None, charging=False, screen_on=None, installed=None,
+                 checked_at=None):
+        self.serial = serial
+        self.state = state
+        self.model = model
+        self.battery = battery
+        self.charging = charging
+        self.screen_on = screen_on
+        self.installed = installed
+        self.checked_at = checked_at
+
+    def problem(self, min_battery=MIN_BATTERY):
+        """Lý do không dùng được thiết bị, None nếu dùng được"""
+        if self.state != "device":
+            return f"{self.serial} is {self.state}"
+        if self.installed is False:
+            return f"{APP_PACKAGE} is not installed on {self.serial}"
+        if self.battery is not None and self.battery < min_battery and not self.charging:
+            return f"battery of {self.serial} is low ({self.battery}%)"
+        return None
+
+    @property
+    def healthy(self):
+        return self.problem() is None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in cls.FIELDS})
+
+    def __str__(self):
+        details = [self.model or "unknown model"]
+        if self.battery is not None:
+            details.append(f"battery {self.battery}%{' charging' if self.charging else ''}")
+        if self.screen_on is not None:
+            details.append(f"screen {'on' if self.screen_on else 'off'}")
+        return f"{self.serial} ({', '.join(details)})"
+
+
+def parse_devices(output):
+    """Đọc kết quả `adb devices -l` thành {serial: Device}"""
+    devices = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) < 2 or line.startswith(("List of devices", "*")):
+            continue
+        model = next((part.split(":", 1)[1] for part in parts[2:] if part.startswith("model:")), "")
+        devices[parts[0]] = Device(parts[0], parts[1], model)
+    return devices
+
+
+def parse_health(device, output):
+    """Cập nhật pin, màn hình, app đã cài từ kết quả HEALTH_COMMAND"""
+    level = re.search(r"level:\s*(\d+)", output)
+    device.battery = int(level.group(1)) if level else None
+    device.charging = bool(re.search(r"(AC|USB|Wireless) powered:\s*true", output))
+    wakefulness = re.search(r"mWakefulness=(\w+)", output)
+    device.screen_on = wakefulness.group(1) == "Awake" if wakefulness else None
+    device.installed = "package:" in output
+    device.checked_at = time.time()
+    return device
+
+
+class DeviceManager:
+    """Danh sách thiết bị dùng chung: cache theo TTL, kiểm tra nền, cho mượn/trả thiết bị"""
+
+    def __init__(self, adb=ADB, package=APP_PACKAGE, cache_path=DEVICE_CACHE_PATH, ttl=DEVICE_CACHE_TTL,
+                 min_battery=MIN_BATTERY):
+        self.adb = adb
+        self.package = package
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.min_battery = min_battery
+        self.devices = {}
+        self.discovered_at = None
+        self.leases = set()
+        self.spawns = 0
+        self.lock = threading.RLock()
+        self._stop = threading.Event()
+        self._monitor = None
+        self._load_cache()
+
+    def _fresh(self, timestamp):
+        return timestamp is not None and time.time() - timestamp < self.ttl
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.devices = {serial: Device.from_dict(device) for serial, device in data["devices"].items()}
+            self.discovered_at = data["discovered_at"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.devices, self.discovered_at = {}, None
+
+    def _save_cache(self):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"discovered_at": self.discovered_at,
+                       "devices": {serial: device.to_dict() for serial, device in self.devices.items()}}, f, indent=2)
+        os.replace(temp_path, self.cache_path)
+
+    def _run(self, *args, serial=None):
+        """Chạy một lệnh adb, trả về (exit code, stdout + stderr)"""
+        command = self.adb + (f" -s {shlex.quote(serial)}" if serial else "") + " " + " ".join(map(shlex.quote, args))
+        self.spawns += 1
+        process = subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        return process.returncode, process.stdout.decode("utf-8", "replace")
+
+    def discover(self, force=False):
+        """Danh sách thiết bị adb thấy, dùng cache nếu còn mới"""
+        with self.lock:
+            if force or not self._fresh(self.discovered_at):
+                code, output = self._run("devices", "-l")
+                if code != 0:
+                    raise DeviceUnavailableError(f"Error running adb ({self.adb}): {output.strip()}")
+                found = parse_devices(output)
+                for serial, device in found.items():
+                    previous = self.devices.get(serial)
+                    if previous is not None and previous.state == device.state:
+                        # Giữ kết quả kiểm tra sức khỏe, chỉ cập nhật danh sách
+                        previous.model = device.model or previous.model
+                        found[serial] = previous
+                self.devices = found
+                self.discovered_at = time.time()
+                self._save_cache()
+            return list(self.devices.values())
+
+    def check(self, serial, force=False):
+        """Kiểm tra sức khỏe một thiết bị (một lệnh adb shell), dùng cache nếu còn mới"""
+        with self.lock:
+            self.discover(force=force)
+            device = self.devices.get(serial)
+            return Device(serial, "missing") if device is None else self._check_health(device, force)
+
+    def _check_health(self, device, force):
+        if device.state != "device" or (not force and self._fresh(device.checked_at)):
+            return device
+        code, output = self._run("shell", HEALTH_COMMAND.format(package=self.package), serial=device.serial)
+        if code != 0 and "package:" not in output and "level:" not in output:
+            # Thiết bị vừa mất kết nối: cập nhật lại danh sách
+            self.discover(force=True)
+            return self.devices.get(device.serial) or Device(device.serial, "missing")
+        parse_health(device, output)
+        self._save_cache()
+        return device
+
+    def healthy(self, force=False):
+        """Các thiết bị dùng được"""
+        with self.lock:
+            return [device for device in self.discover(force)
+                    if self._check_health(device, force).problem(self.min_battery) is None]
+
+    def problems(self, serials, since=None):
+        """{serial: lý do} cho các thiết bị không dùng được, chỉ khi danh sách được làm mới sau `since`"""
+        with self.lock:
+            if since is not None and (self.discovered_at is None or self.discovered_at < since):
+                return {}
+            found = {}
+            for serial in serials:
+                problem = (self.devices.get(serial) or Device(serial, "missing")).problem(self.min_battery)
+                if problem:
+                    found[serial] = problem
+            return found
+
+    def apk_digest(self, serial):
+        """sha256 của các file APK (kể cả split APK) của app đã cài, None nếu không đọc được"""
+        code, output = self._run("shell", f"pm path {self.package}", serial=serial)
+        paths = [line.split(":", 1)[1].strip() for line in output.splitlines() if line.startswith("package:")]
+        if code != 0 or not paths:
+            return None
+        code, output = self._run("shell", "sha256sum " + " ".join(paths), serial=serial)
+        sums = [line.split()[0] for line in output.splitlines() if line.strip()]
+        if code != 0 or len(sums) != len(paths):
+            return None
+        return hashlib.sha256(" ".join(sums).encode("utf-8")).hexdigest()
+
+    def reverse(self, serial, port):
+        """adb reverse tcp:port: trên thiết bị 127.0.0.1:port đi tới máy chạy test, trả về (exit code, output)"""
+        return self._run("reverse", f"tcp:{port}", f"tcp:{port}", serial=serial)
+
+    def acquire(self, serial=None):
+        """Cho mượn thiết bị `serial` (hoặc thiết bị khỏe đầu tiên còn rảnh), báo lỗi ngay nếu không dùng được"""
+        with self.lock:
+            if serial is None:
+                free = [device for device in self.healthy() if device.serial not in self.leases]
+                if not free:
+                    raise DeviceUnavailableError("No healthy device is free")
+                device = free[0]
+            else:
+                device = self.check(serial)
+                if device.state == "missing":
+                    seen = ", ".join(self.devices) or "none"
+                    raise DeviceUnavailableError(f"Device {serial} not found (adb sees: {seen})")
+                problem = device.problem(self.min_battery)
+                if problem:
+                    raise DeviceUnavailableError(f"Device {serial} is not usable: {problem}")
+                if serial in self.leases:
+                    raise DeviceUnavailableError(f"Device {serial} is already in use")
+            self.leases.add(device.serial)
+            return device
+
+    def release(self, serial):
+        with self.lock:
+            self.leases.discard(serial)
+
+    def report_failure(self, serial, reason=""):
+        """Không kết nối được qua thiết bị: bỏ cache để lần sau kiểm tra lại bằng adb"""
+        with self.lock:
+            device = self.devices.get(serial)
+            if device is not None:
+                device.checked_at = None
+            self.discovered_at = None
+            self._save_cache()
+        log.warning("⚠️ Device %s marked for re-check%s", serial, ': ' + reason if reason else '')
+
+    def start_monitor(self, interval=DEVICE_HEALTH_INTERVAL):
+        """Kiểm tra lại mọi thiết bị định kỳ trên thread nền"""
+        if self._monitor is not None:
+            return self
+
+        def monitor():
+            while not self._stop.wait(interval):
+                try:
+                    self.healthy(force=True)
+                except DeviceUnavailableError as e:
+                    log.warning("⚠️ Device health check failed: %s", e)
+
+        self._stop.clear()
+        self._monitor = threading.Thread(target=monitor, name="device-monitor", daemon=True)
+        self._monitor.start()
+        return self
+
+    def stop_monitor(self):
+        if self._monitor is not None:
+            self._stop.set()
+            self._monitor.join()
+            self._monitor = None
+
+
+# Manager dùng chung trong một tiến trình (các class test lấy thiết bị từ đây)
+_pool = None
+
+
+def device_pool():
+    global _pool
+    if _pool is None:
+        _pool = DeviceManager()
+    return _pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List devices and their health")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cache and ask adb again")
+    args = parser.parse_args()
+    manager = device_pool()
+    for device in manager.discover(args.refresh):
+        device = manager.check(device.serial, args.refresh)
+        problem = device.problem(manager.min_battery)
+        print(f"{'✅' if problem is None else '❌'} {device}" + (f": {problem}" if problem else ""))
+    print(f"🔧 {manager.spawns} adb call(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Kiểm tra device_manager với fake_adb (không cần adb hay thiết bị thật).
+
+    python -m unittest device_manager_test
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+from appium_session import APP_PACKAGE
+from device_manager import DeviceManager, DeviceUnavailableError
+
+FAKE_ADB = f'"{sys.executable}" "{os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_adb.py")}"'
+HEALTHY = {"state": "device", "model": "Pixel_6", "battery": 80, "screen_on": True, "packages": [APP_PACKAGE]}
+
+
+class TestDeviceManager(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.state_path = os.path.join(directory.name, "state.json")
+        self.cache_path = os.path.join(directory.name, "output", "devices.json")
+        self.log_path = os.path.join(directory.name, "adb.log")
+        self.write_state({
+            "phone": HEALTHY,
+            "emulator-5554": dict(HEALTHY, model="sdk_gphone64", screen_on=False),
+            "flat": dict(HEALTHY, battery=5),
+            "no-app": dict(HEALTHY, packages=[]),
+            "cable": {"state": "offline"},
+        })
+        patcher = mock.patch.dict(os.environ, FAKE_ADB_STATE=self.state_path, FAKE_ADB_LOG=self.log_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_state(self, state):
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+
+    def manager(self, **options):
+        return DeviceManager(adb=FAKE_ADB, cache_path=self.cache_path, **options)
+
+    def adb_calls(self):
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_discovers_and_checks_health(self):
+        manager = self.manager()
+        self.assertEqual(sorted(d.serial for d in manager.healthy()), ["emulator-5554", "phone"])
+        self.assertIn("is offline", manager.check("cable").problem())
+        self.assertIn("battery", manager.check("flat").problem())
+        self.assertIn("not installed", manager.check("no-app").problem())
+        phone = manager.check("phone")
+        self.assertEqual((phone.model, phone.battery, phone.screen_on), ("Pixel_6", 80, True))
+        # Một lần adb devices và một lần adb shell cho mỗi thiết bị online
+        self.assertEqual(len(self.adb_calls()), 5)
+
+    def test_cache_is_shared_between_processes(self):
+        self.manager().acquire("phone")
+        calls = len(self.adb_calls())
+        device = self.manager().acquire("phone")  # manager mới như một suite khác đọc lại cache
+        self.assertEqual(device.battery, 80)
+        self.assertEqual(len(self.adb_calls()), calls)
+
+    def test_expired_cache_asks_adb_again(self):
+        self.manager().acquire("phone")
+        calls = len(self.adb_calls())
+        self.manager(ttl=0).acquire("phone")
+        self.assertEqual(len(self.adb_calls()), calls + 2)
+
+    def test_dead_device_fails_without_appium(self):
+        manager = self.manager()
+        for serial, message in [("cable", "offline"), ("flat", "low"), ("missing", "not found")]:
+            with self.assertRaisesRegex(DeviceUnavailableError, message):
+                manager.acquire(serial)
+
+    def test_leases(self):
+        manager = self.manager()
+        first = manager.acquire()
+        second = manager.acquire()
+        self.assertNotEqual(first.serial, second.serial)
+        with self.assertRaisesRegex(DeviceUnavailableError, "No healthy device"):
+            manager.acquire()
+        with self.assertRaisesRegex(DeviceUnavailableError, "in use"):
+            manager.acquire(first.serial)
+        manager.release(first.serial)
+        self.assertEqual(manager.acquire().serial, first.serial)
+
+    def test_apk_digest_changes_with_the_installed_build(self):
+        manager = self.manager()
+        first = manager.apk_digest("phone")
+        self.assertEqual(manager.apk_digest("phone"), first)
+        self.write_state({"phone": dict(HEALTHY, build=2), "no-app": dict(HEALTHY, packages=[])})
+        self.assertNotEqual(manager.apk_digest("phone"), first)
+        self.assertIsNone(manager.apk_digest("no-app"))
+
+    def test_reverse_quotes_the_serial(self):
+        manager = self.manager()
+        self.assertEqual(manager.reverse("phone", 8765), (0, ""))
+        marker = os.path.join(os.path.dirname(self.log_path), "injected")
+        code, output = manager.reverse(f"phone; touch {marker}", 8765)
+        self.assertEqual(code, 1)
+        self.assertIn("not found", output)
+        self.assertFalse(os.path.exists(marker))
+        self.assertEqual(self.adb_calls(), ["-s phone reverse tcp:8765 tcp:8765",
+                                            f"-s phone; touch {marker} reverse tcp:8765 tcp:8765"])
+
+    def test_forced_check_sees_device_going_offline(self):
+        manager = self.manager()
+        manager.acquire("phone")
+        self.write_state({"phone": {"state": "offline"}})
+        self.assertIn("offline", manager.check("phone", force=True).problem())
+        # Sau khi báo lỗi, suite sau phải hỏi lại adb thay vì tin cache
+        self.write_state({"phone": HEALTHY})
+        manager.report_failure("phone")
+        self.assertTrue(self.manager().check("phone").healthy)
+
+    def test_monitor_reports_device_lost_during_run(self):
+        manager = self.manager()
+        manager.acquire("phone")
+        since = time.time()
+        self.assertEqual(manager.problems(["phone"], since), {})
+        self.write_state({"phone": {"state": "offline"}, "emulator-5554": HEALTHY})
+        manager.start_monitor(interval=0.05)
+        self.addCleanup(manager.stop_monitor)
+        deadline = time.time() + 10
+        while not manager.problems(["phone"], since) and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(manager.problems(["phone", "emulator-5554", "gone"], since),
+                         {"phone": "phone is offline", "gone": "gone is missing"})
+
+
+if __name__ == "__main__":
+    unittest.main()
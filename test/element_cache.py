@@ -0,0 +1,157 @@
+import hashlib
+import time
+from lxml import etree
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException
+from appium.webdriver.common.appiumby import AppiumBy
+from waits import DEFAULT_STEP_TIMEOUT, wait_for
+from harness_log import get_logger
+
+log = get_logger("element_cache")
+
+# Click vào các class này không làm đổi màn hình (chỉ focus để nhập liệu)
+NON_NAVIGATING_CLASSES = {"android.widget.EditText"}
+
+
+def structure_signature(root):
+    """Chữ ký màn hình từ các phần tử tương tác được (bỏ qua text đã nhập và thông báo)"""
+    digest = hashlib.md5()
+    for node in root.iter():
+        if node.get("clickable") == "true" or node.get("focusable") == "true":
+            digest.update(f"{node.get('class')}|{node.get('content-desc')}|{node.get('resource-id')}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CachedElement:
+    """Bọc WebElement trong cache: tự tìm lại khi stale, click thì đánh dấu màn hình có thể đã đổi"""
+
+    def __init__(self, cache, key, element, condition, navigates=True):
+        self._cache = cache
+        self._key = key
+        self._element = element
+        self._condition = condition
+        self._navigates = navigates
+
+    def _call(self, name, *args, **kwargs):
+        try:
+            return getattr(self._element, name)(*args, **kwargs)
+        except StaleElementReferenceException:
+            self._element = self._cache.refind(self._key, self._condition)
+            return getattr(self._element, name)(*args, **kwargs)
+
+    def click(self):
+        result = self._call("click")
+        if self._navigates:
+            self._cache.screen_changed()
+        return result
+
+    def __getattr__(self, name):
+        attribute = getattr(self._element, name)
+        if not callable(attribute):
+            return attribute
+        return lambda *args, **kwargs: self._call(name, *args, **kwargs)
+
+
+class ElementCache:
+    """Cache phần tử theo (chữ ký màn hình, locator), có đếm hit/miss.
+
+    Chữ ký màn hình chỉ được tính lại (một lần page_source) sau khi có
+    click, back hoặc swipe; nếu màn hình không đổi thì các phần tử đã tìm
+    vẫn được dùng lại mà không cần gọi find_element.
+    """
+
+    def __init__(self, driver, timeout=DEFAULT_STEP_TIMEOUT, snapshot=None):
+        self.driver = driver
+        self.timeout = timeout
+        self.snapshot = snapshot
+        self.entries = {}
+        self.signature = None
+        self.root = None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.miss_time = 0.0
+        self.signature_time = 0.0
+
+    def screen_signature(self):
+        if self.signature is None:
+            start = time.perf_counter()
+            if self.snapshot is not None:
+                root = self.snapshot.root if not self.snapshot.is_stale else self.snapshot.refresh()
+            else:
+                root = etree.fromstring(self.driver.page_source.encode("utf-8"))
+            self.root = root
+            self.signature = structure_signature(root)
+            self.signature_time += time.perf_counter() - start
+        return self.signature
+
+    def screen_changed(self):
+        """Màn hình có thể đã đổi: lần tìm sau sẽ tính lại chữ ký"""
+        self.signature = None
+        self.root = None
+        if self.snapshot is not None:
+            self.snapshot.invalidate()
+
+    def invalidate(self):
+        """Xóa toàn bộ cache (ví dụ sau khi khởi động lại app)"""
+        self.entries.clear()
+        self.screen_changed()
+
+    def back(self):
+        self.driver.back()
+        self.screen_changed()
+
+    def swipe(self, *args, **kwargs):
+        self.driver.swipe(*args, **kwargs)
+        self.screen_changed()
+
+    def _navigates(self, by, value):
+        """Đoán click vào locator có thể chuyển màn hình không, dựa trên page source đã có"""
+        if by != AppiumBy.XPATH or self.root is None:
+            return True
+        try:
+            nodes = self.root.xpath(value)
+        except etree.XPathError:
+            return True
+        return not nodes or nodes[0].get("class") not in NON_NAVIGATING_CLASSES
+
+    def find(self, by, value, condition=EC.presence_of_element_located, timeout=None):
+        """Tìm phần tử, dùng lại kết quả nếu màn hình hiện tại đã tìm locator này"""
+        key = (self.screen_signature(), by, value)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return CachedElement(self, key, entry[0], condition, entry[1])
+        self.misses += 1
+        navigates = self._navigates(by, value)
+        start = time.perf_counter()
+        element = wait_for(self.driver, condition((by, value)), self.timeout if timeout is None else timeout)
+        self.miss_time += time.perf_counter() - start
+        self.entries[key] = (element, navigates)
+        return CachedElement(self, key, element, condition, navigates)
+
+    def refind(self, key, condition):
+        """Phần tử đã stale: bỏ khỏi cache và tìm lại trên màn hình hiện tại"""
+        self.stale += 1
+        self.entries.pop(key, None)
+        self.screen_changed()
+        _, by, value = key
+        return self.find(by, value, condition)._element
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        avg_miss = self.miss_time / self.misses if self.misses else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "avg_miss_time": avg_miss,
+            # Thời gian tính chữ ký màn hình là chi phí của cache
+            "saved": self.hits * avg_miss - self.signature_time,
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        log.info("🗃️ Element cache: %s hit(s), %s miss(es), %s stale, hit rate %.0f%%, saved ~%.1fs of lookups",
+                 stats["hits"], stats["misses"], stats["stale"], stats["hit_rate"] * 100, stats["saved"])
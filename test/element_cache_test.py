@@ -0,0 +1,60 @@
+"""Kiểm tra element_cache trên fake_appium: hit/miss theo chữ ký màn hình, tìm lại phần tử stale.
+
+    python -m unittest element_cache_test
+"""
+import unittest
+from appium.webdriver.common.appiumby import AppiumBy
+from element_cache import ElementCache
+from fake_session import FakeAppiumTestCase
+
+EMAIL = "(//android.widget.EditText)[1]"
+CREATE_ACCOUNT = "//android.widget.Button[@content-desc='Create an account']"
+BACK_TO_LOGIN = "//android.widget.Button[@content-desc='Already have an account? Login']"
+
+
+class TestElementCache(FakeAppiumTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ElementCache(self.driver, timeout=2)
+
+    def test_same_screen_reuses_elements(self):
+        self.cache.find(AppiumBy.XPATH, EMAIL).click()
+        self.cache.find(AppiumBy.XPATH, EMAIL).send_keys("user@example.com")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual((self.commands()["findElement"], self.commands()["getPageSource"]), (1, 1))
+        self.assertEqual(self.cache.stats()["hit_rate"], 0.5)
+
+    def test_navigating_click_invalidates_signature(self):
+        login = self.cache.screen_signature()
+        self.cache.find(AppiumBy.XPATH, EMAIL).click()
+        # Click vào EditText chỉ focus, không cần tính lại chữ ký
+        self.assertEqual(self.cache.signature, login)
+        self.cache.find(AppiumBy.XPATH, CREATE_ACCOUNT).click()
+        self.assertIsNone(self.cache.signature)
+        self.cache.find(AppiumBy.XPATH, EMAIL)
+        self.assertNotEqual(self.cache.signature, login)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 3))
+        self.assertEqual(self.commands()["getPageSource"], 2)
+
+    def test_stale_element_is_found_again(self):
+        email = self.cache.find(AppiumBy.XPATH, EMAIL)
+        # Màn hình được vẽ lại mà cache không biết: phần tử cũ đã stale
+        self.driver.find_element(AppiumBy.XPATH, CREATE_ACCOUNT).click()
+        self.driver.find_element(AppiumBy.XPATH, BACK_TO_LOGIN).click()
+        self.cache.find(AppiumBy.XPATH, EMAIL).send_keys("user@example.com")
+        self.assertEqual((self.cache.stale, self.cache.misses), (1, 2))
+        self.assertEqual(self.driver.find_element(AppiumBy.XPATH, EMAIL).text, "user@example.com")
+        # Wrapper giữ phần tử cũ cũng tự tìm lại
+        email.clear()
+        self.assertEqual(self.cache.stale, 2)
+        self.assertEqual(self.driver.find_element(AppiumBy.XPATH, EMAIL).text, "")
+
+    def test_invalidate_clears_entries(self):
+        self.cache.find(AppiumBy.XPATH, EMAIL)
+        self.cache.invalidate()
+        self.cache.find(AppiumBy.XPATH, EMAIL)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
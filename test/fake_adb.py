@@ -0,0 +1,102 @@
+"""adb giả lập cho harness: trả lời các lệnh adb mà device_manager và fake_api dùng.
+
+Dùng thay adb thật qua biến môi trường ADB:
+    ADB="python fake_adb.py" python addproduct_test.py
+
+Trạng thái thiết bị đọc từ file JSON ($FAKE_ADB_STATE, mặc định
+fixtures/fake_adb/devices.json):
+    {"b9fff218": {"state": "device", "model": "Pixel_6", "battery": 87,
+                  "screen_on": true, "packages": ["com.example.flutter_shop"], "build": 1}}
+
+Hỗ trợ: `devices [-l]`, `-s SERIAL shell "<lệnh>; <lệnh>"` với dumpsys battery,
+dumpsys power, pm path, sha256sum (đổi "build" để giả lập cài APK mới), và
+`-s SERIAL reverse ...`. Nếu có
+$FAKE_ADB_LOG thì mỗi lần gọi ghi thêm một dòng để test đếm số tiến trình adb.
+"""
+import hashlib
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STATE = os.path.join(HERE, "fixtures", "fake_adb", "devices.json")
+
+
+def load_state(path=None):
+    with open(path or os.environ.get("FAKE_ADB_STATE") or DEFAULT_STATE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _devices(state, long_format):
+    lines = ["List of devices attached"]
+    for serial, device in state.items():
+        line = f"{serial}\t{device.get('state', 'device')}"
+        if long_format and device.get("state", "device") == "device":
+            model = device.get("model", "Android")
+            line += f" product:{model.lower()} model:{model} device:{model.lower()} transport_id:{len(lines)}"
+        lines.append(line)
+    return "\n".join(lines) + "\n\n"
+
+
+def _shell(device, command):
+    """Kết quả giống adb shell cho các lệnh harness dùng, lệnh khác không in gì"""
+    output = []
+    for part in (p.strip() for p in command.split(";")):
+        if part.startswith("dumpsys battery"):
+            output.append(f"Current Battery Service state:\n  AC powered: {str(device.get('charging', False)).lower()}\n"
+                          f"  level: {device.get('battery', 100)}\n  scale: 100")
+        elif part.startswith("dumpsys power"):
+            output.append(f"  mWakefulness={'Awake' if device.get('screen_on', True) else 'Asleep'}")
+        elif part.startswith("pm path "):
+            package = part.split()[2]
+            if package in device.get("packages", []):
+                output.append(f"package:/data/app/{package}-1/base.apk")
+        elif part.startswith("sha256sum "):
+            for path in part.split()[1:]:
+                digest = hashlib.sha256(f"{path}:{device.get('build', 1)}".encode("utf-8")).hexdigest()
+                output.append(f"{digest}  {path}")
+    return "\n".join(output) + "\n" if output else ""
+
+
+def run(argv, state):
+    """Trả về (exit code, stdout, stderr) cho một lệnh adb"""
+    serial = None
+    if argv[:1] == ["-s"]:
+        serial, argv = argv[1], argv[2:]
+    if not argv:
+        return 1, "", "adb: no command given\n"
+    command, args = argv[0], argv[1:]
+    if command == "devices":
+        return 0, _devices(state, "-l" in args), ""
+    if command == "start-server":
+        return 0, "", ""
+    if serial is None:
+        online = [s for s, d in state.items() if d.get("state", "device") == "device"]
+        if len(online) != 1:
+            return 1, "", "adb: more than one device/emulator\n" if online else "adb: no devices/emulators found\n"
+        serial = online[0]
+    device = state.get(serial)
+    if device is None:
+        return 1, "", f"adb: device '{serial}' not found\n"
+    if device.get("state", "device") != "device":
+        return 1, "", f"adb: device {device['state']}\n"
+    if command == "shell":
+        return 0, _shell(device, " ".join(args)), ""
+    if command == "reverse":
+        return 0, "", ""
+    return 1, "", f"adb: unknown command {command}\n"
+
+
+def main():
+    log = os.environ.get("FAKE_ADB_LOG")
+    if log:
+        with open(log, "a", encoding="utf-8") as f:
+            f.write(" ".join(sys.argv[1:]) + "\n")
+    code, out, err = run(sys.argv[1:], load_state())
+    sys.stdout.write(out)
+    sys.stderr.write(err)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""Backend REST LirisFlora giả lập chạy local, dữ liệu cố định.
+
+Chạy thay cho https://express-lirisflora-api.onrender.com/api:
+    python fake_api.py --port 5000 --latency lognormal:0.08:0.6 --error-rate 0.02 --cold-start 20
+
+Phục vụ các endpoint mà lib/services (auth_service, product_service,
+category_service, cart_service) và màn hình đơn hàng gọi tới: đăng ký,
+đăng nhập, current_user, xóa tài khoản, sản phẩm, danh mục và đơn hàng.
+Sản phẩm/danh mục đọc từ fixtures/fake_api/, tài khoản và đơn hàng giữ
+trong bộ nhớ. GET /fake/stats trả về số request đã nhận theo endpoint.
+
+Mô phỏng mạng/backend chậm: độ trễ theo phân phối (chung hoặc theo từng
+endpoint), tỉ lệ lỗi 5xx và cold start kiểu Render (request đầu tiên, hoặc
+request sau một khoảng nghỉ, phải chờ server "thức dậy"). Dùng --seed để
+các lần chạy lặp lại y hệt; POST /fake/config đổi cấu hình khi đang chạy.
+
+Trong harness: MOCK_API=1 thì suite tự bật server này (start_mock_api), chạy
+adb reverse để app trên thiết bị gọi được 127.0.0.1:MOCK_API_PORT và trỏ
+API_URL của api_fixtures vào nó. App cần build với
+    flutter build apk --debug --dart-define=API_URL=http://127.0.0.1:5000/api
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from harness_log import get_logger
+
+log = get_logger("fake_api")
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "fake_api")
+API_PREFIX = "/api"
+# Bật server cho run (xem start_mock_api), cấu hình giống tham số dòng lệnh
+MOCK_API = os.environ.get("MOCK_API", "0") == "1"
+MOCK_API_PORT = int(os.environ.get("MOCK_API_PORT", "5000"))
+MOCK_API_LATENCY = os.environ.get("MOCK_API_LATENCY", "0")
+MOCK_API_ENDPOINT_LATENCY = os.environ.get("MOCK_API_ENDPOINT_LATENCY", "")
+MOCK_API_ERROR_RATE = float(os.environ.get("MOCK_API_ERROR_RATE", "0"))
+MOCK_API_COLD_START = float(os.environ.get("MOCK_API_COLD_START", "0"))
+MOCK_API_SEED = os.environ.get("MOCK_API_SEED", "")
+
+
+class ApiError(Exception):
+    """Phản hồi lỗi của backend: HTTP status và body JSON"""
+
+    def __init__(self, status, body):
+        super().__init__(body)
+        self.status = status
+        self.body = body
+
+
+class LatencyModel:
+    """Độ trễ một request (giây) theo phân phối:
+    "0.05" cố định, "uniform:MIN:MAX", "normal:MEAN:STDDEV", "lognormal:MEDIAN:SIGMA", "exp:MEAN"
+    """
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+
+    def __init__(self, spec="0"):
+        self.spec = str(spec)
+        kind, _, params = self.spec.partition(":")
+        if not params:
+            kind, params = "fixed", kind
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}', expected one of {sorted(self.KINDS)}")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(":")]
+        if len(self.params) != self.KINDS[kind]:
+            raise ValueError(f"Latency '{spec}' needs {self.KINDS[kind]} parameter(s)")
+
+    def sample(self, rng):
+        a = self.params[0]
+        if self.kind == "fixed":
+            value = a
+        elif self.kind == "uniform":
+            value = rng.uniform(a, self.params[1])
+        elif self.kind == "normal":
+            value = rng.gauss(a, self.params[1])
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(a), self.params[1]) if a > 0 else 0.0
+        else:
+            value = rng.expovariate(1 / a) if a > 0 else 0.0
+        return max(0.0, value)
+
+    def __repr__(self):
+        return self.spec
+
+
+def parse_endpoint_latency(spec):
+    """Đọc chuỗi 'products=uniform:0.1:0.5,login=0.3' thành {endpoint: LatencyModel}"""
+    latency = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, model = item.partition("=")
+        latency[name.strip()] = LatencyModel(model.strip())
+    return latency
+
+
+def load_fixture(name, fixtures_dir=FIXTURES_DIR):
+    with open(os.path.join(fixtures_dir, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeApiServer:
+    """Server giả lập có thể chạy trong tiến trình test hoặc từ dòng lệnh"""
+
+    def __init__(self, host="127.0.0.1", port=5000, latency="0", endpoint_latency=None, error_rate=0.0,
+                 error_status=503, cold_start=0.0, idle_timeout=0.0, seed=None,
+                 fixtures_dir=FIXTURES_DIR, verbose=False):
+        self.products = load_fixture("products", fixtures_dir)
+        self.categories = load_fixture("categories", fixtures_dir)
+        self.latency = LatencyModel(latency)
+        self.endpoint_latency = dict(endpoint_latency or {})
+        self.error_rate = error_rate
+        self.error_status = error_status
+        # cold_start: thời gian "thức dậy" của request đầu tiên, lặp lại sau idle_timeout giây không có request
+        self.cold_start = cold_start
+        self.idle_timeout = idle_timeout
+        self.rng = random.Random(seed)
+        self.verbose = verbose
+        self.last_request = None
+        self.warm_at = 0.0
+        self.faults = Counter()
+        self.users = {}     # email -> user (kèm password)
+        self.tokens = {}    # access token -> email
+        self.orders = []
+        self.requests = Counter()
+        self.lock = threading.RLock()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        """Base URL như ApiService.baseUrl (đã gồm /api)"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        """Chạy server trên thread nền"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stats(self):
+        with self.lock:
+            return {"total": sum(self.requests.values()), "requests": dict(self.requests),
+                    "errors": self.faults["errors"], "cold_starts": self.faults["cold_starts"]}
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests.clear()
+            self.faults.clear()
+
+    def configure(self, latency=None, endpoint_latency=None, error_rate=None, error_status=None,
+                  cold_start=None, idle_timeout=None, seed=None):
+        """Đổi cấu hình mô phỏng khi đang chạy (chỉ các tham số khác None)"""
+        with self.lock:
+            if latency is not None:
+                self.latency = LatencyModel(latency)
+            if endpoint_latency is not None:
+                self.endpoint_latency = parse_endpoint_latency(endpoint_latency)
+            if error_rate is not None:
+                self.error_rate = float(error_rate)
+            if error_status is not None:
+                self.error_status = int(error_status)
+            if cold_start is not None:
+                self.cold_start = float(cold_start)
+                self.last_request = None  # Request tiếp theo chịu cold start
+            if idle_timeout is not None:
+                self.idle_timeout = float(idle_timeout)
+            if seed is not None:
+                self.rng.seed(seed)
+            return self.config()
+
+    def config(self):
+        return {"latency": repr(self.latency),
+                "endpoint_latency": {name: repr(model) for name, model in self.endpoint_latency.items()},
+                "error_rate": self.error_rate, "error_status": self.error_status,
+                "cold_start": self.cold_start, "idle_timeout": self.idle_timeout}
+
+    def _simulate(self, name):
+        """Cold start + độ trễ + lỗi ngẫu nhiên cho một request, trả về True nếu request bị lỗi"""
+        with self.lock:
+            now = time.monotonic()
+            idle = (self.last_request is not None and self.idle_timeout
+                    and now - self.last_request > self.idle_timeout)
+            if self.cold_start and (self.last_request is None or idle) and now >= self.warm_at:
+                self.warm_at = now + self.cold_start
+                self.faults["cold_starts"] += 1
+            self.last_request = now
+            # Request đến trong lúc server đang "thức dậy" cũng phải chờ
+            delay = max(0.0, self.warm_at - now)
+            delay += self.endpoint_latency.get(name, self.latency).sample(self.rng)
+            failed = self.error_rate > 0 and self.rng.random() < self.error_rate
+            if failed:
+                self.faults["errors"] += 1
+        if delay:
+            time.sleep(delay)
+        return failed
+
+    def current_user(self, headers):
+        """User của header Authorization: Bearer <token>, lỗi 401 nếu không hợp lệ"""
+        token = (headers.get("Authorization") or "").removeprefix("Bearer ").strip()
+        email = self.tokens.get(token)
+        if email is None or email not in self.users:
+            raise ApiError(401, {"error": "Unauthorized"})
+        return self.users[email]
+
+    def dispatch(self, method, path, body, headers):
+        """Xử lý một request, trả về (HTTP status, body)"""
+        for route_method, pattern, name, handler in ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(path)
+            if match:
+                if not name.startswith("fake") and self._simulate(name):
+                    with self.lock:
+                        self.requests[name] += 1
+                    raise ApiError(self.error_status, {"error": "Injected failure"})
+                with self.lock:
+                    if not name.startswith("fake"):
+                        self.requests[name] += 1
+                    return handler(self, body, headers, *match.groups())
+        with self.lock:
+            self.requests["unknown"] += 1
+        raise ApiError(404, {"error": f"Cannot {method} {path}"})
+
+
+def _public(user):
+    return {key: value for key, value in user.items() if key != "password"}
+
+
+def _register(server, body, headers):
+    name, email = body.get("name", ""), body.get("email", "")
+    password, confirm = body.get("password", ""), body.get("confirmPassword", "")
+    if not (name and email and password):
+        raise ApiError(400, {"message": "Missing required fields"})
+    if password != confirm:
+        raise ApiError(400, {"message": "Passwords do not match"})
+    if email in server.users:
+        raise ApiError(400, {"message": "User already exists!"})
+    user = {"_id": uuid.uuid4().hex[:24], "name": name, "email": email, "password": password}
+    server.users[email] = user
+    return 201, {"message": "User registered successfully", "user": _public(user)}
+
+
+def _login(server, body, headers):
+    user = server.users.get(body.get("email", ""))
+    if user is None or user["password"] != body.get("password"):
+        raise ApiError(401, {"error": "Invalid email or password"})
+    token = uuid.uuid4().hex
+    server.tokens[token] = user["email"]
+    return 200, {"accessToken": token}
+
+
+def _current_user(server, body, headers):
+    return 200, {"user": _public(server.current_user(headers))}
+
+
+def _delete_user(server, body, headers, user_id):
+    user = server.current_user(headers)
+    if user["_id"] != user_id:
+        raise ApiError(403, {"error": "Forbidden"})
+    del server.users[user["email"]]
+    for token in [t for t, email in server.tokens.items() if email == user["email"]]:
+        del server.tokens[token]
+    server.orders = [o for o in server.orders if o["order"]["customerId"] != user_id]
+    return 200, {"message": "User deleted"}
+
+
+def _create_order(server, body, headers):
+    user = server.current_user(headers)
+    if isinstance(body, str):
+        body = json.loads(body)  # CartService.submitOrder gửi chuỗi jsonEncode
+    order = {"order": {"_id": uuid.uuid4().hex[:24], "customerId": user["_id"],
+                       "userDetails": body.get("userDetails", {}), "orderDetails": body.get("orderDetails", {}),
+                       "items": body.get("items", [])}}
+    server.orders.append(order)
+    return 201, order
+
+
+def _list_orders(server, body, headers):
+    server.current_user(headers)
+    return 200, {"orders": server.orders}
+
+
+def _get_order(server, body, headers, order_id):
+    server.current_user(headers)
+    for order in server.orders:
+        if order["order"]["_id"] == order_id:
+            return 200, order
+    raise ApiError(404, {"error": "Order not found"})
+
+
+ROUTES = [
+    ("POST", r"/v1/register", "register", _register),
+    ("POST", r"/v1/login", "login", _login),
+    ("GET", r"/v1/current_user", "currentUser", _current_user),
+    ("DELETE", r"/v1/user/([^/]+)", "deleteUser", _delete_user),
+    ("GET", r"/product", "products", lambda server, body, headers: (200, {"data": server.products})),
+    ("GET", r"/category", "categories", lambda server, body, headers: (200, {"data": server.categories})),
+    ("POST", r"/order", "createOrder", _create_order),
+    ("GET", r"/order", "orders", _list_orders),
+    ("GET", r"/order/([^/]+)", "order", _get_order),
+    ("GET", r"/fake/stats", "fakeStats", lambda server, body, headers: (200, server.stats())),
+    ("POST", r"/fake/reset-stats", "fakeResetStats", lambda server, body, headers: (200, server.reset_stats())),
+    ("GET", r"/fake/config", "fakeConfig", lambda server, body, headers: (200, server.config())),
+    ("POST", r"/fake/config", "fakeConfigure", lambda server, body, headers: (200, server.configure(**body))),
+]
+ROUTES = [(method, re.compile(pattern), name, handler) for method, pattern, name, handler in ROUTES]
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _handle(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else {}
+                path = self.path.split("?")[0].rstrip("/")
+                path = re.sub(f"^{API_PREFIX}", "", path)
+                status, payload = server.dispatch(method, path, body, self.headers)
+            except ApiError as e:
+                status, payload = e.status, e.body
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def do_DELETE(self):
+            self._handle("DELETE")
+
+        def log_message(self, format, *args):
+            if server.verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+# Server do harness bật trong tiến trình hiện tại (một server cho mọi suite)
+_mock = None
+
+
+def start_mock_api(udid=None, port=MOCK_API_PORT):
+    """Bật fake_api cho run nếu MOCK_API=1 và trỏ API_URL vào nó, trả về server hoặc None"""
+    global _mock
+    if not MOCK_API:
+        return None
+    if _mock is None:
+        _mock = FakeApiServer(port=port, latency=MOCK_API_LATENCY,
+                              endpoint_latency=parse_endpoint_latency(MOCK_API_ENDPOINT_LATENCY),
+                              error_rate=MOCK_API_ERROR_RATE, cold_start=MOCK_API_COLD_START,
+                              seed=MOCK_API_SEED or None).start()
+        # api_fixtures và tiến trình con đọc API_URL
+        os.environ["API_URL"] = _mock.url
+        log.info("🌸 Mock API on %s (%s)", _mock.url, _mock.config())
+    if udid:
+        _reverse_port(udid, _mock.httpd.server_address[1])
+    return _mock
+
+
+def _reverse_port(udid, port):
+    """adb reverse: 127.0.0.1:port trên thiết bị đi tới server trên máy chạy test"""
+    # Import muộn: chạy fake_api.py độc lập không cần Appium client; serial được quote trong DeviceManager
+    from device_manager import device_pool
+    code, output = device_pool().reverse(udid, port)
+    if code != 0:
+        log.warning("⚠️ adb reverse tcp:%s failed, the app cannot reach the mock API: %s", port, output.strip())
+
+
+def stop_mock_api():
+    global _mock
+    server, _mock = _mock, None
+    if server is not None:
+        log.info("🌸 Mock API stats: %s", server.stats())
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the LirisFlora REST backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--latency", default="0",
+                        help="Latency per request: 0.05, uniform:MIN:MAX, normal:MEAN:SD, lognormal:MEDIAN:SIGMA, exp:MEAN")
+    parser.add_argument("--endpoint-latency", default="",
+                        help="Per-endpoint latency, e.g. products=uniform:0.1:0.5,login=0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected failures")
+    parser.add_argument("--cold-start", type=float, default=0.0, help="Delay in seconds before the first request")
+    parser.add_argument("--idle-timeout", type=float, default=0.0,
+                        help="Seconds without requests after which the next one cold-starts again (0: never)")
+    parser.add_argument("--seed", help="Random seed for latency and failures")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory with products.json / categories.json")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = FakeApiServer(args.host, args.port, args.latency, parse_endpoint_latency(args.endpoint_latency),
+                           args.error_rate, args.error_status, args.cold_start, args.idle_timeout, args.seed,
+                           args.fixtures, verbose=args.verbose)
+    print(f"🌸 Fake LirisFlora API listening on {server.url} ({server.config()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,679 @@
+"""Server Appium/WebDriver giả lập chạy local, dùng page source đã ghi lại.
+
+Chạy thay cho Appium thật trên localhost:4723:
+    python fake_appium.py --port 4723 --latency 0.05 --start login
+
+Server trả về XML trong fixtures/fake_appium/ cho các màn hình login,
+register, home, cart và checkout, đánh giá XPath trên XML đó và áp dụng
+các chuyển màn hình khai báo trong CLICK_TRANSITIONS / TYPE_TRANSITIONS
+khi click hoặc send_keys. Độ trễ mỗi lệnh có thể cấu hình để mô phỏng
+thiết bị thật. GET /fake/stats trả về số lệnh đã nhận theo từng loại.
+
+--startup N mô phỏng app khởi động chậm: trong N giây đầu của mỗi lần mở
+app, page source chỉ là màn hình chờ; hết thời gian đó logcat có dòng
+"Displayed ..." như ActivityTaskManager ghi khi Flutter vẽ frame đầu tiên.
+"""
+import argparse
+import base64
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from lxml import etree
+from validation_oracle import login_errors, register_errors
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "fake_appium")
+APP_PACKAGE = "com.example.flutter_shop"
+APP_ACTIVITY = ".MainActivity"
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+WINDOW_RECT = {"x": 0, "y": 0, "width": 1080, "height": 2340}
+# Đường dẫn deep link -> màn hình ghi lại (xem lib/services/deep_link_service.dart)
+DEEP_LINK_SCREENS = {"/home": "home", "/cart": "cart", "/checkout": "checkout",
+                     "/login": "login", "/register": "register"}
+# Màn hình chờ (launch theme) trước khi Flutter vẽ frame đầu tiên
+SPLASH_XML = (
+    '<hierarchy index="0" class="hierarchy" rotation="0" width="1080" height="2340">'
+    f'<android.widget.FrameLayout index="0" package="{APP_PACKAGE}" class="android.widget.FrameLayout" text="" '
+    'content-desc="" resource-id="android:id/content" clickable="false" enabled="true" focusable="false" '
+    'scrollable="false" bounds="[0,0][1080,2340]" displayed="true" /></hierarchy>'
+)
+# Ảnh PNG 1x1 trả về cho lệnh chụp màn hình
+BLANK_PNG = base64.b64encode(bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d49444154789c6360f8cfc0f01f0005000201d0b8c6a00000000049454e44ae426082"
+)).decode()
+
+# Tài khoản đã tồn tại trên backend dùng chung (các lần chạy trước đã đăng ký)
+DEFAULT_ACCOUNTS = {
+    "user@example.com": "Pass@123",
+    "existing@example.com": "Pass@123",
+    "test@example.com": "Pass@123",
+}
+
+
+class WebDriverError(Exception):
+    """Lỗi theo định dạng W3C WebDriver"""
+
+    def __init__(self, error, message, status=404):
+        super().__init__(message)
+        self.error = error
+        self.message = message
+        self.status = status
+
+
+def load_screens(fixtures_dir=FIXTURES_DIR):
+    """Đọc các file XML page source, khóa theo tên màn hình"""
+    screens = {}
+    for file_name in sorted(os.listdir(fixtures_dir)):
+        if file_name.endswith(".xml"):
+            tree = etree.parse(os.path.join(fixtures_dir, file_name))
+            screens[file_name[:-4]] = tree.getroot()
+    return screens
+
+
+class Screen:
+    """Một màn hình đang hiển thị: cây XML sống và các thông báo đang hiện"""
+
+    def __init__(self, name, root):
+        self.name = name
+        self.root = deepcopy(root)
+        self.messages = []
+
+    def show_message(self, text):
+        """Hiển thị thông báo (lỗi validate, SnackBar) dưới dạng TextView"""
+        container = self.root.xpath("//*[@resource-id='android:id/content']/*/*")[0]
+        node = etree.SubElement(container, "android.widget.TextView", {
+            "index": str(len(container)), "package": APP_PACKAGE, "class": "android.widget.TextView",
+            "text": text, "content-desc": "", "resource-id": "", "clickable": "false",
+            "enabled": "true", "focusable": "false", "scrollable": "false",
+            "bounds": "[44,1980][1036,2080]", "displayed": "true",
+        })
+        self.messages.append(node)
+
+    def clear_messages(self):
+        for node in self.messages:
+            node.getparent().remove(node)
+        self.messages = []
+
+    def field_values(self):
+        """Giá trị các EditText theo thứ tự xuất hiện"""
+        return [(node.get("text") or "").strip() for node in self.root.iter("android.widget.EditText")]
+
+
+def _submit_login(session, screen, node):
+    screen.clear_messages()
+    email, password = screen.field_values()[:2]
+    errors = login_errors(email, password)
+    if not errors and session.accounts.get(email) != password:
+        errors = ["Invalid email or password"]
+    if errors:
+        for error in errors:
+            screen.show_message(error)
+        return
+    session.goto("home").show_message("Đăng nhập thành công!")
+
+
+def _submit_register(session, screen, node):
+    screen.clear_messages()
+    _, email, password, confirm_password = screen.field_values()[:4]
+    errors = register_errors(email, password, confirm_password)
+    if not errors and email in session.accounts:
+        errors = ["User already exists!"]
+    if errors:
+        for error in errors:
+            screen.show_message(error)
+        return
+    session.accounts[email] = password
+    session.goto("login").show_message("Register successfully!")
+
+
+def _add_to_cart(session, screen, node):
+    product = node.getparent().get("content-desc").split("\n")[0]
+    session.cart.append(product)
+    screen.clear_messages()
+    screen.show_message(f"{product} add to cart successfully!")
+
+
+def _remove_from_cart(session, screen, node):
+    item = node.getparent()
+    product = item.get("content-desc").split("\n")[0]
+    if product in session.cart:
+        session.cart.remove(product)
+    item.getparent().remove(item)
+
+
+def _place_order(session, screen, node):
+    screen.clear_messages()
+    values = screen.field_values()
+    # Ghi chú (trường cuối) là tùy chọn, các trường còn lại bắt buộc
+    if not all(values[:-1]):
+        screen.show_message("Required field missing")
+        return
+    session.cart = []
+    session.goto("home").show_message("Order placed successfully")
+
+
+def _set_text(session, screen, node, text):
+    node.set("text", text)
+
+
+# Luồng màn hình khi click: (màn hình, XPath phần tử được click, hàm xử lý)
+CLICK_TRANSITIONS = [
+    ("login", "//android.widget.Button[@content-desc='Login']", _submit_login),
+    ("login", "//android.widget.Button[@content-desc='Create an account']",
+     lambda session, screen, node: session.goto("register")),
+    ("register", "//android.widget.Button[@content-desc='Register']", _submit_register),
+    ("register", "//android.widget.Button[@content-desc='Already have an account? Login']",
+     lambda session, screen, node: session.goto("login")),
+    ("home", "(//android.widget.FrameLayout[@resource-id='android:id/content']//android.widget.Button)[1]",
+     lambda session, screen, node: session.push("cart")),
+    ("home", "//android.view.View[starts-with(@content-desc, 'Cart')]",
+     lambda session, screen, node: session.push("cart")),
+    ("home", "//android.widget.ImageView/android.widget.Button", _add_to_cart),
+    ("cart", "//android.widget.ImageView/android.widget.Button", _remove_from_cart),
+    ("cart", "//android.widget.Button[@content-desc='Checkout']",
+     lambda session, screen, node: session.push("checkout")),
+    ("checkout", "//android.widget.Button[@content-desc='Đặt Hàng']", _place_order),
+]
+# Khi send_keys/clear: (màn hình hoặc "*", XPath phần tử, hàm xử lý nhận thêm text)
+TYPE_TRANSITIONS = [
+    ("*", "//android.widget.EditText", _set_text),
+]
+
+
+def _match_transition(rules, screen, node):
+    for screen_name, xpath, handler in rules:
+        if screen_name in ("*", screen.name) and any(match is node for match in screen.root.xpath(xpath)):
+            return handler
+    return None
+
+
+def _uiautomator_to_xpath(selector):
+    """Chuyển biểu thức UiSelector đơn giản sang XPath"""
+    # Với UiScrollable(...).scrollIntoView(UiSelector...) chỉ cần selector cuối cùng
+    selector = selector.split("scrollIntoView(")[-1]
+    mapping = {
+        "description": "@content-desc = {0}",
+        "descriptionContains": "contains(@content-desc, {0})",
+        "descriptionStartsWith": "starts-with(@content-desc, {0})",
+        "text": "@text = {0}",
+        "textContains": "contains(@text, {0})",
+        "textStartsWith": "starts-with(@text, {0})",
+        "resourceId": "@resource-id = {0}",
+        "className": "@class = {0}",
+    }
+    predicates = []
+    for method, argument in re.findall(r"\.(\w+)\(\"((?:[^\"\\]|\\.)*)\"\)", selector):
+        if method in mapping:
+            literal = f'"{argument}"' if "'" in argument else f"'{argument}'"
+            predicates.append(mapping[method].format(literal))
+    if not predicates:
+        raise WebDriverError("invalid selector", f"Unsupported UiSelector: {selector}", 400)
+    return "//*[" + " and ".join(predicates) + "]"
+
+
+class Session:
+    """Trạng thái app cho một phiên: chồng màn hình, phần tử đã trả về, giỏ hàng"""
+
+    def __init__(self, server, capabilities):
+        self.id = uuid.uuid4().hex
+        self.server = server
+        self.capabilities = capabilities
+        self.start_screen = capabilities.get("appium:fakeStartScreen", server.start_screen)
+        self.accounts = dict(server.accounts)
+        self.cart = []
+        self.stack = []
+        self.elements = {}
+        self.element_ids = {}
+        self.running = True
+        self.logcat = []
+        self.launch()
+        self.goto(self.start_screen)
+
+    def launch(self):
+        """App vừa được mở: màn hình chờ trong server.startup giây rồi mới vẽ frame đầu tiên"""
+        self.launched = time.monotonic()
+        self.first_frame_logged = False
+
+    @property
+    def booting(self):
+        if time.monotonic() - self.launched < self.server.startup:
+            return True
+        if not self.first_frame_logged:
+            self.first_frame_logged = True
+            self.logcat.append({
+                "timestamp": int(time.time() * 1000), "level": "INFO",
+                "message": f"I/ActivityTaskManager: Displayed {APP_PACKAGE}/{APP_ACTIVITY}: "
+                           f"+{int(self.server.startup * 1000)}ms",
+            })
+        return False
+
+    @property
+    def current(self):
+        return self.server.splash if self.booting else self.stack[-1]
+
+    def goto(self, name):
+        """Thay toàn bộ chồng màn hình (tương tự context.go)"""
+        self.stack = [Screen(name, self.server.screens[name])]
+        return self.current
+
+    def push(self, name):
+        self.stack.append(Screen(name, self.server.screens[name]))
+        return self.current
+
+    def back(self):
+        if self.current.messages:
+            self.current.clear_messages()
+        elif len(self.stack) > 1:
+            self.stack.pop()
+
+    def restart(self):
+        self.cart = []
+        self.launch()
+        self.goto(self.start_screen)
+
+    def element_ref(self, node):
+        eid = self.element_ids.get(node)
+        if eid is None:
+            eid = uuid.uuid4().hex
+            self.element_ids[node] = eid
+            self.elements[eid] = (self.current, node)
+        return {ELEMENT_KEY: eid, "ELEMENT": eid}
+
+    def resolve(self, eid):
+        if eid not in self.elements:
+            raise WebDriverError("no such element", f"Element {eid} is unknown")
+        screen, node = self.elements[eid]
+        if screen is not self.current or node.getroottree().getroot() is not screen.root:
+            raise WebDriverError("stale element reference", f"Element {eid} is no longer attached to the page")
+        return node
+
+    def find(self, using, value, context=None):
+        if using == "xpath":
+            xpath = value
+        elif using == "-android uiautomator":
+            xpath = _uiautomator_to_xpath(value)
+        elif using == "accessibility id":
+            xpath = f"//*[@content-desc={json.dumps(value)}]"
+        elif using == "id":
+            xpath = f"//*[@resource-id={json.dumps(value)}]"
+        elif using == "class name":
+            xpath = f"//{value}"
+        else:
+            raise WebDriverError("invalid argument", f"Unsupported locator strategy: {using}", 400)
+        try:
+            matches = (context if context is not None else self.current.root).xpath(xpath)
+        except etree.XPathError as e:
+            raise WebDriverError("invalid selector", f"Invalid XPath {xpath}: {e}", 400)
+        return [node for node in matches if isinstance(node, etree._Element)]
+
+
+def _attribute(node, name):
+    aliases = {"contentDescription": "content-desc", "resourceId": "resource-id", "className": "class",
+               "name": "content-desc", "checked": "checked", "long-clickable": "long-clickable"}
+    name = aliases.get(name, name)
+    value = node.get(name)
+    if name == "text" and value == "" and node.get("content-desc"):
+        return node.get("content-desc")
+    return value
+
+
+def _rect(node):
+    x1, y1, x2, y2 = map(int, re.findall(r"\d+", node.get("bounds", "[0,0][0,0]")))
+    return {"x": x1, "y": y1, "width": x2 - x1, "height": y2 - y1}
+
+
+class FakeAppiumServer:
+    """Server giả lập có thể chạy trong tiến trình test hoặc từ dòng lệnh"""
+
+    def __init__(self, host="127.0.0.1", port=4723, latency=0.0, command_latency=None,
+                 start_screen="login", fixtures_dir=FIXTURES_DIR, accounts=None, verbose=False, startup=0.0):
+        self.screens = load_screens(fixtures_dir)
+        self.splash = Screen("splash", etree.fromstring(SPLASH_XML))
+        self.startup = startup
+        if start_screen not in self.screens:
+            raise ValueError(f"Unknown start screen '{start_screen}', expected one of {sorted(self.screens)}")
+        self.latency = latency
+        self.command_latency = command_latency or {}
+        self.start_screen = start_screen
+        self.accounts = dict(DEFAULT_ACCOUNTS if accounts is None else accounts)
+        self.verbose = verbose
+        self.sessions = {}
+        self.commands = Counter()
+        self.lock = threading.RLock()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Chạy server trên thread nền"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stats(self):
+        with self.lock:
+            return {"total": sum(self.commands.values()), "commands": dict(self.commands)}
+
+    def reset_stats(self):
+        with self.lock:
+            self.commands.clear()
+
+    def session(self, sid):
+        if sid not in self.sessions:
+            raise WebDriverError("invalid session id", f"Session {sid} does not exist")
+        return self.sessions[sid]
+
+    def dispatch(self, method, path, body):
+        """Xử lý một lệnh, trả về (HTTP status, value)"""
+        for route_method, pattern, command, handler in ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(path)
+            if match:
+                delay = self.command_latency.get(command, self.latency)
+                if delay:
+                    time.sleep(delay)
+                with self.lock:
+                    if not command.startswith("fake"):
+                        self.commands[command] += 1
+                    return 200, handler(self, body, *match.groups())
+        with self.lock:
+            self.commands["unknown"] += 1
+        raise WebDriverError("unknown command", f"Unknown command: {method} {path}", 404)
+
+
+def _new_session(server, body):
+    caps = body.get("capabilities", {}).get("alwaysMatch", {})
+    for first in body.get("capabilities", {}).get("firstMatch", [{}]):
+        caps = {**caps, **first}
+        break
+    session = Session(server, caps)
+    server.sessions[session.id] = session
+    return {"sessionId": session.id, "capabilities": {**caps, "platformName": "Android"}}
+
+
+def _get_log(server, body, sid):
+    """Trả về và xóa các dòng log mới (chỉ có logcat)"""
+    session = server.session(sid)
+    if body.get("type") != "logcat":
+        raise WebDriverError("invalid argument", f"Unsupported log type: {body.get('type')}", 400)
+    session.booting  # ghi dòng Displayed nếu app vừa vẽ xong frame đầu tiên
+    entries, session.logcat = session.logcat, []
+    return entries
+
+
+def _delete_session(server, body, sid):
+    server.sessions.pop(sid, None)
+    return None
+
+
+def _find_element(server, body, sid, parent_eid=None):
+    session = server.session(sid)
+    context = session.resolve(parent_eid) if parent_eid else None
+    matches = session.find(body.get("using"), body.get("value"), context)
+    if not matches:
+        raise WebDriverError("no such element",
+                             f"An element could not be located on the page using: {body.get('using')}={body.get('value')}")
+    return session.element_ref(matches[0])
+
+
+def _find_elements(server, body, sid, parent_eid=None):
+    session = server.session(sid)
+    context = session.resolve(parent_eid) if parent_eid else None
+    return [session.element_ref(node) for node in session.find(body.get("using"), body.get("value"), context)]
+
+
+def _click(server, body, sid, eid):
+    session = server.session(sid)
+    node = session.resolve(eid)
+    screen = session.current
+    handler = _match_transition(CLICK_TRANSITIONS, screen, node)
+    if handler:
+        handler(session, screen, node)
+    return None
+
+
+def _type(server, body, sid, eid, text):
+    session = server.session(sid)
+    node = session.resolve(eid)
+    handler = _match_transition(TYPE_TRANSITIONS, session.current, node)
+    if handler:
+        handler(session, session.current, node, text)
+    return None
+
+
+def _set_value(server, body, sid, eid):
+    text = body.get("text")
+    if text is None:
+        text = "".join(body.get("value", []))
+    # Như UiAutomator2: send_keys nối thêm vào text đang có, muốn thay thì clear trước
+    current = server.session(sid).resolve(eid).get("text", "")
+    return _type(server, body, sid, eid, current + text)
+
+
+def _clear(server, body, sid, eid):
+    return _type(server, body, sid, eid, "")
+
+
+def _get_attribute(server, body, sid, eid, name):
+    return _attribute(server.session(sid).resolve(eid), name)
+
+
+def _element_flag(name):
+    def handler(server, body, sid, eid):
+        return server.session(sid).resolve(eid).get(name) == "true"
+    return handler
+
+
+def _execute(server, body, sid):
+    session = server.session(sid)
+    script = body.get("script", "")
+    args = body.get("args") or [{}]
+    args = args[0] if isinstance(args[0], dict) else {}
+    if script == "mobile: getCurrentActivity":
+        return APP_ACTIVITY
+    if script == "mobile: getCurrentPackage":
+        return APP_PACKAGE
+    if script == "mobile: terminateApp":
+        was_running = session.running
+        session.running = False
+        return was_running
+    if script == "mobile: activateApp":
+        if not session.running:
+            session.running = True
+            session.restart()
+        return None
+    if script == "mobile: queryAppState":
+        return 4 if session.running else 1
+    if script == "mobile: replaceElementValue":
+        return _type(server, body, sid, args.get("elementId"), args.get("text", ""))
+    if script == "mobile: isKeyboardShown":
+        return False
+    if script == "mobile: deepLink":
+        return _deep_link(session, args.get("url", ""))
+    if script in ("mobile: scrollGesture", "mobile: swipeGesture"):
+        # Nội dung đã nằm gọn trong màn hình ghi lại nên không cuộn thêm được
+        return False
+    return None
+
+
+def _deep_link(session, url):
+    """Như DeepLinkService của app: lirisflora://app/<route>?cart=<tên>:<số lượng>,..."""
+    parsed = urlsplit(url)
+    screen = DEEP_LINK_SCREENS.get(parsed.path.rstrip("/") or "/")
+    if screen is None:
+        raise WebDriverError("invalid argument", f"Unsupported deep link: {url}", 400)
+    if not session.running:
+        session.launch()  # deep link mở app đang tắt: khởi động lạnh
+    session.running = True
+    cart = parse_qs(parsed.query).get("cart")
+    if cart and screen in ("cart", "checkout"):
+        session.cart = []
+        for item in cart[0].split(","):
+            product, _, quantity = item.rpartition(":")
+            if not product:
+                product, quantity = quantity, "1"
+            session.cart.extend([product] * int(quantity or 1))
+    session.goto(screen)
+    return None
+
+
+def _back(server, body, sid):
+    server.session(sid).back()
+    return None
+
+
+ROUTES = [
+    ("GET", r"/status", "status", lambda server, body: {"ready": True, "message": "fake appium"}),
+    ("POST", r"/session", "newSession", _new_session),
+    ("DELETE", r"/session/([^/]+)", "deleteSession", _delete_session),
+    ("GET", r"/session/([^/]+)", "getSession", lambda server, body, sid: server.session(sid).capabilities),
+    ("GET", r"/session/([^/]+)/source", "getPageSource",
+     lambda server, body, sid: etree.tostring(server.session(sid).current.root, encoding="unicode")),
+    ("POST", r"/session/([^/]+)/element", "findElement", _find_element),
+    ("POST", r"/session/([^/]+)/elements", "findElements", _find_elements),
+    ("POST", r"/session/([^/]+)/element/([^/]+)/element", "findChildElement", _find_element),
+    ("POST", r"/session/([^/]+)/element/([^/]+)/elements", "findChildElements", _find_elements),
+    ("POST", r"/session/([^/]+)/element/([^/]+)/click", "click", _click),
+    ("POST", r"/session/([^/]+)/element/([^/]+)/clear", "clear", _clear),
+    ("POST", r"/session/([^/]+)/element/([^/]+)/value", "setValue", _set_value),
+    ("GET", r"/session/([^/]+)/element/([^/]+)/attribute/([^/]+)", "getAttribute", _get_attribute),
+    ("GET", r"/session/([^/]+)/element/([^/]+)/property/([^/]+)", "getProperty", _get_attribute),
+    ("GET", r"/session/([^/]+)/element/([^/]+)/text", "getText",
+     lambda server, body, sid, eid: _attribute(server.session(sid).resolve(eid), "text")),
+    ("GET", r"/session/([^/]+)/element/([^/]+)/name", "getName",
+     lambda server, body, sid, eid: server.session(sid).resolve(eid).get("class")),
+    ("GET", r"/session/([^/]+)/element/([^/]+)/displayed", "elementDisplayed", _element_flag("displayed")),
+    ("GET", r"/session/([^/]+)/element/([^/]+)/enabled", "elementEnabled", _element_flag("enabled")),
+    ("GET", r"/session/([^/]+)/element/([^/]+)/selected", "elementSelected", _element_flag("selected")),
+    ("GET", r"/session/([^/]+)/element/([^/]+)/rect", "getElementRect",
+     lambda server, body, sid, eid: _rect(server.session(sid).resolve(eid))),
+    ("GET", r"/session/([^/]+)/element/([^/]+)/screenshot", "elementScreenshot",
+     lambda server, body, sid, eid: BLANK_PNG),
+    ("GET", r"/session/([^/]+)/screenshot", "screenshot", lambda server, body, sid: BLANK_PNG),
+    ("POST", r"/session/([^/]+)/execute/sync", "execute", _execute),
+    ("POST", r"/session/([^/]+)/execute/async", "executeAsync", _execute),
+    ("POST", r"/session/([^/]+)/actions", "performActions", lambda server, body, sid: None),
+    ("DELETE", r"/session/([^/]+)/actions", "releaseActions", lambda server, body, sid: None),
+    ("POST", r"/session/([^/]+)/back", "back", _back),
+    ("POST", r"/session/([^/]+)/se/log", "getLog", _get_log),
+    ("GET", r"/session/([^/]+)/se/log/types", "getLogTypes", lambda server, body, sid: ["logcat"]),
+    ("GET", r"/session/([^/]+)/window/rect", "getWindowRect", lambda server, body, sid: WINDOW_RECT),
+    ("GET", r"/session/([^/]+)/timeouts", "getTimeouts",
+     lambda server, body, sid: {"implicit": 0, "pageLoad": 300000, "script": 30000}),
+    ("POST", r"/session/([^/]+)/timeouts", "timeouts", lambda server, body, sid: None),
+    ("GET", r"/session/([^/]+)/orientation", "getOrientation", lambda server, body, sid: "PORTRAIT"),
+    ("GET", r"/session/([^/]+)/contexts", "getContexts", lambda server, body, sid: ["NATIVE_APP"]),
+    ("GET", r"/session/([^/]+)/context", "getCurrentContext", lambda server, body, sid: "NATIVE_APP"),
+    ("GET", r"/session/([^/]+)/appium/settings", "getSettings", lambda server, body, sid: {}),
+    ("POST", r"/session/([^/]+)/appium/settings", "updateSettings", lambda server, body, sid: None),
+    ("GET", r"/session/([^/]+)/appium/device/current_activity", "getCurrentActivity",
+     lambda server, body, sid: APP_ACTIVITY),
+    ("GET", r"/session/([^/]+)/appium/device/current_package", "getCurrentPackage",
+     lambda server, body, sid: APP_PACKAGE),
+    ("GET", r"/fake/stats", "fakeStats", lambda server, body: server.stats()),
+    ("POST", r"/fake/reset-stats", "fakeResetStats", lambda server, body: server.reset_stats()),
+]
+ROUTES = [(method, re.compile(pattern), command, handler) for method, pattern, command, handler in ROUTES]
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Header và body được ghi riêng; tắt Nagle để tránh trễ ~40ms mỗi lệnh
+        disable_nagle_algorithm = True
+
+        def _handle(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else {}
+                path = self.path.split("?")[0].rstrip("/")
+                path = re.sub(r"^/wd/hub", "", path)
+                status, value = server.dispatch(method, path, body)
+                payload = {"value": value}
+                sid = re.match(r"/session/([^/]+)", path)
+                if sid:
+                    payload["sessionId"] = sid.group(1)
+            except WebDriverError as e:
+                status = e.status
+                payload = {"value": {"error": e.error, "message": e.message, "stacktrace": ""}}
+            except Exception as e:
+                status = 500
+                payload = {"value": {"error": "unknown error", "message": str(e), "stacktrace": ""}}
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def do_DELETE(self):
+            self._handle("DELETE")
+
+        def log_message(self, format, *args):
+            if server.verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def parse_command_latency(spec):
+    """Đọc chuỗi 'findElement=0.2,getPageSource=0.5' thành dict"""
+    latency = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        command, _, seconds = item.partition("=")
+        latency[command.strip()] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for an Appium server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4723)
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay in seconds added to every command")
+    parser.add_argument("--command-latency", default="",
+                        help="Per-command delays, e.g. findElement=0.2,getPageSource=0.5")
+    parser.add_argument("--start", default="login", help="Screen shown when a session starts")
+    parser.add_argument("--startup", type=float, default=0.0,
+                        help="Seconds the app shows its launch screen after each launch")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory with recorded page-source XML")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = FakeAppiumServer(args.host, args.port, args.latency, parse_command_latency(args.command_latency),
+                              args.start, args.fixtures, verbose=args.verbose, startup=args.startup)
+    print(f"🤖 Fake Appium listening on {server.url} (start screen: {args.start})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Server và phiên fake_appium trong tiến trình cho unit test (không cần Appium hay thiết bị).
+
+    class TestSomething(FakeAppiumTestCase):
+        server_options = {"start_screen": "home"}
+"""
+import unittest
+from appium import webdriver
+from appium_session import build_options
+from fake_appium import FakeAppiumServer
+
+
+def start_server(test, **options):
+    """FakeAppiumServer trên cổng ngẫu nhiên, dừng khi test kết thúc"""
+    server = FakeAppiumServer(port=0, **options).start()
+    test.addCleanup(server.stop)
+    return server
+
+
+def connect(test, server):
+    """Mở một phiên trên server, đóng khi test kết thúc; số lệnh đếm từ sau khi tạo phiên"""
+    driver = webdriver.Remote(server.url, options=build_options("fake"))
+    test.addCleanup(driver.quit)
+    server.reset_stats()
+    return driver
+
+
+class FakeAppiumTestCase(unittest.TestCase):
+    """Mỗi test có server và driver riêng"""
+
+    server_options = {}
+
+    def setUp(self):
+        self.server = start_server(self, **self.server_options)
+        self.driver = connect(self, self.server)
+
+    def commands(self):
+        """Số lệnh server đã nhận theo từng loại"""
+        return self.server.stats()["commands"]
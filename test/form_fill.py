@@ -0,0 +1,166 @@
+"""Điền form từ mapping XPath -> giá trị với ít lệnh Appium nhất có thể.
+
+Thay cho bộ ba click()/clear()/send_keys() (cộng get_attribute("text") để
+kiểm tra) trên từng trường:
+  - driver_script: cả form trong một lệnh execute_driver (cần plugin
+    execute-driver của Appium), kiểm tra giá trị ngay trong script đó
+  - replace: mỗi trường một lệnh "mobile: replaceElementValue" (thay toàn
+    bộ text, không cần click/clear); phần tử được giải qua ElementCache
+    hoặc PageSnapshot, kiểm tra bằng một lần page_source cho cả form
+  - legacy: click/clear/send_keys như cũ (cho driver không có lệnh trên)
+
+FORM_FILL_STRATEGY=auto (mặc định) thử lần lượt theo thứ tự trên và nhớ
+cách nào driver không hỗ trợ.
+"""
+import json
+import os
+from collections import namedtuple
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import (NoSuchElementException, StaleElementReferenceException,
+                                        TimeoutException, WebDriverException)
+from page_snapshot import PageSnapshot
+from harness_log import get_logger
+
+log = get_logger("form_fill")
+
+FILL_STRATEGIES = ("auto", "driver_script", "replace", "legacy")
+DEFAULT_FILL_STRATEGY = os.environ.get("FORM_FILL_STRATEGY", "auto")
+
+# missing: locator không có trên màn hình (khi required=False)
+# mismatches: {locator: giá trị thực tế} của các trường nhập sai (khi verify=True)
+FillResult = namedtuple("FillResult", ["missing", "mismatches"])
+
+# Script WebdriverIO chạy trên Appium server: điền mọi trường rồi đọc lại text của chúng
+DRIVER_SCRIPT = """
+const fields = %s;
+const verify = %s;
+const missing = [];
+const actual = {};
+for (const [selector, text] of fields) {
+  const found = await driver.$$(selector);
+  if (found.length === 0) { missing.push(selector); continue; }
+  if (text === "") {
+    await found[0].clearValue();
+  } else {
+    await driver.execute("mobile: replaceElementValue", {elementId: found[0].elementId, text: text});
+  }
+  if (verify && (await found[0].getAttribute("password")) !== "true") {
+    actual[selector] = await found[0].getText();
+  }
+}
+return {missing: missing, actual: actual};
+"""
+
+# Cách điền driver đã từ chối, theo session id (để không thử lại mỗi form)
+_unsupported = {}
+
+
+class FormFiller:
+    """Điền nhiều trường một lượt; locator là XPath"""
+
+    def __init__(self, driver, snapshot=None, cache=None, strategy=None):
+        self.driver = driver
+        self.snapshot = snapshot or PageSnapshot(driver)
+        self.cache = cache
+        self.strategy = strategy or DEFAULT_FILL_STRATEGY
+        if self.strategy not in FILL_STRATEGIES:
+            raise ValueError(f"Unknown form fill strategy '{self.strategy}', expected one of {FILL_STRATEGIES}")
+
+    def _strategies(self):
+        if self.strategy != "auto":
+            return [self.strategy]
+        rejected = _unsupported.get(self.driver.session_id, set())
+        return [s for s in ("driver_script", "replace", "legacy") if s not in rejected]
+
+    def _reject(self, strategy, error):
+        _unsupported.setdefault(self.driver.session_id, set()).add(strategy)
+        log.info("ℹ️ Form fill '%s' not available, falling back: %s", strategy, str(error).splitlines()[0])
+
+    def fill(self, values, verify=False, required=True):
+        """Điền values ({xpath: text}); text rỗng nghĩa là xóa trường"""
+        values = dict(values)
+        if not values:
+            return FillResult([], {})
+        strategies = self._strategies()
+        for strategy in strategies:
+            try:
+                if strategy == "driver_script":
+                    result = self._fill_with_script(values, verify)
+                else:
+                    result = self._fill_with_elements(values, verify, replace=strategy == "replace")
+            except WebDriverException as e:
+                if strategy == strategies[-1] or isinstance(e, (NoSuchElementException, TimeoutException)):
+                    raise
+                self._reject(strategy, e)
+                continue
+            if required and result.missing:
+                raise NoSuchElementException(f"Form fields not found: {result.missing}")
+            return result
+
+    def _fill_with_script(self, values, verify):
+        script = DRIVER_SCRIPT % (json.dumps(list(values.items()), ensure_ascii=False), json.dumps(verify))
+        output = self.driver.execute_driver(script).result or {}
+        self._screen_edited()
+        actual = output.get("actual", {})
+        mismatches = {xpath: actual[xpath] for xpath, value in values.items()
+                      if xpath in actual and actual[xpath] != value}
+        return FillResult(list(output.get("missing", [])), mismatches)
+
+    def _resolve(self, xpaths):
+        if self.cache is not None:
+            elements = []
+            for xpath in xpaths:
+                try:
+                    elements.append(self.cache.find(AppiumBy.XPATH, xpath, EC.visibility_of_element_located))
+                except TimeoutException:
+                    elements.append(None)
+            return elements
+        return self.snapshot.elements(xpaths, required=False)
+
+    def _fill_with_elements(self, values, verify, replace):
+        xpaths = list(values)
+        elements = self._resolve(xpaths)
+        for xpath, element in zip(xpaths, elements):
+            if element is None:
+                continue
+            try:
+                self._set(element, values[xpath], replace)
+            except StaleElementReferenceException:
+                # Màn hình đã vẽ lại: giải lại phần tử một lần
+                self._screen_edited()
+                element = self._resolve([xpath])[0]
+                if element is None:
+                    raise NoSuchElementException(f"Form field disappeared: {xpath}")
+                self._set(element, values[xpath], replace)
+        self._screen_edited()
+        missing = [xpath for xpath, element in zip(xpaths, elements) if element is None]
+        mismatches = self.verify({x: v for x, v in values.items() if x not in missing}) if verify else {}
+        return FillResult(missing, mismatches)
+
+    def _set(self, element, text, replace):
+        if not text:
+            element.clear()
+        elif replace:
+            self.driver.execute_script("mobile: replaceElementValue", {"elementId": element.id, "text": text})
+        else:
+            element.click()
+            element.clear()
+            element.send_keys(text)
+
+    def _screen_edited(self):
+        # Text trong các trường đã đổi nên snapshot cũ không còn đúng
+        self.snapshot.invalidate()
+
+    def verify(self, values):
+        """Kiểm tra cả form bằng một lần page_source, trả về {xpath: text thực tế} của trường sai"""
+        self.snapshot.refresh()
+        mismatches = {}
+        for xpath, value in values.items():
+            node = self.snapshot.first_visible(xpath)
+            if node is not None and node.get("password") == "true":
+                continue  # Trường mật khẩu chỉ hiện ký tự che
+            actual = node.get("text", "") if node is not None else None
+            if actual != value:
+                mismatches[xpath] = actual
+        return mismatches
@@ -0,0 +1,68 @@
+"""Kiểm tra form_fill trên fake_appium: chuyển sang cách điền khác khi driver không hỗ trợ.
+
+    python -m unittest form_fill_test
+"""
+import unittest
+from unittest import mock
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+import form_fill
+from element_cache import ElementCache
+from fake_session import FakeAppiumTestCase
+from form_fill import FormFiller
+
+EMAIL = "(//android.widget.EditText)[1]"
+PASSWORD = "(//android.widget.EditText)[2]"
+VALUES = {EMAIL: "user@example.com", PASSWORD: "Pass@123"}
+
+
+class TestFormFiller(FakeAppiumTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(form_fill._unsupported, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def texts(self):
+        return [self.driver.find_element(AppiumBy.XPATH, xpath).text for xpath in VALUES]
+
+    def test_auto_falls_back_and_remembers(self):
+        # fake_appium không có plugin execute-driver: dùng mobile: replaceElementValue
+        filler = FormFiller(self.driver, strategy="auto")
+        self.assertEqual(filler.fill(VALUES, verify=True), ([], {}))
+        self.assertEqual(self.texts(), list(VALUES.values()))
+        self.assertEqual(self.commands()["unknown"], 1)
+        self.assertEqual(self.commands()["execute"], 2)
+        filler.fill({EMAIL: ""})
+        self.assertEqual(self.commands()["unknown"], 1)
+        self.assertEqual(self.texts()[0], "")
+
+    def test_legacy_with_element_cache(self):
+        filler = FormFiller(self.driver, cache=ElementCache(self.driver, timeout=1), strategy="legacy")
+        filler.fill(VALUES)
+        self.assertEqual(self.texts(), list(VALUES.values()))
+        self.assertEqual((self.commands()["click"], self.commands()["setValue"]), (2, 2))
+        self.assertNotIn("unknown", self.commands())
+
+    def test_verify_reports_mismatches(self):
+        filler = FormFiller(self.driver, strategy="replace")
+        filler.fill(VALUES)
+        self.assertEqual(filler.verify({EMAIL: "other@example.com", PASSWORD: "khác"}),
+                         {EMAIL: "user@example.com"})
+
+    def test_missing_fields(self):
+        filler = FormFiller(self.driver, strategy="replace")
+        missing = "(//android.widget.EditText)[5]"
+        self.assertEqual(filler.fill({EMAIL: "user@example.com", missing: "x"}, required=False).missing, [missing])
+        with self.assertRaisesRegex(NoSuchElementException, "not found"):
+            filler.fill({missing: "x"})
+
+    def test_explicit_strategy_does_not_fall_back(self):
+        with self.assertRaises(WebDriverException):
+            FormFiller(self.driver, strategy="driver_script").fill(VALUES)
+        with self.assertRaisesRegex(ValueError, "Unknown form fill strategy"):
+            FormFiller(self.driver, strategy="typing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Log có cấu trúc cho harness, ghi qua hàng đợi trên một thread nền.
+
+Code test chỉ đưa record vào hàng đợi (QueueHandler); QueueListener trên
+thread nền ghi ra console và ra output/logs/<suite>-<run>.jsonl, mỗi dòng
+một JSON gồm thời điểm, mức log, test case đang chạy (span case của
+tracing), step và duration nếu có. Các bước lặp nhiều (tìm, nhập, cuộn) ở
+mức DEBUG: khi tắt, logger.isEnabledFor loại chúng trước khi định dạng.
+
+    LOG_LEVEL=DEBUG python addproduct_test.py    # xem cả từng bước
+    LOG_LEVEL=WARNING python addproduct_test.py  # chỉ cảnh báo và case hỏng
+    LOG_CONSOLE=0 python addproduct_test.py      # chỉ ghi file JSON lines
+
+Khi chưa gọi start_logging (unit test, parallel_runner), log in thẳng ra stdout như print().
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+LOG_LEVEL = getattr(logging, os.environ.get("LOG_LEVEL", "INFO").upper(), logging.INFO)
+LOG_CONSOLE = os.environ.get("LOG_CONSOLE", "1") != "0"
+output_dir = "output"
+LOG_DIR = os.path.join(output_dir, "logs")
+ROOT = "harness"
+CONTEXT_FIELDS = ("suite", "run_id", "test_id", "step", "duration")
+
+
+def get_logger(name):
+    """Logger con của harness, ví dụ get_logger("checkout")"""
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+class ContextFilter(logging.Filter):
+    """Gắn suite, run và test case đang chạy vào record (extra={"test_id": ...} được ưu tiên)"""
+
+    def __init__(self, suite="", run_id=""):
+        super().__init__()
+        self.suite = suite
+        self.run_id = run_id
+
+    def filter(self, record):
+        record.suite = self.suite
+        record.run_id = self.run_id
+        if getattr(record, "test_id", None) is None:
+            from tracing import active_tracer  # tracing cũng ghi log qua module này
+            tracer = active_tracer()
+            record.test_id = tracer.case if tracer is not None else None
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Một record thành một dòng JSON"""
+
+    def format(self, record):
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+        entry = {"time": f"{stamp}.{int(record.msecs):03d}",
+                 "level": record.levelname, "logger": record.name.split(".", 1)[-1], "message": record.getMessage()}
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value not in (None, ""):
+                entry[field] = round(value, 4) if field == "duration" else value
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _console_handler():
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+# Trạng thái của tiến trình: logger gốc, listener đang chạy và file của nó
+_root = logging.getLogger(ROOT)
+_root.setLevel(LOG_LEVEL)
+_root.propagate = False
+_direct = _console_handler()
+_root.addHandler(_direct)
+_listener = None
+_file_handler = None
+
+
+def start_logging(suite, run_id, directory=LOG_DIR, console=LOG_CONSOLE, level=LOG_LEVEL):
+    """Chuyển log của harness sang hàng đợi + thread ghi nền, trả về đường dẫn file JSON lines"""
+    global _listener, _file_handler
+    stop_logging()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{suite}-{run_id}.jsonl")
+    _file_handler = logging.FileHandler(path, encoding="utf-8")
+    _file_handler.setFormatter(JsonLinesFormatter())
+    handlers = [_file_handler] + ([_console_handler()] if console else [])
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(ContextFilter(suite, run_id))
+    _root.setLevel(level)
+    _root.removeHandler(_direct)
+    _root.addHandler(queue_handler)
+    _listener = logging.handlers.QueueListener(records, *handlers)
+    _listener.start()
+    return path
+
+
+def stop_logging():
+    """Ghi nốt các record còn trong hàng đợi, dừng thread nền và quay lại in thẳng ra stdout"""
+    global _listener, _file_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in list(_root.handlers):
+        _root.removeHandler(handler)
+    _root.addHandler(_direct)
+    _file_handler.close()
+    _listener, _file_handler = None, None
+
+
+# Tiến trình kết thúc giữa chừng (setUpClass lỗi) vẫn không mất log trong hàng đợi
+atexit.register(stop_logging)
@@ -0,0 +1,52 @@
+"""Kiểm tra harness_log: JSON lines qua hàng đợi, bỏ qua DEBUG khi tắt.
+
+    python -m unittest harness_log_test
+"""
+import json
+import logging
+import tempfile
+import unittest
+from harness_log import get_logger, start_logging, stop_logging
+from tracing import start_tracing, stop_tracing
+
+
+class TestHarnessLog(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.log = get_logger("checkout")
+
+    def read(self, path):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_writes_context_fields_as_json_lines(self):
+        tracer = start_tracing("checkout", "run-1")
+        self.addCleanup(stop_tracing)
+        path = start_logging("checkout", "run-1", self.directory, console=False)
+        with tracer.case_span("TC_CHECKOUT_02"):
+            self.log.info("🔍 Found %s", "btn_checkout", extra={"step": "find", "duration": 0.123456})
+        self.log.warning("❌ %s failed", "TC_CHECKOUT_03", extra={"test_id": "TC_CHECKOUT_03"})
+        stop_logging()
+        first, second = self.read(path)
+        self.assertEqual((first["message"], first["logger"], first["level"]),
+                         ("🔍 Found btn_checkout", "checkout", "INFO"))
+        self.assertEqual((first["suite"], first["run_id"], first["test_id"]), ("checkout", "run-1", "TC_CHECKOUT_02"))
+        self.assertEqual((first["step"], first["duration"]), ("find", 0.1235))
+        self.assertEqual(second["test_id"], "TC_CHECKOUT_03")
+        self.assertNotIn("step", second)
+
+    def test_silenced_level_skips_formatting(self):
+        class Loud:
+            def __str__(self):
+                raise AssertionError("formatted a silenced record")
+
+        path = start_logging("checkout", "run-2", self.directory, console=False, level=logging.INFO)
+        self.log.debug("👉 Filled %s", Loud())
+        stop_logging()
+        self.assertEqual(self.read(path), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
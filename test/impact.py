@@ -0,0 +1,262 @@
+"""Chọn test theo thay đổi: chỉ chạy các suite/test case bị ảnh hưởng bởi các file đã sửa.
+
+Mỗi màn hình và service quan trọng được khai báo trong COVERAGE cùng các
+test case đi qua nó. File Dart không được khai báo (widget, model, service
+khác) được quy về các file khai báo đang import nó, lần theo đồ thị import
+của lib/. Sửa main.dart, pubspec.yaml, android/, assets/ hoặc code harness
+dùng chung thì chạy tất cả; sửa tài liệu hay nền tảng khác thì không chạy gì.
+
+    python impact.py                    # kế hoạch cho thay đổi so với $IMPACT_BASE (mặc định origin/main)
+    python impact.py --base HEAD~3 --run
+    python impact.py --files lib/services/auth_service.dart
+    python impact.py --all --run        # bỏ qua chọn lọc, chạy toàn bộ (hoặc IMPACT_FULL_RUN=1)
+
+Suite chỉ chạy các case trong $TEST_CASES (xem selected_cases), không có thì chạy hết.
+"""
+import argparse
+import importlib
+import os
+import re
+import subprocess
+import sys
+from run_history import DEFAULT_PATH, SUITES, RunHistory
+from validation_oracle import FORMS, form_errors
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(HERE)
+ALL = "*"
+FULL_RUN = {suite: ALL for suite in SUITES}
+# Các case gọi API: tính từ TEST_DATA (gồm case sinh bởi CASE_MATRIX), xem backend_cases
+BACKEND = "backend"
+
+# File Dart -> {suite: ALL hoặc danh sách test case}
+COVERAGE = {
+    "lib/main.dart": FULL_RUN,
+    "lib/main_screen.dart": {"login": ["TC12"], "checkout": ALL},
+    "lib/screens/login_screen.dart": {"login": ALL, "register": ALL},  # register đi từ màn hình login
+    "lib/screens/register_screen.dart": {"register": ALL},
+    "lib/screens/home_screen.dart": {"login": ["TC12"], "checkout": ALL},
+    "lib/screens/product_screen.dart": {"checkout": ALL},
+    "lib/screens/product_detail_screen.dart": {"checkout": ALL},
+    "lib/screens/cart_screen.dart": {"checkout": ALL},
+    "lib/screens/checkout_screen.dart": {"checkout": ALL},
+    "lib/screens/profile_screen.dart": {},
+    "lib/screens/order_list_screen.dart": {},
+    "lib/screens/order_detail_screen.dart": {},
+    "lib/services/auth_service.dart": {"login": BACKEND, "register": BACKEND},
+    "lib/services/api_service.dart": {"login": BACKEND, "register": BACKEND, "checkout": ALL},
+    "lib/services/deep_link_service.dart": {"checkout": ALL},
+}
+# File harness riêng của từng suite
+SUITE_FILES = {"login": "test/login_test.py", "register": "test/register_test.py",
+               "checkout": "test/addproduct_test.py"}
+# Thay đổi ở đây không ảnh hưởng app Android hay harness
+IGNORED = (".md", "ios/", "web/", "linux/", "macos/", "windows/", ".vscode/", ".gitignore", ".gitattributes",
+           ".metadata", "analysis_options.yaml", "devtools_options.yaml")
+IMPORT_PATTERN = re.compile(r"^\s*(?:import|export|part)\s+['\"]([^'\"]+)['\"]", re.M)
+
+
+def package_name(root=REPO_ROOT):
+    try:
+        with open(os.path.join(root, "pubspec.yaml"), encoding="utf-8") as f:
+            match = re.search(r"^name:\s*(\S+)", f.read(), re.M)
+        return match.group(1) if match else "flutter_shop"
+    except OSError:
+        return "flutter_shop"
+
+
+def dart_imports(root=REPO_ROOT):
+    """Đồ thị import của lib/: {file: các file trong lib/ mà nó import}, đường dẫn tương đối repo"""
+    prefix = f"package:{package_name(root)}/"
+    graph = {}
+    for directory, _, files in os.walk(os.path.join(root, "lib")):
+        for name in files:
+            if not name.endswith(".dart"):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, encoding="utf-8") as f:
+                targets = IMPORT_PATTERN.findall(f.read())
+            source = os.path.relpath(path, root).replace(os.sep, "/")
+            imports = set()
+            for target in targets:
+                if target.startswith(prefix):
+                    imports.add("lib/" + target[len(prefix):])
+                elif ":" not in target:
+                    imports.add(os.path.normpath(os.path.join(os.path.dirname(source), target)).replace(os.sep, "/"))
+            graph[source] = imports
+    return graph
+
+
+def suite_test_data(suite):
+    """TEST_DATA của một suite (import module suite, với CASE_MATRIX hiện tại)"""
+    module = os.path.splitext(os.path.basename(SUITE_FILES[suite]))[0]
+    return importlib.import_module(module).TEST_DATA
+
+
+def backend_cases(suite, test_data):
+    """Các case qua được validate phía client nên gửi request tới API (validation_oracle)"""
+    if suite not in FORMS:
+        return ALL
+    return [test_id for test_id, data in test_data.items() if not form_errors(suite, data)]
+
+
+def _merge(selection, coverage, resolve=None):
+    for suite, cases in coverage.items():
+        if cases == BACKEND:
+            cases = resolve(suite)
+        if cases == ALL or selection.get(suite) == ALL:
+            selection[suite] = ALL
+        else:
+            selection.setdefault(suite, set()).update(cases)
+
+
+class ImpactMap:
+    """Tính các suite/test case bị ảnh hưởng bởi một danh sách file đã đổi"""
+
+    def __init__(self, coverage=COVERAGE, graph=None, root=REPO_ROOT, test_data=None):
+        self.coverage = coverage
+        self.test_data = {} if test_data is None else dict(test_data)
+        self.graph = dart_imports(root) if graph is None else graph
+        self.importers = {}
+        for source, targets in self.graph.items():
+            for target in targets:
+                self.importers.setdefault(target, set()).add(source)
+
+    def backend(self, suite):
+        if suite not in self.test_data:
+            self.test_data[suite] = suite_test_data(suite)
+        return backend_cases(suite, self.test_data[suite])
+
+    def covering(self, path):
+        """Các file khai báo mà thay đổi ở `path` lan tới, None nếu không biết file này"""
+        if path in self.coverage:
+            return {path}
+        if path not in self.graph and path not in self.importers:
+            return None
+        found, seen, pending = set(), {path}, [path]
+        while pending:
+            for importer in self.importers.get(pending.pop(), ()):
+                if importer in seen:
+                    continue
+                seen.add(importer)
+                # Dừng ở file khai báo: phạm vi của nó đã được chọn hẹp có chủ đích
+                if importer in self.coverage:
+                    found.add(importer)
+                else:
+                    pending.append(importer)
+        return found
+
+    def impact(self, path):
+        """{suite: ALL hoặc set test case} cho một file đã đổi, kèm lý do"""
+        path = path.replace(os.sep, "/")
+        if path.startswith(IGNORED) or path.endswith(IGNORED):
+            return {}, "not part of the Android app or harness"
+        for suite, suite_file in SUITE_FILES.items():
+            if path == suite_file:
+                return {suite: ALL}, f"{suite} harness"
+        if path.startswith("test/") and path.endswith("_test.py"):
+            return {}, "harness unit test"
+        if path.startswith("lib/") and path.endswith(".dart"):
+            covering = self.covering(path)
+            if covering is None:
+                return dict(FULL_RUN), "unknown Dart file"
+            selection = {}
+            for declared in covering:
+                _merge(selection, self.coverage[declared], self.backend)
+            via = sorted(covering - {path})
+            return selection, f"via {', '.join(via)}" if via else "declared"
+        # pubspec, android/, assets/, harness dùng chung, file mới chưa biết: chạy hết cho chắc
+        return dict(FULL_RUN), "shared by every suite"
+
+    def select(self, paths):
+        """Gộp ảnh hưởng của mọi file, trả về ({suite: ALL hoặc set test case}, lý do từng file)"""
+        selection, reasons = {}, {}
+        for path in paths:
+            coverage, reasons[path] = self.impact(path)
+            _merge(selection, coverage)
+        return selection, reasons
+
+
+def changed_files(base, root=REPO_ROOT):
+    """Các file khác giữa `base` và cây làm việc hiện tại (gồm cả thay đổi chưa commit)"""
+    output = subprocess.run(["git", "-C", root, "diff", "--name-only", base], check=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout.decode("utf-8")
+    return [line.strip() for line in output.splitlines() if line.strip()]
+
+
+def selected_cases(test_data, env=None):
+    """Các key của TEST_DATA được chọn qua $TEST_CASES (cách nhau bởi dấu phẩy), theo thứ tự TEST_DATA"""
+    wanted = (os.environ if env is None else env).get("TEST_CASES", "")
+    wanted = {case.strip() for case in wanted.split(",") if case.strip()}
+    return [test_id for test_id in test_data if not wanted or test_id in wanted]
+
+
+def estimate(selection, history_path=DEFAULT_PATH):
+    """Thời gian ước tính (đã chọn, toàn bộ) theo thời gian trung bình của từng case trong lịch sử"""
+    if not os.path.exists(history_path):
+        return None
+    history = RunHistory(history_path)
+    try:
+        rows = history.slowest_cases(limit=-1)
+    finally:
+        history.close()
+    total = sum(row["avg_duration"] for row in rows if row["suite"] in SUITES)
+    chosen = sum(row["avg_duration"] for row in rows
+                 if row["suite"] in selection and (selection[row["suite"]] == ALL
+                                                   or row["test_id"] in selection[row["suite"]]))
+    return chosen, total
+
+
+def run_selection(selection):
+    """Chạy từng suite đã chọn trong một tiến trình riêng, trả về exit code lớn nhất"""
+    code = 0
+    for suite in SUITES:
+        if suite not in selection or not selection[suite]:
+            continue
+        env = dict(os.environ)
+        env.pop("TEST_CASES", None)
+        if selection[suite] != ALL:
+            env["TEST_CASES"] = ",".join(sorted(selection[suite]))
+        print(f"\n▶️ Running {suite} ({env.get('TEST_CASES', 'all cases')})")
+        code = max(code, subprocess.call([sys.executable, os.path.join(REPO_ROOT, SUITE_FILES[suite])], env=env))
+    return code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run only the suites and test cases affected by a change")
+    parser.add_argument("--base", default=os.environ.get("IMPACT_BASE", "origin/main"),
+                        help="Git revision to diff against (default: $IMPACT_BASE, else origin/main)")
+    parser.add_argument("--files", nargs="+", help="Changed files (relative to the repo root) instead of git diff")
+    parser.add_argument("--all", action="store_true", default=os.environ.get("IMPACT_FULL_RUN") == "1",
+                        help="Run everything regardless of the change (or IMPACT_FULL_RUN=1)")
+    parser.add_argument("--run", action="store_true", help="Run the selected cases instead of only printing them")
+    args = parser.parse_args()
+
+    if args.all:
+        selection = dict(FULL_RUN)
+        print("🔁 Full run requested")
+    else:
+        try:
+            paths = args.files or changed_files(args.base)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"⚠️ Could not diff against {args.base}, running everything: {str(e)}")
+            selection = dict(FULL_RUN)
+        else:
+            selection, reasons = ImpactMap().select(paths)
+            for path in paths:
+                print(f"📄 {path}: {reasons[path]}")
+    for suite in SUITES:
+        cases = selection.get(suite)
+        if cases:
+            print(f"🎯 {suite}: {'all cases' if cases == ALL else ', '.join(sorted(cases))}")
+    if not any(selection.values()):
+        print("✅ No suite is affected by this change")
+    times = estimate(selection)
+    if times is not None and times[1]:
+        print(f"⏱️ About {times[0]:.0f}s of {times[1]:.0f}s device time ({times[0] / times[1]:.0%})")
+    if args.run:
+        sys.exit(run_selection(selection))
+
+
+if __name__ == "__main__":
+    main()
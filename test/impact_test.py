@@ -0,0 +1,57 @@
+"""Kiểm tra impact trên đồ thị import thật của lib/ (không cần thiết bị).
+
+    python -m unittest impact_test
+"""
+import unittest
+from impact import ALL, FULL_RUN, ImpactMap, selected_cases
+
+
+class TestImpact(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.impact = ImpactMap()
+
+    def select(self, *paths):
+        return self.impact.select(paths)[0]
+
+    def test_widget_change_reaches_screens_that_import_it(self):
+        self.assertEqual(self.select("lib/widgets/card_item.dart"), {"checkout": ALL})
+        self.assertEqual(self.select("lib/models/product.dart"), {"checkout": ALL, "login": {"TC12"}})
+
+    def test_declared_service_keeps_its_narrow_scope(self):
+        # TC_REGISTER_01 (username trống) qua validate phía client nên cũng gọi API
+        self.assertEqual(self.select("lib/services/auth_service.dart"),
+                         {"login": {"TC01", "TC12"}, "register": {"TC_REGISTER_01", "TC_REGISTER_10", "TC_REGISTER_12"}})
+
+    def test_changes_are_merged(self):
+        self.assertEqual(self.select("lib/services/auth_service.dart", "lib/screens/register_screen.dart"),
+                         {"login": {"TC01", "TC12"}, "register": ALL})
+
+    def test_backend_cases_follow_the_data(self):
+        login = {"TC12": {"email": "user@example.com", "password": "Pass@123"},
+                 "MX_LOGIN_002": {"email": "nobody@example.com", "password": "Pass@123"},
+                 "MX_LOGIN_003": {"email": "", "password": "Pass@123"}}
+        register = {"MX_REGISTER_001": {"email": "existing@example.com", "password": "Pass@123",
+                                        "confirm_password": "Pass@123"},
+                    "MX_REGISTER_002": {"email": "test@example", "password": "Pass@123",
+                                        "confirm_password": "Pass@123"}}
+        impact = ImpactMap(graph=self.impact.graph, test_data={"login": login, "register": register})
+        self.assertEqual(impact.select(["lib/services/api_service.dart"])[0],
+                         {"login": {"TC12", "MX_LOGIN_002"}, "register": {"MX_REGISTER_001"}, "checkout": ALL})
+
+    def test_full_run_and_no_run(self):
+        for path in ("lib/main.dart", "pubspec.yaml", "android/app/build.gradle", "test/fake_appium.py",
+                     "lib/screens/new_screen.dart"):
+            self.assertEqual(self.select(path), FULL_RUN, path)
+        for path in ("README.md", "ios/Runner/Info.plist", "test/scroller_test.py", "lib/screens/profile_screen.dart"):
+            self.assertEqual(self.select(path), {}, path)
+        self.assertEqual(self.select("test/register_test.py"), {"register": ALL})
+
+    def test_selected_cases(self):
+        data = {"TC01": {}, "TC02": {}, "TC12": {}}
+        self.assertEqual(selected_cases(data, {}), ["TC01", "TC02", "TC12"])
+        self.assertEqual(selected_cases(data, {"TEST_CASES": "TC12, TC01,TC99"}), ["TC01", "TC12"])
+
+
+if __name__ == "__main__":
+    unittest.main()
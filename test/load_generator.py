@@ -0,0 +1,359 @@
+"""Tạo tải lên REST API của shop bằng asyncio, báo cáo p50/p95/p99 và throughput.
+
+    python load_generator.py --mock --users 20 --duration 30
+    python load_generator.py --url https://staging.example.com/api --users 50 --ramp 10
+
+Mỗi người dùng ảo có một kết nối keep-alive riêng và lặp lại hành trình
+giống app: đăng nhập (/v1/login rồi /v1/current_user như auth_service),
+xem danh mục (/category), xem sản phẩm (/product), thêm vào giỏ (CartService
+chỉ giữ giỏ hàng trên máy nên bước này không gửi request) và đặt hàng
+(/order với body của CartService.submitOrder). Tài khoản được đăng ký trước
+khi đo và xóa khi xong.
+
+Kết quả in ra dạng bảng và histogram, ghi vào output/load/<run>.json và vào
+lịch sử SQLite (suite "load"; xem python run_history.py load).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import ssl
+import time
+from urllib.parse import urlsplit
+from api_fixtures import Account, ApiFixtures, api_url
+from run_history import RunHistory
+
+output_dir = "output"
+LOAD_DIR = os.path.join(output_dir, "load")
+# Cận trên các ô histogram (giây), ô cuối là phần còn lại
+HISTOGRAM_BOUNDS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+# Bước bị coi là Fail trong lịch sử nếu tỉ lệ lỗi vượt ngưỡng này
+MAX_ERROR_RATE = float(os.environ.get("LOAD_MAX_ERROR_RATE", "0.01"))
+LOAD_PASSWORD = "Load@1234"
+
+
+class HttpError(Exception):
+    """Request không nhận được phản hồi (mất kết nối, timeout...)"""
+
+
+class AsyncHttp:
+    """Một kết nối HTTP/1.1 keep-alive, body JSON (đủ cho các endpoint của shop)"""
+
+    def __init__(self, base_url, timeout=60.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.https = parts.scheme == "https"
+        self.port = parts.port or (443 if self.https else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def _connect(self):
+        context = ssl.create_default_context() if self.https else None
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+            self.reader = self.writer = None
+
+    async def request(self, method, endpoint, body=None, token=None):
+        """Gửi request, trả về (status, dữ liệu JSON hoặc text)"""
+        try:
+            return await asyncio.wait_for(self._request(method, endpoint, body, token), self.timeout)
+        except (asyncio.TimeoutError, ConnectionError, OSError, asyncio.IncompleteReadError) as e:
+            await self.close()
+            raise HttpError(f"{method} {endpoint}: {type(e).__name__} {e}") from e
+
+    async def _request(self, method, endpoint, body, token):
+        payload = b"" if body is None else (body if isinstance(body, str) else json.dumps(body)).encode("utf-8")
+        headers = [f"{method} {self.prefix}{endpoint} HTTP/1.1", f"Host: {self.host}",
+                   "Content-Type: application/json", "Accept: application/json",
+                   f"Content-Length: {len(payload)}"]
+        if token:
+            headers.append(f"Authorization: Bearer {token}")
+        raw = ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + payload
+        # Server có thể đã đóng kết nối keep-alive đang rảnh: kết nối lại một lần
+        for attempt in range(2):
+            if self.writer is None:
+                await self._connect()
+            try:
+                self.writer.write(raw)
+                await self.writer.drain()
+                status_line = await self.reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("connection closed by server")
+                break
+            except ConnectionError:
+                await self.close()
+                if attempt:
+                    raise
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = (await self.reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            data = await self._read_chunked()
+        else:
+            data = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        text = data.decode("utf-8", "replace")
+        try:
+            return status, json.loads(text) if text else None
+        except ValueError:
+            return status, text
+
+    async def _read_chunked(self):
+        data = b""
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await self.reader.readline()
+                return data
+            data += await self.reader.readexactly(size)
+            await self.reader.readline()
+
+
+def percentile(sorted_values, fraction):
+    """Percentile theo nearest-rank trên danh sách đã sắp xếp"""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def histogram(values, bounds=HISTOGRAM_BOUNDS):
+    counts = [0] * (len(bounds) + 1)
+    for value in values:
+        counts[next((i for i, bound in enumerate(bounds) if value <= bound), len(bounds))] += 1
+    return counts
+
+
+class LoadStats:
+    """Độ trễ và lỗi theo từng bước của hành trình"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.journeys = 0
+        self.failed_journeys = 0
+        self.start = time.perf_counter()
+        self.elapsed = None
+
+    def add(self, step, seconds, ok):
+        self.latencies.setdefault(step, []).append(seconds)
+        self.errors.setdefault(step, 0)
+        if not ok:
+            self.errors[step] += 1
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.start
+
+    def summary(self):
+        elapsed = self.elapsed or (time.perf_counter() - self.start)
+        steps = []
+        for step, values in self.latencies.items():
+            ordered = sorted(values)
+            steps.append({
+                "step": step, "requests": len(values), "errors": self.errors[step],
+                "p50": percentile(ordered, 0.50), "p95": percentile(ordered, 0.95), "p99": percentile(ordered, 0.99),
+                "mean": sum(values) / len(values), "max": ordered[-1],
+                "throughput": len(values) / elapsed if elapsed else 0.0,
+                "histogram": histogram(values),
+            })
+        return steps
+
+
+class VirtualUser:
+    """Một người dùng ảo: một tài khoản, một kết nối, lặp lại hành trình mua hàng"""
+
+    def __init__(self, index, base_url, stats, account, think=0.0, timeout=60.0, rng=None):
+        self.index = index
+        self.http = AsyncHttp(base_url, timeout)
+        self.stats = stats
+        self.account = account
+        self.think = think
+        self.rng = rng or random.Random(index)
+
+    async def step(self, name, method, endpoint, body=None, token=None, expected=(200,)):
+        start = time.perf_counter()
+        try:
+            status, data = await self.http.request(method, endpoint, body, token)
+        except HttpError:
+            status, data = None, None
+        ok = status in expected
+        self.stats.add(name, time.perf_counter() - start, ok)
+        return ok, data
+
+    async def pause(self):
+        if self.think:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.think))
+
+    async def journey(self):
+        """Một lượt mua hàng, trả về False nếu có bước lỗi"""
+        ok, data = await self.step("login", "POST", "/v1/login",
+                                   {"email": self.account.email, "password": self.account.password})
+        token = data.get("accessToken") if ok and isinstance(data, dict) else None
+        if not token:
+            return False
+        ok, data = await self.step("current_user", "GET", "/v1/current_user", token=token)
+        if not ok:
+            return False
+        user = data.get("user", data) if isinstance(data, dict) else {}
+        await self.pause()
+        ok_categories, _ = await self.step("categories", "GET", "/category")
+        await self.pause()
+        ok_products, data = await self.step("products", "GET", "/product")
+        products = data.get("data", []) if ok_products and isinstance(data, dict) else []
+        if not products:
+            return False
+        await self.pause()
+        # Thêm vào giỏ: chỉ đổi trạng thái trên máy (CartService), không có request
+        cart = self.rng.sample(products, min(len(products), self.rng.randint(1, 3)))
+        items = [{"productId": p["_id"], "quantity": self.rng.randint(1, 3), "price": p["price"], "name": p["name"]}
+                 for p in cart]
+        billing = {"name": self.account.name, "phone": "0900000000", "address": "1 Load Street", "email": self.account.email}
+        order = {
+            "userId": user.get("_id"),
+            "userDetails": billing,
+            "orderDetails": {
+                "totalPrice": sum(item["price"] * item["quantity"] for item in items),
+                "shippingAddress": billing,
+                "notes": "load test",
+                "paymentMethod": "cod",
+            },
+            "items": items,
+        }
+        # CartService gửi chuỗi jsonEncode(orderData)
+        ok_order, _ = await self.step("order", "POST", "/order", json.dumps(order), token=token, expected=(201,))
+        return ok_categories and ok_order
+
+    async def run(self, deadline, journeys=None, delay=0.0):
+        await asyncio.sleep(delay)
+        done = 0
+        try:
+            while time.perf_counter() < deadline and (journeys is None or done < journeys):
+                if not await self.journey():
+                    self.stats.failed_journeys += 1
+                self.stats.journeys += 1
+                done += 1
+                await self.pause()
+        finally:
+            await self.http.close()
+
+
+async def run_load(base_url, accounts, duration=30.0, journeys=None, ramp=0.0, think=0.0, timeout=60.0, seed=None):
+    """Chạy len(accounts) người dùng ảo song song, trả về LoadStats"""
+    stats = LoadStats()
+    deadline = time.perf_counter() + (duration if journeys is None else float("inf"))
+    rng = random.Random(seed)
+    users = [VirtualUser(i, base_url, stats, account, think, timeout, random.Random(rng.random()))
+             for i, account in enumerate(accounts)]
+    await asyncio.gather(*(user.run(deadline, journeys, ramp * i / max(1, len(users)))
+                           for i, user in enumerate(users)))
+    stats.finish()
+    return stats
+
+
+def load_accounts(run_id, users):
+    return [Account(f"Load User {i}", f"load-{run_id}-{i}@example.com", LOAD_PASSWORD) for i in range(users)]
+
+
+def print_report(stats, steps):
+    print(f"\n📈 {stats.journeys} journey(s), {stats.failed_journeys} failed, in {stats.elapsed:.1f}s "
+          f"({stats.journeys / stats.elapsed if stats.elapsed else 0:.2f} journeys/s)")
+    print(f"{'step':<13} {'req':>6} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'req/s':>7}")
+    for step in steps:
+        print(f"{step['step']:<13} {step['requests']:>6} {step['errors']:>5} "
+              + " ".join(f"{step[key] * 1000:>6.0f}ms" for key in ("p50", "p95", "p99", "max"))
+              + f" {step['throughput']:>7.1f}")
+    for step in steps:
+        print(f"\n{step['step']} latency histogram:")
+        widest = max(step["histogram"]) or 1
+        labels = [f"<= {bound * 1000:g}ms" for bound in HISTOGRAM_BOUNDS] + [f"> {HISTOGRAM_BOUNDS[-1] * 1000:g}ms"]
+        for label, count in zip(labels, step["histogram"]):
+            if count:
+                print(f"  {label:>10} {'█' * max(1, round(30 * count / widest))} {count}")
+
+
+def save_results(run_id, base_url, stats, steps, history=None, directory=LOAD_DIR):
+    """Ghi JSON kết quả và lưu vào lịch sử (suite "load")"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{run_id}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"run": run_id, "url": base_url, "journeys": stats.journeys,
+                   "failed_journeys": stats.failed_journeys, "elapsed": stats.elapsed,
+                   "histogram_bounds": HISTOGRAM_BOUNDS, "steps": steps}, f, indent=2)
+    if history is not None:
+        history.start_run(run_id, "load")
+        for step in steps:
+            error_rate = step["errors"] / step["requests"]
+            history.record(run_id, "load", step["step"], "Pass" if error_rate <= MAX_ERROR_RATE else "Fail",
+                           f"p50 {step['p50'] * 1000:.0f}ms, p95 {step['p95'] * 1000:.0f}ms, "
+                           f"p99 {step['p99'] * 1000:.0f}ms, {step['errors']}/{step['requests']} error(s)",
+                           step["mean"])
+        history.record_load(run_id, steps)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay shop journeys against the REST API and report latency")
+    parser.add_argument("--url", help="API base URL (default: $API_URL or the production API)")
+    parser.add_argument("--mock", action="store_true", help="Start fake_api.py in-process and load it")
+    parser.add_argument("--mock-latency", default="0", help="Latency distribution of the mock, e.g. lognormal:0.05:0.5")
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--journeys", type=int, help="Journeys per user (instead of --duration)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which users start")
+    parser.add_argument("--think", type=float, default=0.0, help="Mean think time between steps")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout")
+    parser.add_argument("--seed", type=int, help="Random seed for carts and think times")
+    parser.add_argument("--keep-accounts", action="store_true", help="Do not delete the load accounts afterwards")
+    args = parser.parse_args()
+
+    server = None
+    if args.mock:
+        from fake_api import FakeApiServer
+        server = FakeApiServer(port=0, latency=args.mock_latency, error_rate=args.mock_error_rate,
+                               seed=args.seed).start()
+    base_url = server.url if server else (args.url or api_url())
+    run_id = f"load-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    fixtures = ApiFixtures(base_url, workers=min(16, max(1, args.users)))
+    try:
+        accounts = load_accounts(run_id, args.users)
+        start = time.perf_counter()
+        fixtures.ensure_users(accounts)
+        print(f"🌱 {len(accounts)} load account(s) ready in {time.perf_counter() - start:.2f}s on {base_url}")
+        print(f"🚦 {args.users} user(s), " + (f"{args.journeys} journey(s) each" if args.journeys
+                                              else f"{args.duration:.0f}s") + "...")
+        stats = asyncio.run(run_load(base_url, accounts, args.duration, args.journeys, args.ramp, args.think,
+                                     args.timeout, args.seed))
+        steps = stats.summary()
+        print_report(stats, steps)
+        history = RunHistory()
+        try:
+            path = save_results(run_id, base_url, stats, steps, history)
+        finally:
+            history.close()
+        print(f"\n📝 Load results saved to {path} (run {run_id})")
+    finally:
+        if not args.keep_accounts:
+            fixtures.close()
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Kiểm tra load_generator trên fake_api.
+
+    python -m unittest load_generator_test
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+from api_fixtures import ApiFixtures
+from fake_api import FakeApiServer
+from load_generator import histogram, load_accounts, percentile, run_load, save_results
+from run_history import RunHistory
+
+STEPS = ["login", "current_user", "categories", "products", "order"]
+
+
+class TestLoadGenerator(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeApiServer(port=0).start()
+        self.addCleanup(self.server.stop)
+        self.accounts = load_accounts("test", 3)
+        ApiFixtures(self.server.url).ensure_users(self.accounts)
+
+    def test_journeys_hit_every_step(self):
+        stats = asyncio.run(run_load(self.server.url, self.accounts, journeys=2, seed=1))
+        self.assertEqual((stats.journeys, stats.failed_journeys), (6, 0))
+        steps = {step["step"]: step for step in stats.summary()}
+        self.assertEqual(sorted(steps), sorted(STEPS))
+        self.assertTrue(all(step["requests"] == 6 and step["errors"] == 0 for step in steps.values()))
+        self.assertEqual(len(self.server.orders), 6)
+        self.assertEqual(self.server.stats()["requests"]["login"], 6 + len(self.accounts))
+
+    def test_failed_requests_are_counted(self):
+        self.server.configure(error_rate=1.0)
+        stats = asyncio.run(run_load(self.server.url, self.accounts, journeys=1))
+        self.assertEqual(stats.failed_journeys, 3)
+        self.assertEqual(stats.summary()[0]["errors"], 3)
+
+    def test_results_go_to_history(self):
+        stats = asyncio.run(run_load(self.server.url, self.accounts, journeys=1))
+        with tempfile.TemporaryDirectory() as directory:
+            history = RunHistory(os.path.join(directory, "history.sqlite"))
+            save_results("load-test", self.server.url, stats, stats.summary(), history, directory)
+            self.assertEqual(sorted(row["step"] for row in history.load_trend()), sorted(STEPS))
+            self.assertEqual(history.pass_rate_trend("load")[0]["passed"], len(STEPS))
+            history.close()
+
+    def test_percentile_and_histogram(self):
+        values = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(percentile(values, 0.5), 0.05)
+        self.assertEqual(percentile(values, 0.99), 0.099)
+        self.assertIsNone(percentile([], 0.5))
+        counts = histogram(values)
+        self.assertEqual(sum(counts), 100)
+        self.assertEqual(counts[:3], [5, 5, 15])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,32 @@
 import os
 import time
 import unittest
-from openpyxl import Workbook, load_workbook
-from appium import webdriver
-from appium.options.android import UiAutomator2Options
 from appium.webdriver.common.appiumby import AppiumBy
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from waits import text_visible, wait_for_any
+from appium_session import APP_PACKAGE, SessionManager, DEFAULT_SESSION_MODE
+from element_cache import ElementCache
+from form_fill import FormFiller
+from results_sink import ResultsSink, import_test_columns, write_pivot_report
+from run_history import RunHistory
+from tracing import start_tracing, stop_tracing
+from api_fixtures import Account, seed
+from fake_api import start_mock_api, stop_mock_api
+from result_cache import ResultCache
+from artifacts import FailureCapture
+from harness_log import get_logger, start_logging, stop_logging
+from case_matrix import login_matrix
+from validation_oracle import LOGIN_EMAIL_RULES, LOGIN_PASSWORD_RULES
+
+UDID = os.environ.get("APPIUM_UDID", "b9fff218")
+log = get_logger("login")
+EMAIL_FIELD = "//android.widget.EditText[@index='1']"
+PASSWORD_FIELD = "//android.widget.EditText[@index='2']"
+HOME_TITLE = (AppiumBy.XPATH, "//android.view.View[@content-desc=\"LIRIS'FLORA\"]")
+# Mọi thông báo màn hình login có thể hiện: lỗi validate và lỗi đăng nhập từ server
+LOGIN_MESSAGES = [rule.message for rule in LOGIN_EMAIL_RULES + LOGIN_PASSWORD_RULES] + ["Invalid email or password"]
 
 # Test data
 TEST_DATA = {
@@ -85,100 +104,111 @@ TEST_DATA = {
     },
 }
 
+# Tài khoản TC12 đăng nhập thành công, tạo sẵn qua API khi API_FIXTURES=1
+SEED_ACCOUNTS = [Account("Test User", TEST_DATA["TC12"]["email"], TEST_DATA["TC12"]["password"])]
+
 # Đường dẫn file Excel
 output_dir = "output"
 file_path = os.path.join(output_dir, "test_results.xlsx")
 
-# Tạo thư mục output nếu chưa có
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
+def open_sink():
+    """Log kết quả login (output/test_results.csv), lần đầu nhập lịch sử từ file Excel cũ"""
+    sink = ResultsSink("test_results", fields=["description"], directory=output_dir,
+                       history=RunHistory(), suite="login", device=UDID)
+    sink.import_workbook(file_path, import_test_columns)
+    return sink
 
-# Nếu file không tồn tại -> tạo mới
-is_new_file = not os.path.exists(file_path)
-if is_new_file:
-    wb = Workbook()
-    ws = wb.active
-    ws.append(["Test Case", "Description", "Username", "Password", "Expected Result"])
-    wb.save(file_path)
-    print("🆕 File mới đã được tạo, bắt đầu từ Test 1")
+def build_report(sink=None, path=file_path):
+    """Dựng lại file Excel: mỗi test case một dòng, mỗi lần chạy một cột "Test N" """
+    cases = [(test_id, [data["description"], data["email"], data["password"], data["expected"]])
+             for test_id, data in TEST_DATA.items()]
+    return write_pivot_report(sink or open_sink(), path,
+                              ["Test Case", "Description", "Username", "Password", "Expected Result"], cases)
 
 class TestLoginAppium(unittest.TestCase):
-    results = {}  # Store results for the current test run
+    sink = None
 
     @classmethod
     def setUpClass(cls):
-        wb = load_workbook(file_path)
-        ws = wb.active
-        headers = [cell.value for cell in ws[1]]
-        
-        # Đếm đúng số cột Test
-        test_columns = [h for h in headers if h and str(h).strip().startswith("Test ")]
-        # Nếu là file mới, bắt đầu từ Test 1, nếu không thì tăng số test
-        cls.test_run_number = 1 if is_new_file else len(test_columns)
-        cls.test_column_name = f"Test {cls.test_run_number}"
-
-        if cls.test_column_name not in headers:
-            ws.cell(row=1, column=len(headers) + 1).value = cls.test_column_name
-            wb.save(file_path)
-
-        print(f"🚀 Starting test run: {cls.test_column_name}")
+        # Mỗi kết quả được ghi xuống log ngay khi test xong, không mở lại file Excel
+        cls.sink = open_sink()
+        start_logging("login", cls.sink.run_id)
+        cls.tracer = start_tracing("login", cls.sink.run_id)
+        cls.artifacts = FailureCapture("login", cls.sink.run_id, cls.sink.history, cls.tracer)
+        cls.test_column_name = f"Test {len(cls.sink.runs()) + 1}"
+        log.info("🚀 Starting test run: %s", cls.test_column_name)
+        cls.mock_api = start_mock_api(UDID)
+        cls.api = seed(present=SEED_ACCOUNTS)
+
+        # Một phiên Appium cho cả class (hoặc cả suite) thay vì mỗi test một phiên
+        if DEFAULT_SESSION_MODE == "suite":
+            cls.session = SessionManager.for_suite(UDID)
+        else:
+            cls.session = SessionManager(UDID)
+        cls.needs_reset = False
+        cls.cache = None
 
     def setUp(self):
-        options = UiAutomator2Options()
-        options.platform_name = "Android"
-        options.device_name = "MyAndroidDevice"
-        options.udid = "b9fff218"
-        options.app_package = "com.example.flutter_shop"
-        options.app_activity = "com.example.flutter_shop.MainActivity"
-        options.automation_name = "UiAutomator2"
-        options.no_reset = True
-
-        self.driver = webdriver.Remote("http://localhost:4723", options=options)
+        reused = self.session.driver is not None
+        self.driver = self.tracer.instrument(self.session.acquire())
         self.wait = WebDriverWait(self.driver, 5)
-        print(f"🔗 Driver created for test {self._testMethodName}")
+        if self.cache is None or self.cache.driver is not self.driver:
+            type(self).cache = ElementCache(self.driver, timeout=5)
+            type(self).filler = FormFiller(self.driver, cache=self.cache)
+        if reused and self.needs_reset:
+            # Test trước đã rời màn hình đăng nhập -> khởi động lại app
+            self.session.reset_app()
+            self.cache.invalidate()
+            type(self).needs_reset = False
+        log.debug("🔗 Driver %s for test %s", "reused" if reused else "created", self._testMethodName)
 
     def tearDown(self):
-        if hasattr(self, 'driver'):
-            self.driver.quit()
-            print(f"🔴 Driver closed for test {self._testMethodName}")
+        self.session.release()
 
     @classmethod
     def tearDownClass(cls):
-        wb = load_workbook(file_path)
-        ws = wb.active
-        headers = [cell.value for cell in ws[1]]
-        test_column_index = headers.index(cls.test_column_name) + 1
-
-        # Initialize rows if empty
-        if ws.max_row == 1:
-            for test_id in TEST_DATA:
-                data = TEST_DATA[test_id]
-                ws.append([test_id, data["description"], data["email"], data["password"], data["expected"]])
-
-        # Update test results for the current run
-        for row_idx, test_id in enumerate(TEST_DATA, start=2):
-            ws.cell(row=row_idx, column=test_column_index).value = cls.results.get(test_id, "Fail")
-        
-        wb.save(file_path)
-        print(f"📝 Results saved to {file_path} for {cls.test_column_name}")
-
-    def login(self, email, password):
+        if cls.session.mode != "suite":
+            cls.session.close()
+            log.info("🔴 Driver closed")
+        cls.session.print_report()
+        if cls.cache is not None:
+            cls.cache.print_stats()
+        cls.artifacts.close()
+
+        cls.tracer.print_summary(cls.tracer.save(cls.sink.history))
+        stop_tracing()
+        build_report(cls.sink)
+        log.info("📝 Results saved to %s for %s", file_path, cls.test_column_name)
+        if cls.api is not None:
+            cls.api.close()
+        stop_mock_api()
+        stop_logging()
+
+    def login(self, email, password, expected=None):
+        """Đăng nhập; với expected "error:<thông báo>" trả về expected khi thông báo đó hiện trên màn hình"""
         try:
-            email_field = self.wait.until(EC.visibility_of_element_located(
-                (AppiumBy.XPATH, "//android.widget.EditText[@index='1']")))
-            email_field.click()
-            email_field.clear()
-            email_field.send_keys(email)
-
-            pass_field = self.wait.until(EC.visibility_of_element_located(
-                (AppiumBy.XPATH, "//android.widget.EditText[@index='2']")))
-            pass_field.click()
-            pass_field.clear()
-            pass_field.send_keys(password)
-
-            login_button = self.wait.until(EC.element_to_be_clickable(
-                (AppiumBy.XPATH, "(//android.widget.Button)[1]")))
+            # Điền cả hai trường một lượt thay vì click/clear/send_keys từng trường
+            self.filler.fill({EMAIL_FIELD: email, PASSWORD_FIELD: password})
+
+            login_button = self.cache.find(
+                AppiumBy.XPATH, "(//android.widget.Button)[1]", EC.element_to_be_clickable)
             login_button.click()
+            if expected and expected.startswith("error:"):
+                # Lỗi validate hiện dưới ô nhập, lỗi từ server hiện trong SnackBar
+                # Chờ cùng lúc thông báo mong đợi, thông báo khác và màn hình home để case sai
+                # dừng ngay khi app đã phản hồi thay vì ngồi hết timeout
+                message = expected[len("error:"):]
+                others = [text for text in LOGIN_MESSAGES if text != message]
+                try:
+                    index, element = wait_for_any(self.driver, [
+                        text_visible(message), text_visible(*others), EC.visibility_of_element_located(HOME_TITLE)
+                    ], timeout=5)
+                except TimeoutException:
+                    return f"Error message not displayed: {message}"
+                if index == 0:
+                    return expected
+                shown = "logged in" if index == 2 else f"shown '{element.text}'"
+                return f"Error message not displayed: {message} ({shown})"
         except TimeoutException as e:
             return f"Error: Element not found - {str(e)}"
         except Exception as e:
@@ -186,8 +216,7 @@ class TestLoginAppium(unittest.TestCase):
 
     def is_home_screen(self):
         try:
-            self.wait.until(EC.visibility_of_element_located(
-                (AppiumBy.XPATH, "//android.view.View[@content-desc=\"LIRIS'FLORA\"]")))
+            self.wait.until(EC.visibility_of_element_located(HOME_TITLE))
             return True
         except TimeoutException:
             return False
@@ -195,13 +224,14 @@ class TestLoginAppium(unittest.TestCase):
     def run_test(self, test_id):
         start_time = time.time()
         data = TEST_DATA[test_id]
-        print(f"\n📋 Running test {test_id}: {data['description']} ({self.test_column_name})")
+        log.info("📋 Running test %s: %s (%s)", test_id, data['description'], self.test_column_name, extra={"step": "case"})
 
-        error = self.login(data["email"], data["password"])
         expected = data["expected"]
+        error = self.login(data["email"], data["password"], expected)
 
         if expected == "Success":
             if error is None and self.is_home_screen():
+                type(self).needs_reset = True
                 status = "Pass"
                 note = "Successfully logged in and redirected to home screen"
             else:
@@ -215,15 +245,22 @@ class TestLoginAppium(unittest.TestCase):
                 status = "Fail"
                 note = f"Expected error '{expected}' but got '{error}'"
 
-        print(f"Status: {status}")
-        self.results[test_id] = status
+        log.info("Status: %s", status, extra={"step": "result", "duration": time.time() - start_time})
         # if status == "Fail":
         #     self.fail(note)
+        return status, note
 
 # Dynamically create test methods
 def create_test_method(test_id):
     def test_method(self):
-        self.run_test(test_id)
+        start = time.perf_counter()
+        with self.tracer.case_span(test_id):
+            status, note = self.run_test(test_id)
+        if status == "Fail":
+            self.artifacts.capture(self.driver, test_id, note)
+        self.sink.record(test_id, status, note, duration=time.perf_counter() - start,
+                         description=TEST_DATA[test_id]["description"])
+        result_cache.record(self.sink.run_id, test_id, status)
     test_method.__name__ = f"test_{test_id}"
     return test_method
 
@@ -231,5 +268,38 @@ def create_test_method(test_id):
 for test_id in TEST_DATA:
     setattr(TestLoginAppium, f"test_{test_id}", create_test_method(test_id))
 
+# CASE_MATRIX=2 (pairwise), 3, ...: thêm các case sinh từ miền giá trị, mỗi case sinh ra thành một test method
+for test_id, data in login_matrix(SEED_ACCOUNTS[0]):
+    TEST_DATA[test_id] = data
+    setattr(TestLoginAppium, f"test_{test_id}", create_test_method(test_id))
+
+# Với RESULT_CACHE=1 / RERUN_FAILED=1 chỉ chạy case mới, đã đổi hoặc đang lỗi
+result_cache = ResultCache("login", __file__, UDID)
+
+def load_tests(loader, tests, pattern):
+    """Chỉ chạy các test case được chọn ($TEST_CASES của impact.py, result_cache), mặc định chạy hết"""
+    selected = {f"test_{test_id}" for test_id in result_cache.select(TEST_DATA)}
+    return unittest.TestSuite(loader.loadTestsFromName(name, TestLoginAppium) for name in sorted(selected))
+
+def prepare_case_runner(driver):
+    """Chạy từng test case trên một driver có sẵn (dùng cho parallel_runner)"""
+    test = TestLoginAppium(f"test_{next(iter(TEST_DATA))}")
+    test.driver = driver
+    test.wait = WebDriverWait(driver, 5)
+    test.cache = ElementCache(driver, timeout=5)
+    test.filler = FormFiller(driver, cache=test.cache)
+    test.test_column_name = "parallel"
+
+    def run(test_id):
+        TestLoginAppium.needs_reset = False
+        status, note = test.run_test(test_id)
+        if TestLoginAppium.needs_reset:
+            # Đã vào màn hình chính -> khởi động lại app cho case tiếp theo
+            driver.terminate_app(APP_PACKAGE)
+            driver.activate_app(APP_PACKAGE)
+            test.cache.invalidate()
+        return status, note
+    return run
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+from lxml import etree
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from waits import wait_for
+
+
+class PageSnapshot:
+    """Giải nhiều XPath trên một lần lấy page_source thay vì mỗi phần tử một lệnh.
+
+    XPath được đánh giá cục bộ bằng lxml. Để lấy WebElement thao tác được,
+    mỗi class (ví dụ android.widget.EditText) chỉ cần một lệnh find_elements;
+    phần tử thứ n của class đó trong snapshot ứng với phần tử thứ n trả về.
+    Snapshot chỉ được lấy lại khi bị đánh dấu cũ (sau click chuyển màn hình)
+    hoặc khi số phần tử trên thiết bị không khớp với snapshot.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.root = None
+        self._elements_by_class = {}
+        self.refreshes = 0
+
+    @property
+    def is_stale(self):
+        return self.root is None
+
+    def invalidate(self):
+        """Đánh dấu snapshot cũ, lần truy vấn sau sẽ lấy lại page_source"""
+        self.root = None
+        self._elements_by_class = {}
+
+    def refresh(self):
+        source = self.driver.page_source
+        self.root = etree.fromstring(source.encode("utf-8"))
+        self._elements_by_class = {}
+        self.refreshes += 1
+        return self.root
+
+    def query(self, xpath):
+        """Các node khớp XPath trong snapshot hiện tại (lấy snapshot nếu cần)"""
+        if self.is_stale:
+            self.refresh()
+        return self.root.xpath(xpath)
+
+    def first_visible(self, xpath):
+        for node in self.query(xpath):
+            if node.get("displayed", "true") == "true":
+                return node
+        return None
+
+    def wait_for(self, xpaths, timeout=None, poll=None):
+        """Chờ đến khi mọi XPath đều có node hiển thị, mỗi lần poll chỉ một page_source"""
+        def _all_visible(driver):
+            self.refresh()
+            return all(self.first_visible(xpath) is not None for xpath in xpaths)
+
+        try:
+            wait_for(self.driver, _all_visible, timeout, poll)
+        except TimeoutException:
+            missing = [xpath for xpath in xpaths if self.root is None or self.first_visible(xpath) is None]
+            raise TimeoutException(f"Elements not visible: {missing}")
+
+    def _class_elements(self, class_name):
+        if class_name not in self._elements_by_class:
+            self._elements_by_class[class_name] = self.driver.find_elements(AppiumBy.CLASS_NAME, class_name)
+        return self._elements_by_class[class_name]
+
+    def _to_element(self, node):
+        class_name = node.get("class") or node.tag
+        same_class = self.root.xpath("//*[@class=$name]", name=class_name)
+        elements = self._class_elements(class_name)
+        if len(elements) != len(same_class):
+            return None
+        return elements[same_class.index(node)]
+
+    def elements(self, xpaths, required=True):
+        """Trả về WebElement cho từng XPath (None nếu không có và required=False)"""
+        for attempt in range(2):
+            nodes = [self.first_visible(xpath) for xpath in xpaths]
+            resolved = [self._to_element(node) if node is not None else None for node in nodes]
+            # Số phần tử trên thiết bị khác snapshot -> snapshot đã cũ, lấy lại một lần
+            if all(element is not None for node, element in zip(nodes, resolved) if node is not None):
+                break
+            self.refresh()
+        else:
+            raise NoSuchElementException("Page changed while resolving elements from snapshot")
+
+        missing = [xpath for xpath, element in zip(xpaths, resolved) if element is None]
+        if required and missing:
+            raise NoSuchElementException(f"Elements not found in page source: {missing}")
+        return resolved
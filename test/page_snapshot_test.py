@@ -0,0 +1,54 @@
+"""Kiểm tra page_snapshot trên fake_appium: XPath giải cục bộ ứng đúng WebElement trên thiết bị.
+
+    python -m unittest page_snapshot_test
+"""
+import unittest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from fake_session import FakeAppiumTestCase
+from page_snapshot import PageSnapshot
+
+EMAIL = "(//android.widget.EditText)[1]"
+PASSWORD = "(//android.widget.EditText)[2]"
+LOGIN = "//android.widget.Button[@content-desc='Login']"
+CREATE_ACCOUNT = "//android.widget.Button[@content-desc='Create an account']"
+
+
+class TestPageSnapshot(FakeAppiumTestCase):
+    def setUp(self):
+        super().setUp()
+        self.snapshot = PageSnapshot(self.driver)
+
+    def test_maps_snapshot_nodes_to_elements(self):
+        email, password, login = self.snapshot.elements([EMAIL, PASSWORD, LOGIN])
+        # Một page_source, mỗi class một find_elements
+        self.assertEqual(self.commands(), {"getPageSource": 1, "findElements": 2})
+        self.assertEqual(password.get_attribute("password"), "true")
+        self.assertEqual(login.get_attribute("content-desc"), "Login")
+        email.send_keys("user@example.com")
+        self.snapshot.invalidate()
+        self.assertEqual(self.snapshot.first_visible(EMAIL).get("text"), "user@example.com")
+        self.assertEqual(self.snapshot.refreshes, 2)
+
+    def test_missing_elements(self):
+        missing = "//android.widget.Button[@content-desc='Không có']"
+        self.assertEqual(self.snapshot.elements([EMAIL, missing], required=False)[1], None)
+        with self.assertRaisesRegex(NoSuchElementException, "Không có"):
+            self.snapshot.elements([missing])
+
+    def test_page_change_refreshes_once(self):
+        self.snapshot.query(EMAIL)
+        # Sang màn hình đăng ký (4 EditText) mà snapshot không biết
+        self.driver.find_element("xpath", CREATE_ACCOUNT).click()
+        field = self.snapshot.elements([PASSWORD])[0]
+        self.assertEqual(self.snapshot.refreshes, 2)
+        self.assertEqual(len(self.snapshot.query("//android.widget.EditText")), 4)
+        self.assertEqual(field.get_attribute("password"), "false")
+
+    def test_wait_for_names_missing_xpaths(self):
+        self.snapshot.wait_for([EMAIL, LOGIN], timeout=1)
+        with self.assertRaisesRegex(TimeoutException, "Không có"):
+            self.snapshot.wait_for([EMAIL, "//*[@content-desc='Không có']"], timeout=0.3, poll=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+"""Chạy TEST_DATA của các suite song song trên nhiều thiết bị.
+
+Ví dụ:
+    python parallel_runner.py --devices b9fff218,192.168.154.102:5555 --suites login,register
+    python parallel_runner.py --suites login   # mọi thiết bị khỏe mà adb thấy (device_manager.py)
+
+Mỗi thiết bị có một tiến trình và một phiên Appium riêng. Các tiến trình
+lấy test case từ một hàng đợi chung (work-stealing), nên thiết bị nào
+xong trước sẽ nhận case tiếp theo. Kết quả được gộp vào một file Excel.
+"""
+import argparse
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl import Workbook
+from appium_session import APP_PACKAGE, APPIUM_URL, SessionManager
+from device_manager import device_pool
+from run_history import RunHistory
+from harness_log import get_logger
+
+log = get_logger("parallel_runner")
+
+# Tên suite -> module có TEST_DATA và prepare_case_runner(driver).
+# Checkout chạy một luồng giỏ hàng duy nhất nên không chia nhỏ được.
+SUITES = {
+    "login": "login_test",
+    "register": "register_test",
+}
+# Mỗi phiên UiAutomator2 song song trên cùng một Appium server cần systemPort riêng
+BASE_SYSTEM_PORT = 8200
+output_dir = "output"
+file_path = os.path.join(output_dir, "test_results_parallel.xlsx")
+
+
+def _run_device(index, udid, task_queue, result_queue, url=APPIUM_URL):
+    """Tiến trình worker: một phiên Appium, lấy case từ hàng đợi cho đến khi hết"""
+    session = SessionManager(udid, mode="class", url=url, system_port=BASE_SYSTEM_PORT + index)
+    driver = session.acquire()
+    log.info("🔗 [%s] Session created", udid)
+    current_suite = None
+    run = None
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            suite, test_id = task
+            start = time.perf_counter()
+            try:
+                if suite != current_suite:
+                    if current_suite is not None:
+                        # Đổi suite -> khởi động lại app để về màn hình ban đầu
+                        driver.terminate_app(APP_PACKAGE)
+                        driver.activate_app(APP_PACKAGE)
+                    run = importlib.import_module(SUITES[suite]).prepare_case_runner(driver)
+                    current_suite = suite
+                status, note = run(test_id)
+            except Exception as e:
+                status, note = "Fail", f"Error: {str(e)}"
+                current_suite = None
+            result_queue.put((suite, test_id, udid, status, note, time.perf_counter() - start))
+    finally:
+        session.close()
+        log.info("🔴 [%s] Session closed", udid)
+
+
+def write_workbook(rows, path=file_path):
+    """Ghi kết quả đã gộp, sắp xếp theo thứ tự suite và TEST_DATA"""
+    order = {}
+    for suite, module_name in SUITES.items():
+        for position, test_id in enumerate(importlib.import_module(module_name).TEST_DATA):
+            order[(suite, test_id)] = (list(SUITES).index(suite), position)
+    rows = sorted(rows, key=lambda r: order.get((r[0], r[1]), (len(SUITES), 0)))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Test Case", "Suite", "Description", "Device", "Status", "Note", "Duration (s)"])
+    for suite, test_id, udid, status, note, duration in rows:
+        description = importlib.import_module(SUITES[suite]).TEST_DATA[test_id]["description"]
+        ws.append([test_id, suite, description, udid, status, note, round(duration, 2)])
+    wb.save(path)
+    log.info("📝 Merged results saved to %s", path)
+
+
+def run_parallel(devices, suites, path=file_path, url=APPIUM_URL, history=None):
+    """Chia test case của các suite cho các thiết bị, trả về danh sách kết quả"""
+    manager = multiprocessing.Manager()
+    task_queue = manager.Queue()
+    result_queue = manager.Queue()
+    total = 0
+    for suite in suites:
+        for test_id in importlib.import_module(SUITES[suite]).TEST_DATA:
+            task_queue.put((suite, test_id))
+            total += 1
+    for _ in devices:
+        task_queue.put(None)
+
+    start = time.perf_counter()
+    since = time.time()
+    with ProcessPoolExecutor(max_workers=len(devices)) as pool:
+        futures = [pool.submit(_run_device, index, udid, task_queue, result_queue, url)
+                   for index, udid in enumerate(devices)]
+        # Bật sau khi đã tạo worker (không fork khi thread nền đang giữ lock)
+        monitor = device_pool().start_monitor()
+        try:
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    log.warning("⚠️ Device worker failed: %s", e)
+        finally:
+            monitor.stop_monitor()
+
+    rows = []
+    while not result_queue.empty():
+        rows.append(result_queue.get())
+    # Thiết bị hỏng giữa chừng (thread kiểm tra nền phát hiện): ghi lý do vào các case Fail trên thiết bị đó
+    problems = monitor.problems(devices, since)
+    for udid, problem in problems.items():
+        log.warning("⚠️ Device %s became unusable during the run: %s", udid, problem)
+    rows = [row[:4] + (f"{row[4]} (device: {problems[row[2]]})",) + row[5:]
+            if row[2] in problems and row[3] != "Pass" else row for row in rows]
+    # Case chưa chạy (ví dụ mọi thiết bị đều lỗi kết nối) vẫn được ghi là Fail
+    done = {(r[0], r[1]) for r in rows}
+    for suite in suites:
+        for test_id in importlib.import_module(SUITES[suite]).TEST_DATA:
+            if (suite, test_id) not in done:
+                rows.append((suite, test_id, "", "Fail", "Not run: no device available", 0.0))
+
+    log.info("⏱️ %s case(s) on %s device(s) in %.1fs", total, len(devices), time.perf_counter() - start)
+    write_workbook(rows, path)
+    record_history(rows, history)
+    return rows
+
+
+def record_history(rows, history=None):
+    """Ghi kết quả của lần chạy song song vào lịch sử SQLite, mỗi kết quả kèm thiết bị đã chạy"""
+    history = history or RunHistory()
+    run_id = f"parallel-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    for suite, test_id, udid, status, note, duration in rows:
+        history.start_run(run_id, suite)
+        history.record(run_id, suite, test_id, status, note, duration, udid)
+    log.info("🗄️ Run %s recorded in %s", run_id, history.path)
+    return run_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run test cases in parallel across devices")
+    parser.add_argument("--devices", default=os.environ.get("APPIUM_DEVICES", ""),
+                        help="Comma-separated device udids (default: $APPIUM_DEVICES, else every healthy device)")
+    parser.add_argument("--suites", default=",".join(SUITES),
+                        help=f"Comma-separated suites to run ({', '.join(SUITES)})")
+    parser.add_argument("--output", default=file_path, help="Merged results workbook")
+    args = parser.parse_args()
+
+    devices = [d.strip() for d in args.devices.split(",") if d.strip()]
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    if not devices:
+        devices = [device.serial for device in device_pool().healthy()]
+        log.info("📱 Using healthy device(s): %s", ", ".join(devices) or "none")
+    if not devices:
+        parser.error("no devices given and no healthy device found (use --devices or APPIUM_DEVICES)")
+    unknown = [s for s in suites if s not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+    run_parallel(devices, suites, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Kiểm tra parallel_runner: chia case của suite login cho hai thiết bị trên fake_appium.
+
+    python -m unittest parallel_runner_test
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from openpyxl import load_workbook
+import parallel_runner
+from device_manager import DeviceManager
+from fake_session import start_server
+from login_test import TEST_DATA
+from run_history import RunHistory
+
+FAKE_ADB = f'"{sys.executable}" "{os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_adb.py")}"'
+DEVICES = ["emulator-5554", "emulator-5556"]
+
+
+class TestParallelRunner(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(self.directory, "parallel.xlsx")
+        self.history = RunHistory(os.path.join(self.directory, "history.sqlite"))
+        self.addCleanup(self.history.close)
+        manager = DeviceManager(adb=FAKE_ADB, cache_path=os.path.join(self.directory, "devices.json"))
+        patcher = mock.patch.object(parallel_runner, "device_pool", return_value=manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_login(self, url):
+        return parallel_runner.run_parallel(DEVICES, ["login"], self.path, url=url, history=self.history)
+
+    def test_shards_cases_across_devices(self):
+        # Độ trễ mỗi lệnh đủ để thiết bị thứ hai kịp nhận case
+        server = start_server(self, latency=0.02)
+        rows = self.run_login(server.url)
+        self.assertEqual(sorted(row[1] for row in rows), sorted(TEST_DATA))
+        self.assertEqual({row[2] for row in rows}, set(DEVICES))
+        # Hai case có dữ liệu sai (xem validation_oracle.py check login), còn lại đều pass
+        self.assertEqual(sorted(row[1] for row in rows if row[3] != "Pass"), ["TC01", "TC03"])
+
+        sheet = [list(row) for row in load_workbook(self.path, read_only=True).active.iter_rows(values_only=True)]
+        self.assertEqual(sheet[0], ["Test Case", "Suite", "Description", "Device", "Status", "Note", "Duration (s)"])
+        self.assertEqual([row[0] for row in sheet[1:]], list(TEST_DATA))
+        [trend] = self.history.pass_rate_trend("login")
+        self.assertEqual((trend["passed"], trend["total"]), (len(TEST_DATA) - 2, len(TEST_DATA)))
+        devices = self.history.conn.execute("SELECT DISTINCT device FROM results").fetchall()
+        self.assertEqual(sorted(row["device"] for row in devices), DEVICES)
+
+    def test_cases_without_a_device_are_recorded_as_failed(self):
+        server = start_server(self)
+        url = server.url
+        server.stop()
+        rows = self.run_login(url)
+        self.assertEqual(len(rows), len(TEST_DATA))
+        self.assertEqual({(row[2], row[3], row[4]) for row in rows}, {("", "Fail", "Not run: no device available")})
+
+
+if __name__ == "__main__":
+    unittest.main()
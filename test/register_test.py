@@ -6,9 +6,35 @@ from appium.options.android import UiAutomator2Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from openpyxl import Workbook, load_workbook
-import subprocess
 import time
+from waits import settle, wait_for_text
+from page_snapshot import PageSnapshot
+from element_cache import ElementCache
+from form_fill import FormFiller
+from appium_session import APPIUM_URL
+from device_manager import device_pool
+from results_sink import ResultsSink, import_rows, write_rows_report
+from run_history import RunHistory
+from tracing import start_tracing, stop_tracing, traced_sleep
+from retry_policy import RETRY_PROBE_TIMEOUT, RetryPolicy
+from app_ready import AppReadiness
+from api_fixtures import Account, seed
+from fake_api import start_mock_api, stop_mock_api
+from result_cache import ResultCache
+from artifacts import FailureCapture
+from harness_log import get_logger, start_logging, stop_logging
+from case_matrix import register_matrix
+
+UDID = os.environ.get("APPIUM_UDID", "b9fff218")
+log = get_logger("register")
+
+# Các trường của form đăng ký
+REGISTER_FIELDS = [
+    "//android.widget.EditText[@index='1']",  # Username
+    "//android.widget.EditText[@index='2']",  # Email
+    "//android.widget.EditText[@index='3']",  # Password
+    "//android.widget.EditText[@index='4']"   # Confirm Password
+]
 
 # Test data
 TEST_DATA = {
@@ -110,59 +136,101 @@ TEST_DATA = {
     }
 }
 
+# Tạo sẵn qua API khi API_FIXTURES=1: tài khoản TC_REGISTER_10 cần đã tồn tại,
+# tài khoản TC_REGISTER_12 đăng ký qua giao diện nên phải chưa tồn tại (xóa trước và sau run)
+SEED_ACCOUNTS = [Account(TEST_DATA["TC_REGISTER_10"]["username"], TEST_DATA["TC_REGISTER_10"]["email"],
+                         TEST_DATA["TC_REGISTER_10"]["password"])]
+REGISTERED_ACCOUNTS = [Account(TEST_DATA["TC_REGISTER_12"]["username"], TEST_DATA["TC_REGISTER_12"]["email"],
+                               TEST_DATA["TC_REGISTER_12"]["password"])]
+
+# CASE_MATRIX=2 (pairwise), 3, ...: thêm các case sinh từ miền giá trị (email hợp lệ là tài khoản TC_REGISTER_10);
+# TC_REGISTER_12 vẫn chạy cuối vì test_register_sequential dừng ở lần đăng ký thành công
+TEST_DATA.update(register_matrix(SEED_ACCOUNTS[0]))
+TEST_DATA["TC_REGISTER_12"] = TEST_DATA.pop("TC_REGISTER_12")
+
 # Đường dẫn file Excel
 output_dir = "output"
 file_path = os.path.join(output_dir, "test_results_register.xlsx")
-results = []
+RESULT_FIELDS = ["test_case", "description", "result", "status", "note"]
 
-# Tạo thư mục output nếu chưa có
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
+def open_sink():
+    """Log kết quả (output/test_results_SUITE.csv), lần đầu nhập lịch sử từ file Excel cũ"""
+    sink = ResultsSink(os.path.splitext(os.path.basename(file_path))[0], fields=RESULT_FIELDS, directory=output_dir,
+                       history=RunHistory(), suite="register", device=UDID)
+    sink.import_workbook(file_path, import_rows(RESULT_FIELDS))
+    return sink
 
-# Nếu file không tồn tại -> tạo mới
-if not os.path.exists(file_path):
-    wb = Workbook()
-    ws = wb.active
-    ws.append(["Test Case", "Description", "Result", "Status", "Note"])
-    wb.save(file_path)
+def build_report(sink=None, path=file_path):
+    """Dựng lại file Excel từ log: mỗi kết quả một dòng"""
+    return write_rows_report(sink or open_sink(), path,
+                             ["Test Case", "Description", "Result", "Status", "Note"], RESULT_FIELDS)
 
 class TestRegisterAppium(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Khởi tạo kết nối Appium"""
-        print("🔗 Connecting to Appium...")
-        
-        # Kiểm tra thiết bị Android
-        try:
-            devices = subprocess.check_output("adb devices", shell=True).decode()
-            if "b9fff218" not in devices:
-                raise Exception("Emulator-5554 not found. Please start the emulator.")
-        except subprocess.CalledProcessError:
-            raise Exception("Error running adb. Ensure Android SDK is installed and adb is in PATH.")
+        # Kết quả được ghi xuống log ngay sau mỗi case, không giữ trong bộ nhớ đến cuối
+        cls.sink = open_sink()
+        start_logging("register", cls.sink.run_id)
+        # Với RESULT_CACHE=1 / RERUN_FAILED=1 chỉ chạy case mới, đã đổi hoặc đang lỗi
+        cls.result_cache = ResultCache("register", __file__, UDID, cls.sink.history)
+        cls.cases = cls.result_cache.select(TEST_DATA)
+        if not cls.cases:
+            raise unittest.SkipTest("No test case needs to run")
+        cls.tracer = start_tracing("register", cls.sink.run_id)
+        cls.artifacts = FailureCapture("register", cls.sink.run_id, cls.sink.history, cls.tracer)
+        # Thiết bị lấy từ danh sách dùng chung; adb chỉ được gọi khi cache đã cũ
+        cls.device = device_pool().acquire(UDID)
+        log.info("📱 Using device %s", cls.device)
+        cls.mock_api = start_mock_api(UDID)
+        cls.api = seed(present=SEED_ACCOUNTS, absent=REGISTERED_ACCOUNTS)
+        log.info("🔗 Connecting to Appium...")
 
         # Cấu hình Appium
         options = UiAutomator2Options()
         options.platform_name = "Android"
         options.device_name = "MyAndroidDevice"
-        options.udid = "b9fff218"
+        options.udid = UDID
         options.app_package = "com.example.flutter_shop"
         options.app_activity = "com.example.flutter_shop.MainActivity"
         options.automation_name = "UiAutomator2"
         options.no_reset = True  # Không reset ứng dụng để giữ trạng thái
+        # Logcat chỉ gồm log từ lúc tạo phiên để mốc frame đầu tiên là của lần mở app này
+        options.clear_device_logs_on_start = True
 
         # Thử kết nối với retry
         max_attempts = 3
         for attempt in range(max_attempts):
             try:
-                cls.driver = webdriver.Remote("http://localhost:4723", options=options)
+                since = time.perf_counter()
+                cls.driver = cls.tracer.instrument(webdriver.Remote(APPIUM_URL, options=options))
                 cls.wait = WebDriverWait(cls.driver, 60)
-                print("✅ Connected successfully!")
+                cls.snapshot = PageSnapshot(cls.driver)
+                cls.cache = ElementCache(cls.driver, timeout=60, snapshot=cls.snapshot)
+                cls.filler = FormFiller(cls.driver, snapshot=cls.snapshot)
+                cls.policy = RetryPolicy(cls.driver)
+                log.info("✅ Connected successfully!")
                 break
             except Exception as e:
-                print(f"⚠️ Appium connection error (attempt {attempt + 1}/{max_attempts}): {str(e)}")
+                log.warning("⚠️ Appium connection error (attempt %s/%s): %s", attempt + 1, max_attempts, e)
                 if attempt == max_attempts - 1:
+                    device_pool().report_failure(UDID, str(e))
                     raise Exception("Failed to connect to Appium after multiple attempts.")
-                time.sleep(2)
+                # Thiết bị đã mất thì thử kết nối lại cũng vô ích
+                problem = device_pool().check(UDID, force=True).problem()
+                if problem:
+                    raise Exception(f"Device became unavailable: {problem}")
+                traced_sleep(2, "connect retry")
+
+        # Chờ app sẵn sàng (màn hình đăng nhập đã có nút Create an account)
+        cls.readiness = AppReadiness(cls.driver, "//android.widget.Button[@content-desc='Create an account']")
+        try:
+            cls.readiness.wait(since)
+        except TimeoutException:
+            # setUpClass lỗi thì tearDownClass không chạy: tự đóng phiên
+            cls.driver.quit()
+            raise
+        cls.readiness.print_summary()
 
         # Điều hướng tới màn hình đăng ký
         cls.navigate_to_register_screen()
@@ -172,141 +240,118 @@ class TestRegisterAppium(unittest.TestCase):
         """Điều hướng tới màn hình đăng ký"""
         try:
             # Click vào Create an account
-            create_account_button = cls.wait.until(EC.element_to_be_clickable(
+            create_account_button = cls.policy.until(EC.element_to_be_clickable(
                 (AppiumBy.XPATH, "//android.widget.Button[@content-desc='Create an account']")
             ))
             create_account_button.click()
-            print("🖱️ Clicked Create an account")
-            time.sleep(2)
+            log.debug("🖱️ Clicked Create an account")
+            settle(cls.driver)
 
             # Kiểm tra xem đã ở màn hình đăng ký chưa (giữ nguyên logic cũ nếu cần)
             try:
-                login_button = cls.wait.until(EC.element_to_be_clickable(
+                login_button = cls.policy.until(EC.element_to_be_clickable(
                     (AppiumBy.XPATH, "//android.widget.Button[@text='Already have an account? Login']")
-                ))
+                ), timeout=RETRY_PROBE_TIMEOUT)
                 login_button.click()
-                print("🖱️ Clicked to navigate to register screen")
-                time.sleep(2)
+                log.debug("🖱️ Clicked to navigate to register screen")
+                settle(cls.driver)
             except TimeoutException:
-                print("⚠️ Could not find button to navigate to register screen")
+                log.warning("⚠️ Could not find button to navigate to register screen")
         except TimeoutException as e:
-            print(f"⚠️ Navigation error: {str(e)}")
+            log.warning("⚠️ Navigation error: %s", e)
+        cls.cache.screen_changed()
 
     @classmethod
     def tearDownClass(cls):
         """Đóng kết nối Appium và lưu kết quả"""
         cls.driver.quit()
-        print("🔴 Disconnected!")
-        wb = load_workbook(file_path)
-        ws = wb.active
-        for result in results:
-            ws.append(result)
-        wb.save(file_path)
-        print(f"📝 Results saved to {file_path}")
+        device_pool().release(UDID)
+        log.info("🔴 Disconnected!")
+        cls.cache.print_stats()
+        cls.policy.print_stats()
+        cls.policy.save(cls.sink.history, cls.sink.run_id, "register")
+        cls.readiness.save(cls.sink.history, cls.sink.run_id, "register", cls.sink.device)
+        cls.artifacts.close()
+        cls.tracer.print_summary(cls.tracer.save(cls.sink.history))
+        stop_tracing()
+        build_report(cls.sink)
+        log.info("📝 Results saved to %s", file_path)
+        if cls.api is not None:
+            cls.api.close()
+        stop_mock_api()
+        stop_logging()
 
     def clear_form(self):
         """Xóa dữ liệu trong form đăng ký"""
         try:
-            fields = [
-                "//android.widget.EditText[@index='1']",  # Username
-                "//android.widget.EditText[@index='2']",  # Email
-                "//android.widget.EditText[@index='3']",  # Password
-                "//android.widget.EditText[@index='4']"   # Confirm Password
-            ]
-            for xpath in fields:
-                field = self.wait.until(EC.visibility_of_element_located((AppiumBy.XPATH, xpath)))
-                field.click()
-                field.clear()
-            print("🧹 Form cleared")
-        except TimeoutException as e:
-            print(f"⚠️ Could not clear form: {str(e)}")
+            # Một lần lấy page_source cho cả 4 trường, xóa chúng trong một lượt
+            self.snapshot.wait_for(REGISTER_FIELDS)
+            self.filler.fill({field: "" for field in REGISTER_FIELDS})
+            log.debug("🧹 Form cleared")
+        except (TimeoutException, NoSuchElementException) as e:
+            log.warning("⚠️ Could not clear form: %s", e)
 
     def register(self, username, email, password, confirm_password, expected_error=None):
         """Hàm thực hiện đăng ký"""
         try:
-            print(f"🔍 Registering with Username: {username} / Email: {email} / Password: {password} / Confirm Password: {confirm_password}")
-            # Trường Username
-            username_field = self.wait.until(EC.visibility_of_element_located(
-                (AppiumBy.XPATH, "//android.widget.EditText[@index='1']")
-            ))
-            username_field.click()
-            username_field.clear()
-            username_field.send_keys(username)
-
-            # Trường Email
-            email_field = self.wait.until(EC.visibility_of_element_located(
-                (AppiumBy.XPATH, "//android.widget.EditText[@index='2']")
-            ))
-            email_field.click()
-            email_field.clear()
-            email_field.send_keys(email)
-
-            # Trường Password
-            pass_field = self.wait.until(EC.visibility_of_element_located(
-                (AppiumBy.XPATH, "//android.widget.EditText[@index='3']")
-            ))
-            pass_field.click()
-            pass_field.clear()
-            pass_field.send_keys(password)
-
-            # Trường Confirm Password
-            confirm_pass_field = self.wait.until(EC.visibility_of_element_located(
-                (AppiumBy.XPATH, "//android.widget.EditText[@index='4']")
-            ))
-            confirm_pass_field.click()
-            confirm_pass_field.clear()
-            confirm_pass_field.send_keys(confirm_password)
-            time.sleep(2)
+            log.debug("🔍 Registering with Username: %s / Email: %s / Password: %s / Confirm Password: %s",
+                      username, email, password, confirm_password, extra={"step": "fill"})
+            # Username, Email, Password, Confirm Password: giải cùng một snapshot
+            self.snapshot.wait_for(REGISTER_FIELDS)
+            self.filler.fill(dict(zip(REGISTER_FIELDS, [username, email, password, confirm_password])))
 
             # Nhấn nút Register
-            register_button = self.wait.until(EC.element_to_be_clickable(
-                (AppiumBy.XPATH, "//android.widget.Button[@content-desc='Register']")
-            ))
+            register_button = self.cache.find(
+                AppiumBy.XPATH, "//android.widget.Button[@content-desc='Register']", EC.element_to_be_clickable
+            )
             register_button.click()
-            print("🖱️ Clicked Register button!")
-
-            # Chờ ngắn hơn để kiểm tra thông báo lỗi hoặc chuyển hướng
-            time.sleep(3)
+            log.debug("🖱️ Clicked Register button!")
 
             # Nếu có lỗi mong đợi, kiểm tra thông báo lỗi ngay sau khi nhấn Register
             if expected_error and expected_error != "login_screen":
                 error_msg = expected_error.split("error:")[1]
                 if self.is_error_message_displayed(error_msg):
-                    print("❌ Đăng ký không thành công!")
+                    log.debug("❌ Đăng ký không thành công!")
                     return None
                 else:
-                    print("❌ Đăng ký không thành công! Không tìm thấy thông báo lỗi mong đợi.")
+                    log.debug("❌ Đăng ký không thành công! Không tìm thấy thông báo lỗi mong đợi.")
                     return "Error message not displayed"
 
+            # Chờ màn hình đăng nhập xuất hiện thay vì sleep cố định
+            try:
+                wait_for_text(self.driver, "Create an account")
+            except TimeoutException:
+                pass
+
             # Kiểm tra nếu chuyển hướng thành công tới màn hình đăng nhập
             if self.is_login_screen():
                 if expected_error == "login_screen":
-                    print("✅ Đăng ký thành công! Chuyển hướng đến màn hình đăng nhập")
+                    log.debug("✅ Đăng ký thành công! Chuyển hướng đến màn hình đăng nhập")
                     return None
                 else:
-                    print("❌ Đăng ký không thành công! Chuyển hướng sai đến màn hình đăng nhập")
+                    log.debug("❌ Đăng ký không thành công! Chuyển hướng sai đến màn hình đăng nhập")
                     return "Unexpected navigation to login screen"
             else:
-                print("❌ Đăng ký không thành công! Không chuyển hướng đến màn hình đăng nhập")
+                log.debug("❌ Đăng ký không thành công! Không chuyển hướng đến màn hình đăng nhập")
                 return "Failed to redirect to login screen after registration"
 
         except TimeoutException as e:
-            print("❌ Đăng ký không thành công!")
+            log.debug("❌ Đăng ký không thành công!")
             return f"Error: Element not found - {str(e)}"
         except Exception as e:
-            print("❌ Đăng ký không thành công!")
+            log.debug("❌ Đăng ký không thành công!")
             return f"Unknown error: {str(e)}"
 
     def is_login_screen(self):
         """Kiểm tra xem có đang ở màn hình đăng nhập"""
         try:
-            self.wait.until(EC.visibility_of_element_located(
-                (AppiumBy.XPATH, "//android.widget.EditText[@index='1']")  # Trường email của login
-            ))
-            print("")
+            self.policy.find(
+                self.cache, AppiumBy.XPATH, "//android.widget.EditText[@index='1']",  # Trường email của login
+                EC.visibility_of_element_located, timeout=RETRY_PROBE_TIMEOUT
+            )
             return True
         except TimeoutException:
-            print("❓ Not on login screen")
+            log.debug("❓ Not on login screen")
             return False
 
     def is_error_message_displayed(self, expected_message):
@@ -316,74 +361,113 @@ class TestRegisterAppium(unittest.TestCase):
             WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located(
                 (AppiumBy.XPATH, f"//android.widget.TextView[@text='{expected_message}']")
             ))
-            print(f"⚠️ Error message found: '{expected_message}'")
+            log.debug("⚠️ Error message found: '%s'", expected_message)
             return True
         except TimeoutException:
-            print(f"❌ Error message not found: '{expected_message}'")
+            log.debug("❌ Error message not found: '%s'", expected_message)
             return False
 
     def navigate_back_to_register(self):
         """Điều hướng trở lại màn hình đăng ký sau mỗi test"""
         if self.is_login_screen():
             try:
-                login_button = self.wait.until(EC.element_to_be_clickable(
+                login_button = self.policy.until(EC.element_to_be_clickable(
                     (AppiumBy.XPATH, "//android.widget.Button[@text='Already have an account? Login']")
-                ))
+                ), timeout=RETRY_PROBE_TIMEOUT)
                 login_button.click()
-                print("🖱️ Navigated back to register screen")
-                time.sleep(2)
+                self.cache.screen_changed()
+                log.debug("🖱️ Navigated back to register screen")
+                settle(self.driver)
             except TimeoutException:
-                print("")
                 self.navigate_to_register_screen()
 
+    def run_case(self, test_id):
+        """Chạy một test case đăng ký, trả về (result, status, note)"""
+        data = TEST_DATA[test_id]
+        log.info("📋 Running test %s: %s", test_id, data['description'], extra={"step": "case"})
+
+        # Gọi hàm register với thông báo lỗi mong đợi
+        error = self.register(
+            data["username"],
+            data["email"],
+            data["password"],
+            data["confirm_password"],
+            data["expected"]
+        )
+        expected = data["expected"]
+
+        if expected == "login_screen":
+            # Trường hợp tích cực: Mong đợi đăng ký thành công và chuyển hướng
+            if error is None and self.is_login_screen():
+                result = True
+                status = "Pass"
+                note = "Successfully registered and redirected to login screen"
+                log.info("✅ Test PASS: Registration successful")
+            else:
+                result = False
+                status = "Fail"
+                note = error if error else "Failed to reach login screen"
+                log.warning("❌ Test FAIL: %s", note)
+        else:
+            # Trường hợp tiêu cực: Kết quả dựa trên kiểm tra trong hàm register
+            error_msg = expected.split("error:")[1]
+            result = error is None  # Nếu không có lỗi trả về từ register, tức là tìm thấy thông báo lỗi
+            status = "Pass" if result else "Fail"
+            note = f"Expected error shown: '{error_msg}'" if result else f"Error message not displayed: '{error_msg}'"
+            if result:
+                log.info("✅ Test PASS: %s", note)
+            else:
+                log.warning("❌ Test FAIL: %s", note)
+        return result, status, note
+
+    def reset_for_next_case(self):
+        """Xóa form và quay lại màn hình đăng ký cho test case tiếp theo"""
+        self.clear_form()
+        # Điều hướng lại màn hình đăng ký nếu cần
+        if not self.is_login_screen():
+            self.navigate_to_register_screen()
+
     def test_register_sequential(self):
-        """Chạy tuần tự tất cả các test case cho đến khi đăng ký thành công"""
-        for test_id in TEST_DATA.keys():
+        """Chạy tuần tự các test case đã chọn cho đến khi đăng ký thành công"""
+        for test_id in self.cases:
             data = TEST_DATA[test_id]
-            print(f"\n📋 Running test {test_id}: {data['description']}")
-            
-            # Gọi hàm register với thông báo lỗi mong đợi
-            error = self.register(
-                data["username"],
-                data["email"],
-                data["password"],
-                data["confirm_password"],
-                data["expected"]
-            )
             expected = data["expected"]
-            
-            if expected == "login_screen":
-                # Trường hợp tích cực: Mong đợi đăng ký thành công và chuyển hướng
-                if error is None and self.is_login_screen():
-                    result = True
-                    status = "Pass"
-                    note = "Successfully registered and redirected to login screen"
-                    print("✅ Test PASS: Registration successful")
-                else:
-                    result = False
-                    status = "Fail"
-                    note = error if error else "Failed to reach login screen"
-                    print(f"❌ Test FAIL: {note}")
-            else:
-                # Trường hợp tiêu cực: Kết quả dựa trên kiểm tra trong hàm register
-                error_msg = expected.split("error:")[1]
-                result = error is None  # Nếu không có lỗi trả về từ register, tức là tìm thấy thông báo lỗi
-                status = "Pass" if result else "Fail"
-                note = f"Expected error shown: '{error_msg}'" if result else f"Error message not displayed: '{error_msg}'"
-                print(f"{'✅ Test PASS' if result else '❌ Test FAIL'}: {note}")
+            start = time.perf_counter()
+            with self.tracer.case_span(test_id), self.policy.case_budget(test_id):
+                result, status, note = self.run_case(test_id)
+            if status == "Fail":
+                self.artifacts.capture(self.driver, test_id, note)
 
-            results.append([test_id, data["description"], result, status, note])
-            print(f"📊 Recorded result for {test_id}: {status}")
+            duration = time.perf_counter() - start
+            self.sink.record(test_id, status, note, duration=duration,
+                             description=data["description"], result=result)
+            self.result_cache.record(self.sink.run_id, test_id, status)
+            log.info("📊 Recorded result for %s: %s", test_id, status,
+                     extra={"test_id": test_id, "step": "result", "duration": duration})
 
             # Nếu đăng ký thành công (TC_REGISTER_12), dừng lại
             if expected == "login_screen" and status == "Pass":
                 break
 
             # Xóa form và tiếp tục test case tiếp theo
-            self.clear_form()
-            # Điều hướng lại màn hình đăng ký nếu cần
-            if not self.is_login_screen():
-                self.navigate_to_register_screen()
+            self.reset_for_next_case()
+
+def prepare_case_runner(driver):
+    """Chạy từng test case trên một driver có sẵn (dùng cho parallel_runner)"""
+    TestRegisterAppium.driver = driver
+    TestRegisterAppium.wait = WebDriverWait(driver, 60)
+    TestRegisterAppium.snapshot = PageSnapshot(driver)
+    TestRegisterAppium.cache = ElementCache(driver, timeout=60, snapshot=TestRegisterAppium.snapshot)
+    TestRegisterAppium.filler = FormFiller(driver, snapshot=TestRegisterAppium.snapshot)
+    TestRegisterAppium.policy = RetryPolicy(driver)
+    TestRegisterAppium.navigate_to_register_screen()
+    test = TestRegisterAppium("test_register_sequential")
+
+    def run(test_id):
+        result, status, note = test.run_case(test_id)
+        test.reset_for_next_case()
+        return status, note
+    return run
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
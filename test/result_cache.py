@@ -0,0 +1,116 @@
+"""Bỏ qua test case đã pass với cùng build app, cùng dữ liệu và cùng code harness.
+
+Mỗi case có một fingerprint gồm: sha256 của APK đang cài trên thiết bị
+(hoặc file $APP_APK), TEST_DATA của case và code harness (file suite cùng
+các module dùng chung trong test/). Fingerprint đã pass được lưu trong
+run_history.sqlite; lần sau chỉ case mới, đã đổi hoặc chưa pass mới chạy.
+
+    RESULT_CACHE=1 python login_test.py   # bỏ qua case không đổi đã pass
+    RERUN_FAILED=1 python login_test.py   # chỉ chạy lại case có kết quả gần nhất không phải Pass
+
+Cả hai đều kết hợp được với $TEST_CASES của impact.py.
+"""
+import glob
+import hashlib
+import json
+import os
+from device_manager import device_pool
+from impact import selected_cases
+from run_history import RunHistory, app_build
+from harness_log import get_logger
+
+log = get_logger("result_cache")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULT_CACHE = os.environ.get("RESULT_CACHE") == "1"
+RERUN_FAILED = os.environ.get("RERUN_FAILED") == "1"
+
+
+def file_digest(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def harness_digest(suite_file):
+    """sha256 của file suite và các module harness dùng chung (không gồm các file *_test.py khác)"""
+    shared = [path for path in sorted(glob.glob(os.path.join(HERE, "*.py"))) if not path.endswith("_test.py")]
+    return file_digest(os.path.abspath(suite_file), *shared)
+
+
+def case_digest(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def build_digest(udid):
+    """Build đang test: file $APP_APK, nếu không có thì APK cài trên thiết bị, cuối cùng là app_build()"""
+    apk = os.environ.get("APP_APK")
+    if apk and os.path.exists(apk):
+        return file_digest(apk)
+    digest = device_pool().apk_digest(udid)
+    if digest is None:
+        log.warning("⚠️ Could not hash the installed app on %s, using build %s", udid, app_build())
+        return f"build:{app_build()}"
+    return digest
+
+
+class ResultCache:
+    """Chọn test case cần chạy theo fingerprint và kết quả trước đó của một suite"""
+
+    def __init__(self, suite, suite_file, udid, history=None, enabled=RESULT_CACHE, failed_only=RERUN_FAILED,
+                 build=None):
+        self.suite = suite
+        self.suite_file = suite_file
+        self.udid = udid
+        self._history = history
+        self.enabled = enabled
+        self.failed_only = failed_only
+        self._build = build
+        self._harness = None
+        self.fingerprints = {}
+
+    @property
+    def history(self):
+        if self._history is None:
+            self._history = RunHistory()
+        return self._history
+
+    @property
+    def build(self):
+        if self._build is None:
+            self._build = build_digest(self.udid)
+        return self._build
+
+    def fingerprint(self, data):
+        if self._harness is None:
+            self._harness = harness_digest(self.suite_file)
+        return hashlib.sha256(f"{self.build}:{self._harness}:{case_digest(data)}".encode("utf-8")).hexdigest()
+
+    def select(self, test_data):
+        """Các test case cần chạy, theo thứ tự TEST_DATA"""
+        cases = selected_cases(test_data)
+        if self.failed_only:
+            latest = self.history.latest_statuses(self.suite)
+            cases = [test_id for test_id in cases if latest.get(test_id, "Pass") != "Pass"]
+            log.info("🔁 Rerunning %s failed case(s): %s", len(cases), ", ".join(cases) or "none")
+        if not self.enabled:
+            return cases
+        pending = []
+        for test_id in cases:
+            self.fingerprints[test_id] = self.fingerprint(test_data[test_id])
+            cached = self.history.cached_pass(self.suite, test_id, self.fingerprints[test_id])
+            if cached is None:
+                pending.append(test_id)
+            else:
+                log.info("⏭️ Skipping %s: passed with the same build and data in run %s", test_id, cached["run_id"])
+        log.info("🗃️ Result cache: %s case(s) to run, %s unchanged and passed", len(pending),
+                 len(cases) - len(pending))
+        return pending
+
+    def record(self, run_id, test_id, status):
+        """Lưu fingerprint của một case vừa chạy (chỉ khi bật RESULT_CACHE)"""
+        if self.enabled and test_id in self.fingerprints:
+            self.history.record_fingerprint(run_id, self.suite, test_id, self.fingerprints[test_id], status)
@@ -0,0 +1,59 @@
+"""Kiểm tra result_cache với một run_history tạm (không cần thiết bị).
+
+    python -m unittest result_cache_test
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+from result_cache import ResultCache
+from run_history import RunHistory
+
+TEST_DATA = {"TC01": {"email": "a@b.c"}, "TC02": {"email": ""}, "TC03": {"email": "x"}}
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.history = RunHistory(os.path.join(directory.name, "history.sqlite"))
+        self.addCleanup(self.history.close)
+        patcher = mock.patch.dict(os.environ, {"TEST_CASES": ""})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cache(self, build="apk-1", **options):
+        return ResultCache("login", __file__, "phone", self.history, build=build, **options)
+
+    def run_cases(self, cache, test_data, statuses, run_id):
+        """Giả lập một lần chạy suite: chọn case rồi ghi kết quả"""
+        cases = cache.select(test_data)
+        for test_id in cases:
+            self.history.start_run(run_id, "login", build="")
+            self.history.record(run_id, "login", test_id, statuses[test_id])
+            cache.record(run_id, test_id, statuses[test_id])
+        return cases
+
+    def test_skips_unchanged_cases_that_passed(self):
+        statuses = {"TC01": "Pass", "TC02": "Fail", "TC03": "Pass"}
+        self.assertEqual(self.run_cases(self.cache(enabled=True), TEST_DATA, statuses, "run-1"), list(TEST_DATA))
+        self.assertEqual(self.run_cases(self.cache(enabled=True), TEST_DATA, statuses, "run-2"), ["TC02"])
+        changed = dict(TEST_DATA, TC03={"email": "y"})
+        self.assertEqual(self.cache(enabled=True).select(changed), ["TC02", "TC03"])
+        self.assertEqual(self.cache(build="apk-2", enabled=True).select(TEST_DATA), list(TEST_DATA))
+
+    def test_disabled_cache_runs_everything(self):
+        statuses = {"TC01": "Pass", "TC02": "Pass", "TC03": "Pass"}
+        self.run_cases(self.cache(enabled=True), TEST_DATA, statuses, "run-1")
+        self.assertEqual(self.cache(enabled=False).select(TEST_DATA), list(TEST_DATA))
+
+    def test_rerun_failed_only(self):
+        self.run_cases(self.cache(), TEST_DATA, {"TC01": "Fail", "TC02": "Pass", "TC03": "Fail"}, "run-1")
+        self.run_cases(self.cache(), {"TC03": TEST_DATA["TC03"]}, {"TC03": "Pass"}, "run-2")
+        self.assertEqual(self.cache(failed_only=True).select(TEST_DATA), ["TC01"])
+        with mock.patch.dict(os.environ, {"TEST_CASES": "TC02,TC03"}):
+            self.assertEqual(self.cache(failed_only=True).select(TEST_DATA), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""Ghi kết quả test ngay khi có vào log CSV chỉ-ghi-thêm, dựng file Excel khi cần.
+
+Mỗi suite có một log trong output/ (ví dụ output/test_results_register.csv).
+Mỗi kết quả được ghi thêm một dòng và fsync ngay, nên nếu tiến trình bị
+dừng giữa chừng thì các case đã chạy vẫn còn. File .xlsx được dựng lại
+từ log bằng openpyxl ở chế độ write-only:
+    python results_sink.py report login
+"""
+import argparse
+import csv
+import os
+import re
+import time
+from openpyxl import Workbook, load_workbook
+from harness_log import get_logger
+
+log = get_logger("results_sink")
+
+output_dir = "output"
+BASE_FIELDS = ["run", "timestamp", "test_case", "status", "note"]
+
+
+class ResultsSink:
+    """Log kết quả chỉ-ghi-thêm cho một suite"""
+
+    def __init__(self, name, fields=(), directory=output_dir, run_id=None, history=None, suite=None, device=""):
+        self.name = name
+        # Nếu có RunHistory, mỗi kết quả cũng được ghi vào lịch sử SQLite
+        self.history = history
+        self.suite = suite or name
+        self.device = device
+        self.fields = BASE_FIELDS + [f for f in fields if f not in BASE_FIELDS]
+        self.path = os.path.join(directory, f"{name}.csv")
+        self.run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self.path):
+            self._append_line(self.fields)
+
+    def _append_line(self, values):
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(values)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record(self, test_case, status, note="", run=None, duration=None, **fields):
+        """Ghi một kết quả xuống đĩa ngay lập tức"""
+        row = {"run": run or self.run_id, "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+               "test_case": test_case, "status": status, "note": note, **fields}
+        self._append_line(["" if row.get(f) is None else row.get(f) for f in self.fields])
+        if self.history is not None:
+            # Kết quả nhập từ file cũ không biết build của app
+            self.history.start_run(row["run"], self.suite, build=None if run is None else "",
+                                   started_at=row["timestamp"])
+            self.history.record(row["run"], self.suite, test_case, status, note, duration, self.device,
+                                recorded_at=row["timestamp"])
+
+    def rows(self):
+        """Đọc lại toàn bộ log theo thứ tự ghi"""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    def runs(self):
+        """Các run id theo thứ tự xuất hiện"""
+        seen = {}
+        for row in self.rows():
+            seen.setdefault(row["run"], None)
+        return list(seen)
+
+    def import_workbook(self, xlsx_path, importer):
+        """Chuyển lịch sử từ file Excel cũ vào log (chỉ khi log còn trống)"""
+        if self.rows() or not os.path.exists(xlsx_path):
+            return 0
+        ws = load_workbook(xlsx_path, read_only=True).active
+        count = 0
+        for row in importer(list(ws.iter_rows(values_only=True))):
+            self.record(**row)
+            count += 1
+        if count:
+            log.info("📥 Imported %s result(s) from %s into %s", count, xlsx_path, self.path)
+        return count
+
+
+def _cell(value):
+    # CSV lưu True/False dạng chuỗi, đưa về bool như file Excel cũ
+    return {"True": True, "False": False}.get(value, value)
+
+
+def write_rows_report(sink, xlsx_path, headers, fields):
+    """Mỗi kết quả trong log là một dòng Excel, cột lấy theo fields"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(headers)
+    for row in sink.rows():
+        ws.append([_cell(row.get(field, "")) for field in fields])
+    wb.save(xlsx_path)
+    return xlsx_path
+
+
+def write_pivot_report(sink, xlsx_path, headers, cases, missing="Fail"):
+    """Mỗi test case một dòng, mỗi lần chạy một cột "Test N" """
+    runs = sink.runs()
+    status = {(row["run"], row["test_case"]): row["status"] for row in sink.rows()}
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(headers + [f"Test {n}" for n in range(1, len(runs) + 1)])
+    for test_case, values in cases:
+        ws.append([test_case] + values + [status.get((run, test_case), missing) for run in runs])
+    wb.save(xlsx_path)
+    return xlsx_path
+
+
+def import_rows(fields):
+    """Importer cho file Excel dạng mỗi kết quả một dòng (register, checkout)
+
+    File cũ không ghi run: các dòng được ghi theo thứ tự chạy, nên một test case
+    gặp lại lần nữa nghĩa là đã sang lần chạy sau (imported-1, imported-2, ...).
+    """
+    def importer(rows):
+        run, seen = 1, set()
+        for row in rows[1:]:
+            if row and row[0] is not None:
+                values = dict(zip(fields, row))
+                if values["test_case"] in seen:
+                    run, seen = run + 1, set()
+                seen.add(values["test_case"])
+                values["run"] = f"imported-{run}"
+                yield values
+    return importer
+
+
+def import_test_columns(rows):
+    """Importer cho file Excel dạng mỗi lần chạy một cột "Test N" (login)"""
+    headers = rows[0] if rows else ()
+    for column, header in enumerate(headers):
+        if header and re.fullmatch(r"Test \d+", str(header).strip()):
+            for row in rows[1:]:
+                if row[0] is not None and column < len(row) and row[column] is not None:
+                    yield {"test_case": row[0], "status": row[column], "run": f"imported-{column}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build Excel reports from the append-only result logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="Rebuild the .xlsx report of a suite")
+    report.add_argument("suite", choices=["login", "register", "checkout"])
+    args = parser.parse_args()
+
+    module = {"login": "login_test", "register": "register_test", "checkout": "addproduct_test"}[args.suite]
+    path = __import__(module).build_report()
+    log.info("📝 Report written to %s", path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Kiểm tra results_sink: log chỉ-ghi-thêm, nhập file Excel cũ, dựng báo cáo (thư mục tạm).
+
+    python -m unittest results_sink_test
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from openpyxl import Workbook, load_workbook
+from results_sink import ResultsSink, import_rows, import_test_columns, write_pivot_report, write_rows_report
+
+RESULT_FIELDS = ["test_case", "description", "result", "status", "note"]
+
+
+class TestResultsSink(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def sink(self, name="test_results", fields=(), run_id="run-1"):
+        return ResultsSink(name, fields, directory=self.directory, run_id=run_id)
+
+    def workbook(self, name, rows):
+        path = os.path.join(self.directory, name)
+        wb = Workbook()
+        for row in rows:
+            wb.active.append(row)
+        wb.save(path)
+        return path
+
+    def read(self, path):
+        return [list(row) for row in load_workbook(path, read_only=True).active.iter_rows(values_only=True)]
+
+    def test_appends_across_instances(self):
+        self.sink().record("TC01", "Pass")
+        second = self.sink(run_id="run-2")
+        second.record("TC01", "Fail", "Không thấy thông báo lỗi")
+        with open(second.path, encoding="utf-8") as f:
+            self.assertEqual(f.readline().strip(), "run,timestamp,test_case,status,note")
+        self.assertEqual([(row["run"], row["status"], row["note"]) for row in second.rows()],
+                         [("run-1", "Pass", ""), ("run-2", "Fail", "Không thấy thông báo lỗi")])
+        self.assertEqual(second.runs(), ["run-1", "run-2"])
+
+    def test_results_survive_a_killed_process(self):
+        # Tiến trình chết ngay sau record (không đóng file, không dọn dẹp): dòng đã fsync vẫn còn
+        script = ("import os, sys; from results_sink import ResultsSink; "
+                  "sink = ResultsSink('test_results', directory=sys.argv[1], run_id='killed'); "
+                  "sink.record('TC01', 'Pass'); sink.record('TC02', 'Fail', 'timeout'); os._exit(1)")
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, "-c", script, self.directory], env=env, check=False)
+        self.assertEqual([(row["test_case"], row["status"]) for row in self.sink().rows()],
+                         [("TC01", "Pass"), ("TC02", "Fail")])
+
+    def test_import_login_test_columns(self):
+        path = self.workbook("test_results.xlsx", [
+            ["Test Case", "Description", "Username", "Password", "Expected Result", "Test 1", "Test 2"],
+            ["TC01", "Đăng nhập đúng", "user@example.com", "Pass@123", "Success", "Pass", "Fail"],
+            ["TC02", "Email trống", "", "Pass@123", "error:Email cannot be empty!", "Pass", None],
+        ])
+        sink = self.sink()
+        self.assertEqual(sink.import_workbook(path, import_test_columns), 3)
+        self.assertEqual([(row["run"], row["test_case"], row["status"]) for row in sink.rows()],
+                         [("imported-5", "TC01", "Pass"), ("imported-5", "TC02", "Pass"),
+                          ("imported-6", "TC01", "Fail")])
+        # Log đã có dữ liệu: không nhập lại
+        self.assertEqual(sink.import_workbook(path, import_test_columns), 0)
+
+    def test_import_register_rows(self):
+        path = self.workbook("test_results_register.xlsx", [
+            ["Test Case", "Description", "Result", "Status", "Note"],
+            ["TC_REGISTER_01", "Đăng ký", True, "Pass", ""],
+            ["TC_REGISTER_02", "Email trống", False, "Fail", "Không thấy lỗi"],
+            ["TC_REGISTER_01", "Đăng ký", False, "Fail", ""],
+            [None, None, None, None, None],
+        ])
+        sink = self.sink("test_results_register", ["description", "result"])
+        self.assertEqual(sink.import_workbook(path, import_rows(RESULT_FIELDS)), 3)
+        self.assertEqual(sink.runs(), ["imported-1", "imported-2"])
+        report = write_rows_report(sink, os.path.join(self.directory, "report.xlsx"),
+                                   ["Test Case", "Result", "Status"], ["test_case", "result", "status"])
+        self.assertEqual(self.read(report), [["Test Case", "Result", "Status"], ["TC_REGISTER_01", True, "Pass"],
+                                             ["TC_REGISTER_02", False, "Fail"], ["TC_REGISTER_01", False, "Fail"]])
+
+    def test_pivot_report_has_one_column_per_run(self):
+        self.sink().record("TC01", "Pass")
+        sink = self.sink(run_id="run-2")
+        sink.record("TC01", "Fail")
+        sink.record("TC02", "Pass")
+        path = write_pivot_report(sink, os.path.join(self.directory, "pivot.xlsx"), ["Test Case", "Description"],
+                                  [("TC01", ["Đăng nhập đúng"]), ("TC02", ["Email trống"])])
+        self.assertEqual(self.read(path), [["Test Case", "Description", "Test 1", "Test 2"],
+                                           ["TC01", "Đăng nhập đúng", "Pass", "Fail"],
+                                           ["TC02", "Email trống", "Fail", "Pass"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+"""Chính sách thử lại/timeout dùng chung cho các bước tìm phần tử và chờ.
+
+Mỗi bước có một deadline tổng (RETRY_STEP_TIMEOUT) và mỗi test case một
+deadline tổng (RETRY_CASE_TIMEOUT); bước không bao giờ chạy quá deadline
+của case đang chạy. Trong deadline, mỗi lần thử chờ tối đa
+RETRY_ATTEMPT_TIMEOUT, giữa các lần thử là backoff tăng gấp đôi (từ
+RETRY_BACKOFF đến RETRY_MAX_BACKOFF). Bước dừng ngay, không thử lại, khi gặp
+trạng thái không tự hết được: session Appium đã mất hoặc app không còn ở
+foreground (crash, ANR, đã thoát ra launcher).
+
+Thống kê theo locator (số lần gọi, lần thử lại, lỗi, thời gian) được in cuối
+run và lưu vào lịch sử để thấy locator chậm kinh niên:
+    python run_history.py locators --suite checkout
+"""
+import os
+import time
+from contextlib import contextmanager
+from selenium.common.exceptions import (InvalidSessionIdException, NoSuchDriverException, NoSuchElementException,
+                                        StaleElementReferenceException, TimeoutException, WebDriverException)
+from appium_session import APP_PACKAGE
+from tracing import traced_sleep
+from waits import wait_for
+from harness_log import get_logger
+
+log = get_logger("retry_policy")
+
+RETRY_STEP_TIMEOUT = float(os.environ.get("RETRY_STEP_TIMEOUT", "20"))
+RETRY_CASE_TIMEOUT = float(os.environ.get("RETRY_CASE_TIMEOUT", "180"))
+RETRY_ATTEMPT_TIMEOUT = float(os.environ.get("RETRY_ATTEMPT_TIMEOUT", "5"))
+# Bước chỉ kiểm tra trạng thái (có hay không), không phải chờ một phần tử bắt buộc
+RETRY_PROBE_TIMEOUT = float(os.environ.get("RETRY_PROBE_TIMEOUT", "5"))
+RETRY_BACKOFF = float(os.environ.get("RETRY_BACKOFF", "0.25"))
+RETRY_MAX_BACKOFF = float(os.environ.get("RETRY_MAX_BACKOFF", "4"))
+
+RETRYABLE = (TimeoutException, NoSuchElementException, StaleElementReferenceException)
+TERMINAL = (InvalidSessionIdException, NoSuchDriverException)
+
+
+class TerminalStateError(WebDriverException):
+    """Chờ thêm cũng không hết lỗi (mất session, app không ở foreground)"""
+
+
+def app_state_problem(driver, package=APP_PACKAGE):
+    """Lý do không nên thử lại nữa, None nếu app vẫn đang chạy bình thường"""
+    try:
+        current = driver.current_package
+    except TERMINAL as e:
+        return f"session lost ({type(e).__name__})"
+    except WebDriverException:
+        return None  # Không kiểm tra được thì không kết luận
+    if current and current != package:
+        return f"app is not in the foreground (current package {current})"
+    return None
+
+
+def condition_locator(condition):
+    """Tên để thống kê một expected_condition: locator (by, value) nó giữ, nếu không thì tên hàm"""
+    for cell in getattr(condition, "__closure__", None) or ():
+        value = cell.cell_contents
+        if isinstance(value, tuple) and len(value) == 2 and all(isinstance(part, str) for part in value):
+            return f"{value[0]}={value[1]}"
+    return getattr(condition, "__qualname__", type(condition).__name__).split(".<locals>")[0]
+
+
+class RetryPolicy:
+    """Deadline theo bước và theo case, backoff tăng dần, dừng sớm, thống kê theo locator"""
+
+    def __init__(self, driver, step_timeout=RETRY_STEP_TIMEOUT, case_timeout=RETRY_CASE_TIMEOUT,
+                 attempt_timeout=RETRY_ATTEMPT_TIMEOUT, backoff=RETRY_BACKOFF, max_backoff=RETRY_MAX_BACKOFF,
+                 package=APP_PACKAGE):
+        self.driver = driver
+        self.step_timeout = step_timeout
+        self.case_timeout = case_timeout
+        self.attempt_timeout = attempt_timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.package = package
+        self.case = None
+        self.case_deadline = None
+        self.stats = {}
+
+    def begin_case(self, test_id):
+        self.case = test_id
+        self.case_deadline = time.monotonic() + self.case_timeout
+
+    def end_case(self):
+        self.case = None
+        self.case_deadline = None
+
+    @contextmanager
+    def case_budget(self, test_id):
+        """Mọi bước trong khối with dùng chung deadline của case"""
+        self.begin_case(test_id)
+        try:
+            yield self
+        finally:
+            self.end_case()
+
+    def _deadline(self, timeout):
+        deadline = time.monotonic() + (self.step_timeout if timeout is None else timeout)
+        if self.case_deadline is not None:
+            deadline = min(deadline, self.case_deadline)
+        return deadline
+
+    def run(self, operation, locator, timeout=None, max_attempts=None, attempt_timeout=None):
+        """Gọi operation(timeout của lần thử) đến khi thành công, hết deadline hoặc gặp trạng thái cuối"""
+        deadline = self._deadline(timeout)
+        per_attempt = self.attempt_timeout if attempt_timeout is None else attempt_timeout
+        start = time.monotonic()
+        attempts = 0
+        backoff = self.backoff
+        error = None
+        ok = False
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 and attempts:
+                    break
+                attempts += 1
+                try:
+                    result = operation(max(0.0, min(per_attempt, remaining)))
+                    ok = True
+                    return result
+                except TERMINAL as e:
+                    raise TerminalStateError(f"{locator}: session lost ({type(e).__name__})") from e
+                except RETRYABLE as e:
+                    error = e
+                if max_attempts and attempts >= max_attempts:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                problem = app_state_problem(self.driver, self.package)
+                if problem:
+                    raise TerminalStateError(f"{locator}: {problem}") from error
+                traced_sleep(min(backoff, remaining), "retry backoff")
+                backoff = min(backoff * 2, self.max_backoff)
+            budget = "case deadline" if self.case_deadline is not None and deadline >= self.case_deadline else "deadline"
+            raise TimeoutException(f"{locator}: gave up after {attempts} attempt(s) in "
+                                   f"{time.monotonic() - start:.1f}s ({budget})") from error
+        finally:
+            self._record(locator, attempts, ok, time.monotonic() - start)
+
+    def find(self, cache, by, value, condition, timeout=None, max_attempts=None):
+        """Tìm phần tử qua ElementCache trong deadline của bước"""
+        return self.run(lambda t: cache.find(by, value, condition, timeout=t), f"{by}={value}", timeout, max_attempts)
+
+    def until(self, condition, timeout=None, locator=None):
+        """Chờ một điều kiện (expected_conditions) trong deadline của bước, không chia nhỏ thành nhiều lần thử"""
+        name = locator or condition_locator(condition)
+        return self.run(lambda t: wait_for(self.driver, condition, t), name, timeout,
+                        attempt_timeout=float("inf"))
+
+    def _record(self, locator, attempts, ok, elapsed):
+        entry = self.stats.setdefault(locator, {"calls": 0, "failures": 0, "retries": 0, "total": 0.0, "max": 0.0})
+        entry["calls"] += 1
+        entry["failures"] += 0 if ok else 1
+        entry["retries"] += max(0, attempts - 1)
+        entry["total"] += elapsed
+        entry["max"] = max(entry["max"], elapsed)
+
+    def slowest(self, limit=5):
+        return sorted(self.stats.items(), key=lambda item: item[1]["total"], reverse=True)[:limit]
+
+    def print_stats(self, limit=5):
+        for locator, entry in self.slowest(limit):
+            if entry["retries"] or entry["failures"]:
+                log.info("🐢 %s: %s call(s), %s retr(ies), %s failure(s), %.1fs total, max %.1fs", locator,
+                         entry["calls"], entry["retries"], entry["failures"], entry["total"], entry["max"])
+
+    def save(self, history, run_id, suite):
+        """Lưu thống kê locator của run vào lịch sử"""
+        if history is not None and self.stats:
+            history.record_locator_stats(run_id, suite, self.stats)
@@ -0,0 +1,98 @@
+"""Kiểm tra retry_policy (không cần Appium: operation là hàm Python).
+
+    python -m unittest retry_policy_test
+"""
+import os
+import tempfile
+import time
+import unittest
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchElementException, TimeoutException
+from appium_session import APP_PACKAGE
+from retry_policy import RetryPolicy, TerminalStateError
+from run_history import RunHistory
+
+
+class Driver:
+    """Chỉ cần current_package để policy biết app còn ở foreground"""
+    current_package = APP_PACKAGE
+
+
+def failing(times, result="element"):
+    """Operation lỗi `times` lần đầu rồi thành công"""
+    calls = []
+
+    def operation(timeout):
+        calls.append(timeout)
+        if len(calls) <= times:
+            raise NoSuchElementException("not yet")
+        return result
+    return operation, calls
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        self.driver = Driver()
+        self.policy = RetryPolicy(self.driver, step_timeout=1, attempt_timeout=0.2, backoff=0.01, max_backoff=0.02)
+
+    def test_retries_until_success(self):
+        operation, calls = failing(3)
+        self.assertEqual(self.policy.run(operation, "id=cart"), "element")
+        self.assertEqual(len(calls), 4)
+        self.assertTrue(all(timeout <= 0.2 for timeout in calls))
+        self.assertEqual(self.policy.stats["id=cart"]["retries"], 3)
+        self.assertEqual(self.policy.stats["id=cart"]["failures"], 0)
+
+    def test_step_deadline_bounds_the_wait(self):
+        operation, _ = failing(1000)
+        start = time.monotonic()
+        with self.assertRaises(TimeoutException):
+            self.policy.run(operation, "id=missing", timeout=0.3)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(self.policy.stats["id=missing"]["failures"], 1)
+
+    def test_max_attempts(self):
+        operation, calls = failing(1000)
+        with self.assertRaises(TimeoutException):
+            self.policy.run(operation, "id=missing", max_attempts=2)
+        self.assertEqual(len(calls), 2)
+
+    def test_case_deadline_caps_every_step(self):
+        self.policy.case_timeout = 0.2
+        operation, _ = failing(1000)
+        start = time.monotonic()
+        with self.policy.case_budget("TC_01"):
+            with self.assertRaisesRegex(TimeoutException, "case deadline"):
+                self.policy.run(operation, "id=missing", timeout=5)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertIsNone(self.policy.case_deadline)
+
+    def test_fails_fast_when_app_leaves_foreground(self):
+        self.driver.current_package = "com.android.launcher3"
+        operation, calls = failing(1000)
+        with self.assertRaisesRegex(TerminalStateError, "not in the foreground"):
+            self.policy.run(operation, "id=cart")
+        self.assertEqual(len(calls), 1)
+
+    def test_lost_session_is_not_retried(self):
+        calls = []
+
+        def operation(timeout):
+            calls.append(timeout)
+            raise InvalidSessionIdException("gone")
+        with self.assertRaises(TerminalStateError):
+            self.policy.run(operation, "id=cart")
+        self.assertEqual(len(calls), 1)
+
+    def test_stats_go_to_history(self):
+        self.policy.run(failing(2)[0], "id=cart")
+        with tempfile.TemporaryDirectory() as directory:
+            history = RunHistory(os.path.join(directory, "history.sqlite"))
+            self.policy.save(history, "run-1", "checkout")
+            rows = history.slowest_locators("checkout")
+            self.assertEqual([(row["locator"], row["retries"], row["troubled_runs"]) for row in rows],
+                             [("id=cart", 2, 1)])
+            history.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,491 @@
+"""Lịch sử mọi lần chạy trong SQLite, có index để truy vấn xu hướng.
+
+Mỗi kết quả được lưu theo (run, suite, test case, thiết bị) kèm build của
+app, trạng thái, ghi chú và thời gian chạy. Ví dụ:
+    python run_history.py trend --suite login --last 10
+    python run_history.py slowest --suite checkout
+    python run_history.py first-failing TC08
+    python run_history.py steps --suite checkout   # cần trace (tracing.py)
+    python run_history.py load --step order        # cần load_generator.py
+    python run_history.py locators --suite checkout  # thống kê của retry_policy.py
+    python run_history.py startup --suite checkout   # thời gian app khởi động (app_ready.py)
+    python run_history.py artifacts --suite checkout # bằng chứng của case hỏng (artifacts.py)
+    python run_history.py export login --output output/test_results.xlsx
+    python run_history.py import          # nạp các log CSV cũ trong output/
+"""
+import argparse
+import glob
+import importlib
+import json
+import os
+import re
+import sqlite3
+import time
+from results_sink import ResultsSink
+
+output_dir = "output"
+DEFAULT_PATH = os.path.join(output_dir, "run_history.sqlite")
+PUBSPEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pubspec.yaml")
+
+# Tên suite -> module có TEST_DATA và build_report(sink, path)
+SUITES = {
+    "login": "login_test",
+    "register": "register_test",
+    "checkout": "addproduct_test",
+}
+# Log CSV của ResultsSink -> suite
+SINK_LOGS = {
+    "test_results": "login",
+    "test_results_register": "register",
+    "test_results_checkout": "checkout",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    build TEXT NOT NULL DEFAULT '',
+    started_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, suite)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    device TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    note TEXT,
+    duration REAL,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, suite, test_id, device)
+);
+CREATE TABLE IF NOT EXISTS spans (
+    run_id TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    test_id TEXT,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    start REAL NOT NULL,
+    duration REAL NOT NULL,
+    locator TEXT,
+    retries INTEGER,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS load_stats (
+    run_id TEXT NOT NULL,
+    step TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    p50 REAL,
+    p95 REAL,
+    p99 REAL,
+    mean REAL,
+    max REAL,
+    throughput REAL,
+    histogram TEXT,
+    PRIMARY KEY (run_id, step)
+);
+CREATE TABLE IF NOT EXISTS locator_stats (
+    run_id TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    locator TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    retries INTEGER NOT NULL,
+    total REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (run_id, suite, locator)
+);
+CREATE TABLE IF NOT EXISTS startup (
+    run_id TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    device TEXT,
+    signal TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (run_id, suite, signal)
+);
+CREATE TABLE IF NOT EXISTS case_fingerprints (
+    suite TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (suite, test_id, fingerprint)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    note TEXT,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, suite, test_id)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_suite_started ON runs (suite, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_build ON runs (build);
+CREATE INDEX IF NOT EXISTS idx_results_test ON results (suite, test_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_results_status ON results (status);
+CREATE INDEX IF NOT EXISTS idx_spans_run ON spans (run_id, suite);
+CREATE INDEX IF NOT EXISTS idx_spans_step ON spans (suite, category, name);
+CREATE INDEX IF NOT EXISTS idx_load_step ON load_stats (step, run_id);
+CREATE INDEX IF NOT EXISTS idx_locator_stats ON locator_stats (suite, locator);
+"""
+
+
+def app_build():
+    """Build của app đang test: $APP_BUILD, nếu không có thì version trong pubspec.yaml"""
+    build = os.environ.get("APP_BUILD")
+    if build:
+        return build
+    try:
+        with open(PUBSPEC, encoding="utf-8") as f:
+            match = re.search(r"^version:\s*(\S+)", f.read(), re.MULTILINE)
+        return match.group(1) if match else ""
+    except OSError:
+        return ""
+
+
+class RunHistory:
+    """Kho lịch sử chạy test (một file SQLite dùng chung cho mọi suite)"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        # WAL cho phép các tiến trình song song cùng ghi mà không khóa người đọc
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def start_run(self, run_id, suite, build=None, started_at=None):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, suite, build, started_at) VALUES (?, ?, ?, ?)",
+                (run_id, suite, app_build() if build is None else build,
+                 started_at or time.strftime("%Y-%m-%d %H:%M:%S")))
+        return run_id
+
+    def record(self, run_id, suite, test_id, status, note="", duration=None, device="", recorded_at=None):
+        """Ghi (hoặc ghi đè) kết quả một test case trong một run"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (run_id, suite, test_id, device, status, note, duration, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, suite, test_id, device or "", status, note, duration,
+                 recorded_at or time.strftime("%Y-%m-%d %H:%M:%S")))
+
+    def record_spans(self, run_id, suite, spans):
+        """Lưu các span của tracing.Tracer cho một run"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO spans (run_id, suite, test_id, name, category, start, duration, locator, retries, result) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, suite, span["args"].get("case"), span["name"], span["category"], span["start"],
+                  span["duration"], span["args"].get("locator"), span["args"].get("retries"),
+                  span["args"].get("result")) for span in spans])
+
+    def record_load(self, run_id, steps):
+        """Lưu thống kê độ trễ của load_generator, mỗi bước một dòng"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO load_stats (run_id, step, requests, errors, p50, p95, p99, mean, max, "
+                "throughput, histogram) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, step["step"], step["requests"], step["errors"], step["p50"], step["p95"], step["p99"],
+                  step["mean"], step["max"], step["throughput"], json.dumps(step["histogram"]))
+                 for step in steps])
+
+    def load_trend(self, step=None, last=20):
+        """p50/p95/p99 của từng bước qua các lần chạy tải, run mới nhất cuối cùng"""
+        rows = self.conn.execute(
+            "SELECT l.*, r.build, r.started_at FROM load_stats l "
+            "JOIN runs r ON r.run_id = l.run_id AND r.suite = 'load' "
+            "WHERE (:step IS NULL OR l.step = :step) ORDER BY r.started_at DESC, r.rowid DESC LIMIT :last",
+            {"step": step, "last": last}).fetchall()
+        return list(reversed(rows))
+
+    def record_locator_stats(self, run_id, suite, stats):
+        """Lưu thống kê theo locator của retry_policy.RetryPolicy cho một run"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO locator_stats (run_id, suite, locator, calls, failures, retries, total, max) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, suite, locator, entry["calls"], entry["failures"], entry["retries"], entry["total"],
+                  entry["max"]) for locator, entry in stats.items()])
+
+    def slowest_locators(self, suite=None, limit=15):
+        """Locator tốn nhiều thời gian nhất qua mọi run, kèm số run bị thử lại hoặc lỗi"""
+        return self.conn.execute(
+            "SELECT suite, locator, COUNT(*) AS runs, SUM(calls) AS calls, SUM(retries) AS retries, "
+            "SUM(failures) AS failures, SUM(total) AS total, SUM(total) / SUM(calls) AS avg_duration, "
+            "MAX(max) AS max_duration, SUM(retries > 0 OR failures > 0) AS troubled_runs "
+            "FROM locator_stats WHERE (:suite IS NULL OR suite = :suite) "
+            "GROUP BY suite, locator ORDER BY total DESC LIMIT :limit",
+            {"suite": suite, "limit": limit}).fetchall()
+
+    def slowest_steps(self, suite=None, run_id=None, limit=15):
+        """Các bước (lệnh, chờ, sleep) tốn nhiều thời gian nhất, gộp theo tên và locator"""
+        return self.conn.execute(
+            "SELECT category, name, locator, COUNT(*) AS calls, SUM(duration) AS total, AVG(duration) AS avg_duration, "
+            "AVG(retries) AS avg_retries, SUM(result NOT IN ('ok') AND result NOT LIKE '% element(s)') AS errors "
+            "FROM spans WHERE category != 'case' AND (:suite IS NULL OR suite = :suite) "
+            "AND (:run_id IS NULL OR run_id = :run_id) "
+            "GROUP BY category, name, locator ORDER BY total DESC LIMIT :limit",
+            {"suite": suite, "run_id": run_id, "limit": limit}).fetchall()
+
+    def record_startup(self, run_id, suite, device, metrics):
+        """Lưu các mốc khởi động app của app_ready.AppReadiness cho một run"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO startup (run_id, suite, device, signal, seconds) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, suite, device, signal, seconds) for signal, seconds in metrics.items()])
+
+    def startup_trend(self, suite=None, last=20):
+        """Thời gian đến khi app sẵn sàng theo từng run (mỗi mốc một cột), run mới nhất cuối cùng"""
+        rows = self.conn.execute(
+            "SELECT s.run_id, s.suite, s.device, r.build, r.started_at, "
+            "MAX(CASE WHEN s.signal = 'activity' THEN s.seconds END) AS activity, "
+            "MAX(CASE WHEN s.signal = 'first_frame' THEN s.seconds END) AS first_frame, "
+            "MAX(CASE WHEN s.signal = 'launch' THEN s.seconds END) AS launch, "
+            "MAX(CASE WHEN s.signal = 'ready' THEN s.seconds END) AS ready "
+            "FROM startup s LEFT JOIN runs r ON r.run_id = s.run_id AND r.suite = s.suite "
+            "WHERE (:suite IS NULL OR s.suite = :suite) GROUP BY s.run_id, s.suite "
+            "ORDER BY r.started_at DESC, MIN(s.rowid) DESC LIMIT :last",
+            {"suite": suite, "last": last}).fetchall()
+        return list(reversed(rows))
+
+    def pass_rate_trend(self, suite=None, test_id=None, last=20):
+        """Tỉ lệ pass theo từng run, run mới nhất cuối cùng"""
+        rows = self.conn.execute(
+            "SELECT r.run_id, r.suite, r.build, r.started_at, "
+            "SUM(x.status = 'Pass') AS passed, COUNT(*) AS total, AVG(x.duration) AS avg_duration "
+            "FROM runs r JOIN results x ON x.run_id = r.run_id AND x.suite = r.suite "
+            "WHERE (:suite IS NULL OR r.suite = :suite) AND (:test_id IS NULL OR x.test_id = :test_id) "
+            "GROUP BY r.run_id, r.suite ORDER BY r.started_at DESC, r.rowid DESC LIMIT :last",
+            {"suite": suite, "test_id": test_id, "last": last}).fetchall()
+        return list(reversed(rows))
+
+    def slowest_cases(self, suite=None, limit=10):
+        """Các test case có thời gian chạy trung bình lớn nhất"""
+        return self.conn.execute(
+            "SELECT suite, test_id, COUNT(*) AS runs, AVG(duration) AS avg_duration, MAX(duration) AS max_duration "
+            "FROM results WHERE duration IS NOT NULL AND (:suite IS NULL OR suite = :suite) "
+            "GROUP BY suite, test_id ORDER BY avg_duration DESC LIMIT :limit",
+            {"suite": suite, "limit": limit}).fetchall()
+
+    def record_artifact(self, run_id, suite, test_id, path, note=""):
+        """Ghi đường dẫn file bằng chứng của một case hỏng (artifacts.py)"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO artifacts (run_id, suite, test_id, path, note, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, suite, test_id, path, note, time.strftime("%Y-%m-%d %H:%M:%S")))
+
+    def artifacts(self, suite=None, test_id=None, run_id=None, limit=20):
+        """Các file bằng chứng mới nhất của case hỏng"""
+        return self.conn.execute(
+            "SELECT * FROM artifacts WHERE (:suite IS NULL OR suite = :suite) "
+            "AND (:test_id IS NULL OR test_id = :test_id) AND (:run_id IS NULL OR run_id = :run_id) "
+            "ORDER BY created_at DESC, rowid DESC LIMIT :limit",
+            {"suite": suite, "test_id": test_id, "run_id": run_id, "limit": limit}).fetchall()
+
+    def latest_statuses(self, suite):
+        """Trạng thái gần nhất của từng test case trong suite: {test_id: status}"""
+        rows = self.conn.execute(
+            "SELECT test_id, status FROM results WHERE rowid IN "
+            "(SELECT MAX(rowid) FROM results WHERE suite = ? GROUP BY test_id)", (suite,)).fetchall()
+        return {row["test_id"]: row["status"] for row in rows}
+
+    def record_fingerprint(self, run_id, suite, test_id, fingerprint, status):
+        """Lưu kết quả của một test case theo fingerprint (result_cache.py)"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO case_fingerprints (suite, test_id, fingerprint, status, run_id, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (suite, test_id, fingerprint, status, run_id, time.strftime("%Y-%m-%d %H:%M:%S")))
+
+    def cached_pass(self, suite, test_id, fingerprint):
+        """Lần pass gần nhất của test case với đúng fingerprint này, None nếu chưa có"""
+        return self.conn.execute(
+            "SELECT run_id, recorded_at FROM case_fingerprints "
+            "WHERE suite = ? AND test_id = ? AND fingerprint = ? AND status = 'Pass'",
+            (suite, test_id, fingerprint)).fetchone()
+
+    def first_failing_run(self, test_id, suite=None):
+        """Run đầu tiên của chuỗi Fail hiện tại (None nếu lần chạy gần nhất không Fail)"""
+        rows = self.conn.execute(
+            "SELECT x.run_id, x.suite, x.status, x.device, x.note, r.build, r.started_at "
+            "FROM results x JOIN runs r ON r.run_id = x.run_id AND r.suite = x.suite "
+            "WHERE x.test_id = :test_id AND (:suite IS NULL OR x.suite = :suite) "
+            "ORDER BY r.started_at DESC, r.rowid DESC",
+            {"test_id": test_id, "suite": suite}).fetchall()
+        first = None
+        for row in rows:
+            if row["status"] == "Pass":
+                break
+            first = row
+        return first
+
+    def suite(self, suite):
+        return SuiteHistory(self, suite)
+
+
+class SuiteHistory:
+    """Lịch sử một suite với cùng giao diện rows()/runs() như ResultsSink (để xuất Excel)"""
+
+    def __init__(self, history, suite):
+        self.history = history
+        self.name = suite
+        self.descriptions = {test_id: data.get("description", "")
+                             for test_id, data in importlib.import_module(SUITES[suite]).TEST_DATA.items()}
+
+    def rows(self):
+        rows = self.history.conn.execute(
+            "SELECT x.run_id, x.test_id, x.status, x.note, x.recorded_at "
+            "FROM results x JOIN runs r ON r.run_id = x.run_id AND r.suite = x.suite "
+            "WHERE x.suite = ? ORDER BY r.started_at, r.rowid, x.recorded_at", (self.name,)).fetchall()
+        return [{"run": row["run_id"], "timestamp": row["recorded_at"], "test_case": row["test_id"],
+                 "status": row["status"], "note": row["note"] or "",
+                 "description": self.descriptions.get(row["test_id"], ""),
+                 "result": str(row["status"] == "Pass")} for row in rows]
+
+    def runs(self):
+        seen = {}
+        for row in self.rows():
+            seen.setdefault(row["run"], None)
+        return list(seen)
+
+
+def import_sink_logs(history, directory=output_dir):
+    """Nạp các log CSV của ResultsSink vào SQLite (bỏ qua kết quả đã có)"""
+    count = 0
+    for path in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        suite = SINK_LOGS.get(name)
+        if suite is None:
+            continue
+        for row in ResultsSink(name, directory=directory).rows():
+            history.start_run(row["run"], suite, build="", started_at=row["timestamp"])
+            exists = history.conn.execute(
+                "SELECT 1 FROM results WHERE run_id = ? AND suite = ? AND test_id = ?",
+                (row["run"], suite, row["test_case"])).fetchone()
+            if not exists:
+                history.record(row["run"], suite, row["test_case"], row["status"], row["note"],
+                               recorded_at=row["timestamp"])
+                count += 1
+    return count
+
+
+def _format_duration(value):
+    return "-" if value is None else f"{value:.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the SQLite history of test runs")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="History database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    trend = sub.add_parser("trend", help="Pass rate per run")
+    trend.add_argument("--suite", help="login, register, checkout, benchmark or load")
+    trend.add_argument("--test", help="Only this test case")
+    trend.add_argument("--last", type=int, default=20)
+
+    slowest = sub.add_parser("slowest", help="Slowest test cases by average duration")
+    slowest.add_argument("--suite", help="login, register, checkout, benchmark or load")
+    slowest.add_argument("--limit", type=int, default=10)
+
+    failing = sub.add_parser("first-failing", help="Run where the current failure streak of a test case began")
+    failing.add_argument("test")
+    failing.add_argument("--suite", help="login, register, checkout, benchmark or load")
+
+    steps = sub.add_parser("steps", help="Traced steps that took the most time in total")
+    steps.add_argument("--suite", help="login, register, checkout, benchmark or load")
+    steps.add_argument("--run", help="Only this run id")
+    steps.add_argument("--limit", type=int, default=15)
+
+    locators = sub.add_parser("locators", help="Locators that cost the most time across runs")
+    locators.add_argument("--suite", help="login, register, checkout, benchmark or load")
+    locators.add_argument("--limit", type=int, default=15)
+
+    startup = sub.add_parser("startup", help="Time until the app was usable, per run")
+    startup.add_argument("--suite", help="login, register, checkout, benchmark or load")
+    startup.add_argument("--last", type=int, default=20)
+
+    artifacts = sub.add_parser("artifacts", help="Evidence captured for failed test cases")
+    artifacts.add_argument("--suite", help="login, register or checkout")
+    artifacts.add_argument("--test", help="Only this test case")
+    artifacts.add_argument("--run", help="Only this run id")
+    artifacts.add_argument("--limit", type=int, default=20)
+
+    load = sub.add_parser("load", help="Latency percentiles of load_generator runs")
+    load.add_argument("--step", help="login, current_user, categories, products, order...")
+    load.add_argument("--last", type=int, default=20)
+
+    export = sub.add_parser("export", help="Write a suite's history in the Excel layout of its workbook")
+    export.add_argument("suite", choices=list(SUITES))
+    export.add_argument("--output", help="Workbook path (default: the suite's usual workbook)")
+
+    sub.add_parser("import", help="Load the CSV result logs in output/ into the database")
+    args = parser.parse_args()
+
+    history = RunHistory(args.db)
+    try:
+        if args.command == "trend":
+            for row in history.pass_rate_trend(args.suite, args.test, args.last):
+                rate = row["passed"] / row["total"] if row["total"] else 0.0
+                print(f"{row['started_at']}  {row['suite']:<9} {row['run_id']:<24} build {row['build'] or '-':<10} "
+                      f"{row['passed']}/{row['total']} pass ({rate:.0%}), avg {_format_duration(row['avg_duration'])}")
+        elif args.command == "slowest":
+            for row in history.slowest_cases(args.suite, args.limit):
+                print(f"{row['suite']:<9} {row['test_id']:<16} avg {_format_duration(row['avg_duration'])}, "
+                      f"max {_format_duration(row['max_duration'])} over {row['runs']} run(s)")
+        elif args.command == "first-failing":
+            row = history.first_failing_run(args.test, args.suite)
+            if row is None:
+                print(f"✅ {args.test} is not failing in its latest run")
+            else:
+                print(f"❌ {args.test} has been failing since run {row['run_id']} ({row['started_at']}, "
+                      f"build {row['build'] or '-'}, device {row['device'] or '-'}): {row['note']}")
+        elif args.command == "steps":
+            for row in history.slowest_steps(args.suite, args.run, args.limit):
+                retries = f", ~{row['avg_retries']:.1f} retries" if row["avg_retries"] else ""
+                errors = f", {row['errors']} error(s)" if row["errors"] else ""
+                print(f"{row['category']:<8} {row['name']:<32} total {row['total']:.2f}s over {row['calls']} call(s), "
+                      f"avg {_format_duration(row['avg_duration'])}{retries}{errors}  {row['locator'] or ''}")
+        elif args.command == "locators":
+            for row in history.slowest_locators(args.suite, args.limit):
+                print(f"{row['suite']:<9} total {row['total']:.1f}s over {row['calls']} call(s), "
+                      f"avg {_format_duration(row['avg_duration'])}, max {_format_duration(row['max_duration'])}, "
+                      f"{row['retries']} retr(ies), {row['failures']} failure(s), "
+                      f"retried or failed in {row['troubled_runs']}/{row['runs']} run(s)  {row['locator']}")
+        elif args.command == "startup":
+            for row in history.startup_trend(args.suite, args.last):
+                print(f"{row['started_at'] or '-'}  {row['suite']:<9} {row['run_id']:<24} build {row['build'] or '-':<10} "
+                      f"ready {_format_duration(row['ready'])}, activity {_format_duration(row['activity'])}, "
+                      f"first frame {_format_duration(row['first_frame'])}, launch {_format_duration(row['launch'])}")
+        elif args.command == "artifacts":
+            for row in history.artifacts(args.suite, args.test, args.run, args.limit):
+                print(f"{row['created_at']}  {row['suite']:<9} {row['test_id']:<16} {row['run_id']:<24} "
+                      f"{row['path']}  {row['note'] or ''}")
+        elif args.command == "load":
+            for row in history.load_trend(args.step, args.last):
+                print(f"{row['started_at']}  {row['run_id']:<24} {row['step']:<13} "
+                      f"p50 {row['p50'] * 1000:.0f}ms, p95 {row['p95'] * 1000:.0f}ms, p99 {row['p99'] * 1000:.0f}ms, "
+                      f"{row['throughput']:.1f} req/s, {row['errors']}/{row['requests']} error(s)")
+        elif args.command == "export":
+            module = importlib.import_module(SUITES[args.suite])
+            path = module.build_report(history.suite(args.suite), args.output or module.file_path)
+            print(f"📝 History exported to {path}")
+        elif args.command == "import":
+            print(f"📥 Imported {import_sink_logs(history)} result(s) into {history.path}")
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Kiểm tra run_history: xu hướng pass, case chậm nhất, run bắt đầu hỏng (SQLite tạm).
+
+    python -m unittest run_history_test
+"""
+import os
+import tempfile
+import unittest
+from openpyxl import Workbook
+from results_sink import ResultsSink, import_rows
+from run_history import RunHistory
+
+
+class TestRunHistory(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.history = RunHistory(os.path.join(self.directory, "run_history.sqlite"))
+        self.addCleanup(self.history.close)
+
+    def run_suite(self, run_id, started_at, statuses, suite="login", build="1.0.0"):
+        self.history.start_run(run_id, suite, build=build, started_at=started_at)
+        for test_id, (status, duration) in statuses.items():
+            self.history.record(run_id, suite, test_id, status, duration=duration, recorded_at=started_at)
+
+    def test_pass_rate_trend_is_ordered_oldest_first(self):
+        self.run_suite("run-2", "2026-01-02 09:00:00", {"TC01": ("Fail", 2.0), "TC02": ("Pass", 1.0)})
+        self.run_suite("run-1", "2026-01-01 09:00:00", {"TC01": ("Pass", 1.0), "TC02": ("Pass", 3.0)})
+        self.run_suite("run-3", "2026-01-03 09:00:00", {"TC01": ("Fail", 4.0)}, suite="register")
+        trend = self.history.pass_rate_trend("login")
+        self.assertEqual([(row["run_id"], row["passed"], row["total"]) for row in trend],
+                         [("run-1", 2, 2), ("run-2", 1, 2)])
+        self.assertEqual(trend[0]["avg_duration"], 2.0)
+        self.assertEqual([row["run_id"] for row in self.history.pass_rate_trend("login", last=1)], ["run-2"])
+        self.assertEqual([row["passed"] for row in self.history.pass_rate_trend("login", test_id="TC01")], [1, 0])
+
+    def test_slowest_cases_average_over_runs(self):
+        self.run_suite("run-1", "2026-01-01 09:00:00", {"TC01": ("Pass", 1.0), "TC02": ("Pass", 5.0)})
+        self.run_suite("run-2", "2026-01-02 09:00:00", {"TC01": ("Pass", 3.0), "TC02": ("Pass", None)})
+        slowest = self.history.slowest_cases("login")
+        self.assertEqual([(row["test_id"], row["runs"], row["avg_duration"], row["max_duration"]) for row in slowest],
+                         [("TC02", 1, 5.0, 5.0), ("TC01", 2, 2.0, 3.0)])
+        self.assertEqual(len(self.history.slowest_cases("login", limit=1)), 1)
+
+    def test_first_failing_run_of_current_streak(self):
+        self.run_suite("run-1", "2026-01-01 09:00:00", {"TC01": ("Fail", 1.0)})
+        self.run_suite("run-2", "2026-01-02 09:00:00", {"TC01": ("Pass", 1.0)})
+        self.run_suite("run-3", "2026-01-03 09:00:00", {"TC01": ("Fail", 1.0)}, build="1.0.1")
+        self.run_suite("run-4", "2026-01-04 09:00:00", {"TC01": ("Fail", 1.0)})
+        first = self.history.first_failing_run("TC01", "login")
+        self.assertEqual((first["run_id"], first["build"]), ("run-3", "1.0.1"))
+        self.run_suite("run-5", "2026-01-05 09:00:00", {"TC01": ("Pass", 1.0)})
+        self.assertIsNone(self.history.first_failing_run("TC01", "login"))
+        self.assertIsNone(self.history.first_failing_run("TC99"))
+
+    def test_imported_workbook_keeps_one_run_per_pass(self):
+        # File Excel cũ của register: hai lần chạy nối tiếp nhau, không có cột run
+        path = os.path.join(self.directory, "test_results_register.xlsx")
+        wb = Workbook()
+        wb.active.append(["Test Case", "Description", "Result", "Status", "Note"])
+        for status in ("Pass", "Fail"):
+            wb.active.append(["TC_REGISTER_01", "Đăng ký", status == "Pass", status, ""])
+            wb.active.append(["TC_REGISTER_02", "Email trống", True, "Pass", ""])
+        wb.save(path)
+        sink = ResultsSink("test_results_register", ["description", "result"], directory=self.directory,
+                           history=self.history, suite="register")
+        self.assertEqual(sink.import_workbook(path, import_rows(
+            ["test_case", "description", "result", "status", "note"])), 4)
+        trend = self.history.pass_rate_trend("register")
+        self.assertEqual([(row["run_id"], row["passed"], row["total"]) for row in trend],
+                         [("imported-1", 2, 2), ("imported-2", 1, 2)])
+        self.assertEqual(self.history.first_failing_run("TC_REGISTER_01", "register")["run_id"], "imported-2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,229 @@
+"""Cuộn tới phần tử bằng một lệnh trên thiết bị thay cho vuốt + sleep lặp lại.
+
+Thứ tự thử cho mỗi phần tử:
+1. Đã nằm trong vùng nhìn thấy của ScrollView (theo page source, dùng chung
+   snapshot với FormFiller) thì không cuộn.
+2. Đã biết vị trí cuộn của phần tử trên màn hình này thì cuộn thẳng tới đó
+   bằng một `mobile: scrollGesture`.
+3. Tạo được UiSelector (content-desc/text) thì một lệnh
+   UiScrollable.scrollIntoView, việc cuộn và dò tìm chạy trên thiết bị.
+4. Dự phòng: `mobile: scrollGesture` theo từng đoạn; nếu phần tử đã có trong
+   cây nhưng ngoài vùng nhìn thấy thì tính đúng khoảng cần cuộn từ bounds,
+   cuộn hết một chiều mà chưa thấy thì đảo chiều một lần.
+
+Vị trí cuộn tính theo số lần chiều cao ScrollView kể từ đầu trang và chỉ
+được ghi nhớ khi biết chắc vị trí hiện tại (sau khi mở màn hình hoặc cuộn về
+đầu); sau scrollIntoView vị trí hiện tại coi như chưa biết.
+"""
+import re
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import InvalidSelectorException, NoSuchElementException
+from page_snapshot import PageSnapshot
+from harness_log import get_logger
+
+log = get_logger("scroller")
+
+SCROLL_CONTAINER_XPATH = "//*[@scrollable='true']"
+# Mỗi đoạn cuộn dự phòng bằng bao nhiêu phần chiều cao ScrollView
+SCROLL_STEP = 0.75
+MAX_GESTURES = 8
+# Khoảng chừa thêm (px) khi cuộn phần tử vào vùng nhìn thấy
+SCROLL_MARGIN = 24
+
+_BOUNDS = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+# Điều kiện XPath đơn giản chuyển được sang UiSelector
+_XPATH_SELECTORS = [
+    (re.compile(r"@content-desc\s*=\s*'([^']*)'"), "description"),
+    (re.compile(r"contains\(@content-desc,\s*'([^']*)'\)"), "descriptionContains"),
+    (re.compile(r"@text\s*=\s*'([^']*)'"), "text"),
+    (re.compile(r"contains\(@text,\s*'([^']*)'\)"), "textContains"),
+]
+
+
+def bounds(node):
+    match = _BOUNDS.match(node.get("bounds", "") or "")
+    return tuple(map(int, match.groups())) if match else None
+
+
+def _quote(value):
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def uiselector_for(xpath, node=None):
+    """UiSelector tìm được cùng phần tử với XPath, None nếu không chuyển được.
+
+    Ưu tiên content-desc/text của node trong page source; XPath có điều kiện
+    `or`, vị trí hay trục con thì chỉ dùng được khi có node.
+    """
+    class_name = node.get("class") if node is not None else None
+    if node is not None:
+        for attribute, method in (("content-desc", "description"), ("text", "text")):
+            value = node.get(attribute)
+            if value:
+                break
+        else:
+            return None
+    else:
+        last = xpath.rsplit("//", 1)[-1]
+        if "/" in last or " or " in last or re.search(r"\[\d+\]", last):
+            return None
+        for pattern, method in _XPATH_SELECTORS:
+            match = pattern.search(last)
+            if match:
+                value = match.group(1)
+                break
+        else:
+            return None
+        class_match = re.match(r"([\w.]+)\[", last)
+        if class_match and "." in class_match.group(1):
+            class_name = class_match.group(1)
+    selector = "new UiSelector()"
+    if class_name:
+        selector += f".className({_quote(class_name)})"
+    return f"{selector}.{method}({_quote(value)})"
+
+
+class Scroller:
+    """Cuộn tới phần tử bằng một lệnh trên thiết bị, nhớ vị trí cuộn theo màn hình"""
+
+    def __init__(self, driver, snapshot=None, cache=None, step=SCROLL_STEP, max_gestures=MAX_GESTURES):
+        self.driver = driver
+        self.snapshot = snapshot or PageSnapshot(driver)
+        self.cache = cache
+        self.step = step
+        self.max_gestures = max_gestures
+        self.screen = None
+        # Vị trí hiện tại (số lần chiều cao ScrollView từ đầu trang), None nếu chưa biết
+        self.offset = None
+        # {màn hình: {xpath: vị trí cuộn để thấy phần tử}}
+        self.positions = {}
+        self.counts = {"in_view": 0, "remembered": 0, "scroll_into_view": 0, "gestures": 0, "fallbacks": 0}
+
+    def opened(self, screen, offset=0.0):
+        """Vừa mở màn hình `screen`; mở mới thì đang ở đầu trang, quay lại bằng Back thì offset=None"""
+        self.screen = screen
+        self.offset = offset
+
+    def _changed(self):
+        if self.cache is not None:
+            self.cache.screen_changed()
+        else:
+            self.snapshot.invalidate()
+
+    def _container(self):
+        nodes = self.snapshot.query(SCROLL_CONTAINER_XPATH)
+        if nodes and bounds(nodes[0]):
+            return bounds(nodes[0])
+        root = self.snapshot.root
+        return 0, 0, int(root.get("width", 0)), int(root.get("height", 0))
+
+    def _locate(self, xpath):
+        """(node, khoảng cách px cần cuộn xuống để thấy trọn node; 0 nếu đã thấy)"""
+        node = self.snapshot.first_visible(xpath)
+        if node is None:
+            return None, None
+        box = bounds(node)
+        if box is None:
+            return node, 0
+        _, top, _, bottom = self._container()
+        if box[1] >= top and box[3] <= bottom:
+            return node, 0
+        if box[3] > bottom:
+            return node, box[3] - bottom + SCROLL_MARGIN
+        return node, box[1] - top - SCROLL_MARGIN
+
+    def _gesture(self, direction, percent):
+        """Một mobile: scrollGesture trên ScrollView, trả về còn cuộn tiếp được không"""
+        left, top, right, bottom = self._container()
+        self.counts["gestures"] += 1
+        can_scroll = self.driver.execute_script("mobile: scrollGesture", {
+            "left": left, "top": top, "width": right - left, "height": bottom - top,
+            "direction": direction, "percent": percent,
+        })
+        if self.offset is not None:
+            self.offset += percent if direction == "down" else -percent
+            if not can_scroll:
+                # Chạm biên: ở đầu trang thì biết chắc vị trí, ở cuối trang thì không
+                self.offset = 0.0 if direction == "up" else None
+        self._changed()
+        return bool(can_scroll)
+
+    def _remember(self, xpath):
+        if self.screen is not None and self.offset is not None:
+            self.positions.setdefault(self.screen, {})[xpath] = self.offset
+
+    def scroll_into_view(self, xpath):
+        """Đưa phần tử vào vùng nhìn thấy; NoSuchElementException nếu không tìm được"""
+        node, distance = self._locate(xpath)
+        if distance == 0:
+            self.counts["in_view"] += 1
+            self._remember(xpath)
+            return "in view"
+
+        target = self.positions.get(self.screen, {}).get(xpath)
+        if target is not None and self.offset is not None and abs(target - self.offset) > 1e-6:
+            delta = target - self.offset
+            self._gesture("down" if delta > 0 else "up", abs(delta))
+            node, distance = self._locate(xpath)
+            if distance == 0:
+                self.counts["remembered"] += 1
+                return "remembered"
+
+        selector = uiselector_for(xpath, node)
+        if selector is not None:
+            try:
+                self.driver.find_element(AppiumBy.ANDROID_UIAUTOMATOR,
+                                         f"new UiScrollable(new UiSelector().scrollable(true))"
+                                         f".scrollIntoView({selector})")
+                self.offset = None
+                self._changed()
+                if self._locate(xpath)[1] == 0:
+                    self.counts["scroll_into_view"] += 1
+                    return "scroll into view"
+            except (NoSuchElementException, InvalidSelectorException):
+                self._changed()
+
+        self.counts["fallbacks"] += 1
+        return self._scroll_by_gestures(xpath)
+
+    def _scroll_by_gestures(self, xpath):
+        height = self._container()
+        height = max(1, height[3] - height[1])
+        direction = "down"
+        reversed_once = False
+        for _ in range(self.max_gestures):
+            node, distance = self._locate(xpath)
+            if distance == 0:
+                self._remember(xpath)
+                return "gestures"
+            if node is not None:
+                # Có trong cây nhưng ngoài vùng nhìn thấy: cuộn đúng khoảng cách
+                can_scroll = self._gesture("down" if distance > 0 else "up", min(1.0, abs(distance) / height))
+                if not can_scroll and self._locate(xpath)[1] != 0:
+                    break
+                continue
+            if not self._gesture(direction, self.step):
+                if reversed_once:
+                    break
+                direction = "up" if direction == "down" else "down"
+                reversed_once = True
+        if self._locate(xpath)[1] == 0:
+            self._remember(xpath)
+            return "gestures"
+        raise NoSuchElementException(f"Could not scroll to element {xpath}")
+
+    def scroll_to_top(self):
+        """Về đầu trang; không gửi lệnh nào nếu đã biết đang ở đầu trang"""
+        if self.offset == 0:
+            return
+        self.offset = self.offset if self.offset is not None else 0.0  # để _gesture đặt về 0 khi chạm đầu trang
+        for _ in range(self.max_gestures):
+            if not self._gesture("up", 1.0):
+                return
+        self.offset = None
+
+    def print_stats(self):
+        counts = self.counts
+        log.info("📜 Scroll: %s already in view, %s remembered, %s scrollIntoView, %s fallback(s), %s gesture(s)",
+                 counts["in_view"], counts["remembered"], counts["scroll_into_view"], counts["fallbacks"],
+                 counts["gestures"])
@@ -0,0 +1,111 @@
+"""Kiểm tra scroller trên một trang cuộn giả lập (không cần Appium).
+
+    python -m unittest scroller_test
+"""
+import re
+import unittest
+from selenium.common.exceptions import NoSuchElementException
+from scroller import Scroller, uiselector_for
+
+TOP, BOTTOM, ROW = 200, 1000, 150
+# Như Flutter: chỉ phần tử cách vùng nhìn thấy không quá CACHE_EXTENT mới có trong cây
+CACHE_EXTENT = 250
+FIELDS = [f"Field {i}" if i % 2 == 0 else "" for i in range(20)]
+ORDER = "//android.widget.Button[@content-desc='Đặt Hàng']"
+
+
+def field(i):
+    return f"//android.widget.ScrollView/android.widget.EditText[@index='{i}']"
+
+
+class ScrollingDriver:
+    """Một ScrollView dài: 20 EditText rồi nút Đặt Hàng, cuộn bằng mobile: scrollGesture/UiScrollable"""
+
+    def __init__(self):
+        self.scroll = 0
+        self.commands = []
+        self.rows = [("android.widget.EditText", f'index="{i}" text="{text}" content-desc=""')
+                     for i, text in enumerate(FIELDS)]
+        self.rows.append(("android.widget.Button", 'index="20" text="" content-desc="Đặt Hàng"'))
+        self.max_scroll = len(self.rows) * ROW - (BOTTOM - TOP)
+
+    @property
+    def page_source(self):
+        self.commands.append("getPageSource")
+        nodes = []
+        for i, (class_name, attributes) in enumerate(self.rows):
+            top = TOP + i * ROW - self.scroll
+            if top + ROW < TOP - CACHE_EXTENT or top > BOTTOM + CACHE_EXTENT:
+                continue
+            nodes.append(f'<{class_name} class="{class_name}" {attributes} displayed="true" '
+                         f'bounds="[0,{top}][1000,{top + ROW}]" />')
+        return (f'<hierarchy width="1000" height="1200"><android.widget.ScrollView class="android.widget.ScrollView" '
+                f'scrollable="true" bounds="[0,{TOP}][1000,{BOTTOM}]">{"".join(nodes)}</android.widget.ScrollView>'
+                f'</hierarchy>')
+
+    def execute_script(self, script, args):
+        self.commands.append(script)
+        distance = int(args["percent"] * args["height"])
+        before = self.scroll
+        self.scroll = min(self.max_scroll, max(0, self.scroll + (distance if args["direction"] == "down" else -distance)))
+        return self.scroll != before and 0 < self.scroll < self.max_scroll
+
+    def find_element(self, by, value):
+        self.commands.append("scrollIntoView")
+        wanted = re.search(r'scrollIntoView\(.*\.(description|text)\("([^"]*)"\)\)$', value)
+        for i, (_, attributes) in enumerate(self.rows):
+            if wanted and f'{"content-desc" if wanted.group(1) == "description" else "text"}="{wanted.group(2)}"' in attributes:
+                self.scroll = min(self.max_scroll, max(0, i * ROW - (BOTTOM - TOP) + ROW))
+                return object()
+        raise NoSuchElementException(value)
+
+
+class TestScroller(unittest.TestCase):
+    def setUp(self):
+        self.driver = ScrollingDriver()
+        self.scroller = Scroller(self.driver)
+        self.scroller.opened("checkout")
+
+    def gestures(self):
+        return self.driver.commands.count("mobile: scrollGesture")
+
+    def test_visible_field_is_not_scrolled(self):
+        self.assertEqual(self.scroller.scroll_into_view(field(1)), "in view")
+        self.assertEqual(self.driver.commands, ["getPageSource"])
+
+    def test_scroll_into_view_in_one_command(self):
+        self.assertEqual(self.scroller.scroll_into_view(ORDER), "scroll into view")
+        self.assertEqual(self.driver.commands.count("scrollIntoView"), 1)
+        self.assertEqual(self.gestures(), 0)
+        self.assertIsNone(self.scroller.offset)
+
+    def test_nearby_field_scrolls_exact_distance(self):
+        # Có trong cây nhưng ngoài vùng nhìn thấy, không có text: một gesture tính từ bounds
+        self.assertEqual(self.scroller.scroll_into_view(field(5)), "gestures")
+        self.assertEqual(self.gestures(), 1)
+
+    def test_position_is_remembered(self):
+        self.assertEqual(self.scroller.scroll_into_view(field(15)), "gestures")
+        self.scroller.scroll_to_top()
+        self.assertEqual(self.driver.scroll, 0)
+        before = self.gestures()
+        self.assertEqual(self.scroller.scroll_into_view(field(15)), "remembered")
+        self.assertEqual(self.gestures() - before, 1)
+
+    def test_scroll_to_top_is_free_when_already_there(self):
+        self.scroller.scroll_to_top()
+        self.assertEqual(self.driver.commands, [])
+
+    def test_missing_element(self):
+        with self.assertRaises(NoSuchElementException):
+            self.scroller.scroll_into_view("//android.widget.Button[@content-desc='Không có']")
+
+    def test_uiselector_for(self):
+        self.assertEqual(uiselector_for(ORDER),
+                         'new UiSelector().className("android.widget.Button").description("Đặt Hàng")')
+        self.assertEqual(uiselector_for("//*[contains(@text, 'New')]"), 'new UiSelector().textContains("New")')
+        self.assertIsNone(uiselector_for("//android.widget.ScrollView/android.widget.EditText[4]"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,277 @@
+"""Ghi span cho từng bước của test: lệnh Appium, chờ WebDriverWait, sleep, test case.
+
+Mỗi lệnh gửi tới Appium (find, click, send_keys, page_source...) đi qua
+driver.execute, nên chỉ cần bọc hàm này là thấy được mọi lệnh, kể cả lệnh
+của WebElement. WebDriverWait.until được bọc để đếm số lần thử điều kiện
+(chỉ trong lúc trace: stop_tracing trả lại hàm gốc).
+Kết thúc run, span được ghi ra file Chrome trace (mở bằng chrome://tracing
+hoặc https://ui.perfetto.dev) và vào bảng spans của lịch sử SQLite.
+
+Tắt bằng TRACE_STEPS=0.
+"""
+import json
+import os
+import threading
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from harness_log import get_logger
+
+log = get_logger("tracing")
+
+TRACE_ENABLED = os.environ.get("TRACE_STEPS", "1") != "0"
+output_dir = "output"
+TRACE_DIR = os.path.join(output_dir, "traces")
+
+# Tracer đang chạy (mỗi tiến trình chạy một suite tại một thời điểm)
+_active = None
+
+
+def active_tracer():
+    return _active
+
+
+def _locator_of(params):
+    if params and "using" in params and "value" in params:
+        return f"{params['using']}={params['value']}"
+    return None
+
+
+def _condition_locator(condition):
+    """Lấy locator từ closure của expected_conditions (ví dụ presence_of_element_located)"""
+    for cell in getattr(condition, "__closure__", None) or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            continue
+        if isinstance(value, tuple) and len(value) == 2 and all(isinstance(v, str) for v in value):
+            return f"{value[0]}={value[1]}"
+    return None
+
+
+class Span:
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+        self.duration = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.tracer._stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        stack = self.tracer._stack()
+        stack.pop()
+        if "result" not in self.args:
+            self.args["result"] = "ok" if exc_type is None else exc_type.__name__
+        if self.category == "case":
+            self.tracer.case = None
+        self.tracer._finish(self, stack)
+        return False
+
+
+class Tracer:
+    """Thu thập span của một run và xuất ra Chrome trace / SQLite"""
+
+    def __init__(self, suite, run_id, enabled=TRACE_ENABLED):
+        self.suite = suite
+        self.run_id = run_id
+        self.enabled = enabled
+        self.case = None
+        self.spans = []
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Tổng thời gian theo loại, để biết chậm do app (chờ), Appium (lệnh) hay sleep của harness
+        self.totals = {"command": 0.0, "wait": 0.0, "wait_commands": 0.0, "sleep": 0.0}
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def span(self, name, category, **args):
+        if self.case is not None:
+            args.setdefault("case", self.case)
+        return Span(self, name, category, args)
+
+    def case_span(self, test_id):
+        """Span cho cả một test case; các span bên trong được gắn test id này"""
+        self.case = test_id
+        return Span(self, test_id, "case", {"case": test_id})
+
+    def begin_case(self, test_id):
+        """Như case_span nhưng mở/đóng bằng hai lời gọi, cho vòng lặp không tiện dùng with"""
+        self.end_case()
+        self._open_case = self.case_span(test_id).__enter__()
+
+    def end_case(self):
+        span, self._open_case = getattr(self, "_open_case", None), None
+        if span is not None:
+            span.__exit__(None, None, None)
+
+    def _finish(self, span, parents):
+        in_wait = any(parent.category == "wait" for parent in parents)
+        with self._lock:
+            self.spans.append({
+                "name": span.name,
+                "category": span.category,
+                "start": span.start - self.origin,
+                "duration": span.duration,
+                "tid": threading.get_ident(),
+                "args": span.args,
+            })
+            if span.category == "command":
+                self.totals["wait_commands" if in_wait else "command"] += span.duration
+            elif span.category == "wait" and not in_wait:
+                self.totals["wait"] += span.duration
+            elif span.category == "sleep":
+                self.totals["sleep"] += span.duration
+
+    def recent(self, limit=20, category="command"):
+        """`limit` span gần nhất thuộc một loại, cũ nhất trước"""
+        with self._lock:
+            spans = [span for span in self.spans if span["category"] == category]
+        return spans[-limit:] if limit > 0 else []
+
+    def instrument(self, driver):
+        """Bọc driver.execute để mỗi lệnh Appium là một span (gọi lại nhiều lần cũng không sao)"""
+        if not self.enabled or getattr(driver, "_traced_execute", None) is not None:
+            return driver
+        execute = driver.execute
+
+        def traced_execute(driver_command, params=None):
+            tracer = _active
+            if tracer is None or not tracer.enabled:
+                return execute(driver_command, params)
+            args = {}
+            locator = _locator_of(params)
+            if locator:
+                args["locator"] = locator
+            with tracer.span(driver_command, "command", **args) as span:
+                response = execute(driver_command, params)
+                value = response.get("value") if isinstance(response, dict) else None
+                if isinstance(value, list) and driver_command == "findElements":
+                    span.args["result"] = f"{len(value)} element(s)"
+                return response
+
+        driver._traced_execute = execute
+        driver.execute = traced_execute
+        return driver
+
+    def sleep(self, seconds, reason=""):
+        """time.sleep có ghi span, để thấy thời gian harness tự chờ"""
+        with self.span(reason or "sleep", "sleep", seconds=seconds):
+            time.sleep(seconds)
+
+    def summary(self):
+        commands = [s for s in self.spans if s["category"] == "command"]
+        return {
+            "commands": len(commands),
+            "command_time": self.totals["command"],
+            "wait_time": self.totals["wait"],
+            "wait_command_time": self.totals["wait_commands"],
+            "idle_wait_time": max(0.0, self.totals["wait"] - self.totals["wait_commands"]),
+            "sleep_time": self.totals["sleep"],
+        }
+
+    def chrome_trace(self):
+        """Sự kiện dạng "X" (complete) của Chrome trace-event format, thời gian tính bằng µs"""
+        events = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": f"{self.suite} {self.run_id}"}}]
+        for span in self.spans:
+            events.append({
+                "name": span["name"],
+                "cat": span["category"],
+                "ph": "X",
+                "ts": round(span["start"] * 1e6, 1),
+                "dur": round(span["duration"] * 1e6, 1),
+                "pid": os.getpid(),
+                "tid": span["tid"],
+                "args": span["args"],
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"suite": self.suite, "run": self.run_id}}
+
+    def save(self, history=None, directory=TRACE_DIR):
+        """Ghi file trace của run và lưu span vào lịch sử (nếu có)"""
+        if not self.enabled or not self.spans:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.suite}-{self.run_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        if history is not None:
+            history.record_spans(self.run_id, self.suite, self.spans)
+        return path
+
+    def print_summary(self, path=None):
+        if not self.enabled:
+            return
+        s = self.summary()
+        log.info("🧭 Trace: %s command(s) %.1fs outside waits, waits %.1fs (%.1fs commands, %.1fs idle), "
+                 "sleeps %.1fs%s", s["commands"], s["command_time"], s["wait_time"], s["wait_command_time"],
+                 s["idle_wait_time"], s["sleep_time"], f" -> {path}" if path else "")
+
+
+def start_tracing(suite, run_id, enabled=TRACE_ENABLED):
+    """Tạo tracer cho run hiện tại và bật theo dõi WebDriverWait"""
+    global _active
+    _active = Tracer(suite, run_id, enabled)
+    if enabled:
+        _install_wait_tracing()
+    return _active
+
+
+def stop_tracing():
+    global _active
+    tracer, _active = _active, None
+    _uninstall_wait_tracing()
+    return tracer
+
+
+def traced_sleep(seconds, reason=""):
+    """Dùng thay time.sleep trong harness: có span nếu đang trace"""
+    tracer = _active
+    if tracer is None or not tracer.enabled:
+        time.sleep(seconds)
+    else:
+        tracer.sleep(seconds, reason)
+
+
+def _install_wait_tracing():
+    if getattr(WebDriverWait.until, "_original", None) is not None:
+        return
+    until = WebDriverWait.until
+
+    def traced_until(self, method, message=""):
+        tracer = _active
+        if tracer is None or not tracer.enabled:
+            return until(self, method, message)
+        attempts = [0]
+
+        def counted(driver):
+            attempts[0] += 1
+            return method(driver)
+
+        args = {"timeout": self._timeout}
+        locator = _condition_locator(method)
+        if locator:
+            args["locator"] = locator
+        name = getattr(method, "__qualname__", type(method).__name__).split(".<locals>")[0]
+        with tracer.span(name, "wait", **args) as span:
+            try:
+                return until(self, counted, message)
+            finally:
+                span.args["retries"] = max(0, attempts[0] - 1)
+
+    traced_until._original = until
+    WebDriverWait.until = traced_until
+
+
+def _uninstall_wait_tracing():
+    original = getattr(WebDriverWait.until, "_original", None)
+    if original is not None:
+        WebDriverWait.until = original
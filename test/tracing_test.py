@@ -0,0 +1,95 @@
+"""Kiểm tra tracing trên fake_appium: span của lệnh và lần chờ, gắn test case, Chrome trace, SQLite.
+
+    python -m unittest tracing_test
+"""
+import json
+import os
+import tempfile
+import unittest
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from fake_session import FakeAppiumTestCase
+from run_history import RunHistory
+from tracing import start_tracing, stop_tracing
+
+EDIT_TEXT = "//android.widget.EditText"
+MISSING = "//*[@content-desc='Không có']"
+
+
+class TestTracer(FakeAppiumTestCase):
+    def setUp(self):
+        super().setUp()
+        self.until = WebDriverWait.until
+        self.tracer = start_tracing("login", "run-1", enabled=True)
+        self.addCleanup(stop_tracing)
+        self.tracer.instrument(self.driver)
+
+    def spans(self, category):
+        return [span for span in self.tracer.spans if span["category"] == category]
+
+    def test_command_spans_carry_locator_and_result(self):
+        self.driver.find_elements(AppiumBy.XPATH, EDIT_TEXT)
+        with self.assertRaises(NoSuchElementException):
+            self.driver.find_element(AppiumBy.XPATH, MISSING)
+        found, missing = self.spans("command")
+        self.assertEqual((found["name"], found["args"]), ("findElements", {"locator": f"xpath={EDIT_TEXT}",
+                                                                            "result": "2 element(s)"}))
+        self.assertEqual((missing["name"], missing["args"]["result"]), ("findElement", "NoSuchElementException"))
+        self.assertEqual(self.tracer.summary()["commands"], 2)
+
+    def test_retries_inside_a_wait_are_one_span(self):
+        with self.assertRaises(TimeoutException):
+            WebDriverWait(self.driver, 0.3, poll_frequency=0.05).until(
+                EC.presence_of_element_located((AppiumBy.XPATH, MISSING)))
+        [wait] = self.spans("wait")
+        self.assertEqual((wait["name"], wait["args"]["locator"]), ("presence_of_element_located", f"xpath={MISSING}"))
+        self.assertEqual(wait["args"]["result"], "TimeoutException")
+        self.assertEqual(wait["args"]["retries"], len(self.spans("command")) - 1)
+        self.assertGreater(wait["args"]["retries"], 0)
+        summary = self.tracer.summary()
+        # Lệnh bên trong lần chờ chỉ được tính vào thời gian chờ
+        self.assertEqual(summary["command_time"], 0.0)
+        self.assertGreater(summary["wait_command_time"], 0.0)
+
+    def test_spans_are_tagged_with_the_case(self):
+        with self.tracer.case_span("TC01"):
+            self.driver.page_source
+        self.tracer.begin_case("TC02")
+        self.driver.page_source
+        self.tracer.end_case()
+        self.driver.page_source
+        commands = self.spans("command")
+        self.assertEqual([span["args"].get("case") for span in commands], ["TC01", "TC02", None])
+        self.assertEqual([span["name"] for span in self.spans("case")], ["TC01", "TC02"])
+
+    def test_chrome_trace_and_history(self):
+        with self.tracer.case_span("TC01"):
+            self.driver.find_elements(AppiumBy.XPATH, EDIT_TEXT)
+        trace = json.loads(json.dumps(self.tracer.chrome_trace()))
+        metadata, command, case = trace["traceEvents"]
+        self.assertEqual((metadata["ph"], metadata["args"]["name"]), ("M", "login run-1"))
+        self.assertEqual((command["ph"], command["cat"], case["cat"]), ("X", "command", "case"))
+        self.assertGreaterEqual(command["ts"], case["ts"])
+        self.assertLessEqual(command["dur"], case["dur"])
+        self.assertEqual(trace["otherData"], {"suite": "login", "run": "run-1"})
+
+        with tempfile.TemporaryDirectory() as directory:
+            history = RunHistory(os.path.join(directory, "history.sqlite"))
+            path = self.tracer.save(history, directory)
+            self.assertEqual(os.path.basename(path), "login-run-1.json")
+            [step] = history.slowest_steps("login", "run-1")
+            self.assertEqual((step["name"], step["locator"], step["calls"]), ("findElements", f"xpath={EDIT_TEXT}", 1))
+            history.close()
+
+    def test_wait_patch_is_removed_when_tracing_stops(self):
+        self.assertIsNot(WebDriverWait.until, self.until)
+        stop_tracing()
+        self.assertIs(WebDriverWait.until, self.until)
+        self.driver.page_source
+        self.assertEqual(self.spans("command"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,366 @@
+"""Bản Python của các luật validate form login/register, chạy không cần thiết bị.
+
+Các luật trong LOGIN_EMAIL_RULES, LOGIN_PASSWORD_RULES, REGISTER_REQUIRED_RULES
+và REGISTER_RULES chép đúng thứ tự, thông báo, giới hạn độ dài và RegExp của
+lib/screens/login_screen.dart (_validateEmail / _validatePassword) và
+register_screen.dart (_register). Như trong Dart: input được trim(), độ dài
+tính theo UTF-16 và RegExp theo cú pháp JavaScript.
+
+    python validation_oracle.py parity              # luật Dart đã đổi mà oracle chưa đổi theo?
+    python validation_oracle.py check               # TEST_DATA của login/register có khớp với app?
+    python validation_oracle.py sample --form login --count 5000 --output output/login_sample.json
+
+sample sinh nhiều input, gom theo thông báo lỗi app sẽ hiện, giữ input ngắn
+nhất mỗi nhóm rồi chọn ít nhóm nhất phủ đủ mọi thông báo: danh sách nhỏ đó
+là các case đáng xác nhận trên thiết bị (--all-outcomes giữ mọi tổ hợp).
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import namedtuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(HERE)
+LOGIN_SCREEN = os.path.join(REPO_ROOT, "lib", "screens", "login_screen.dart")
+REGISTER_SCREEN = os.path.join(REPO_ROOT, "lib", "screens", "register_screen.dart")
+
+# Ký tự khoảng trắng của String.trim() trong Dart và của \s trong RegExp (JavaScript)
+DART_TRIM = "\t\n\x0b\x0c\r \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a" \
+            "\u2028\u2029\u202f\u205f\u3000\ufeff"
+JS_WHITESPACE = r"\t\n\x0b\x0c\r \xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+JS_LINE_TERMINATORS = r"\n\r\u2028\u2029"
+
+# Một luật: thông báo hiện khi bất kỳ điều kiện nào đúng. Điều kiện là (kiểu, tham số):
+# empty, longer/shorter (độ dài), contains/lacks (RegExp), differs (khác trường khác)
+Rule = namedtuple("Rule", "field message conditions")
+
+LOGIN_EMAIL_RULES = [
+    Rule("email", "Email cannot be empty!", [("empty", None)]),
+    Rule("email", "Email is too long!", [("longer", 50)]),
+    Rule("email", "Email cannot contain whitespace!", [("contains", r"\s")]),
+    Rule("email", "Invalid email format!", [("lacks", r"^[\w-\.]+@([\w-]+\.)+[\w-]{2,4}$")]),
+    Rule("email", "Email cannot start with a number!", [("contains", r"^[0-9]")]),
+    Rule("email", "Email must be at least 5 characters long!", [("shorter", 5)]),
+]
+LOGIN_PASSWORD_RULES = [
+    Rule("password", "Password cannot be empty!", [("empty", None)]),
+    Rule("password", "Password must be at least 8 characters long!", [("shorter", 8)]),
+    Rule("password", "Password is too long!", [("longer", 128)]),
+    Rule("password", "Password cannot contain whitespace!", [("contains", r"\s")]),
+    Rule("password", "Password must contain at least one uppercase letter!", [("lacks", r"[A-Z]")]),
+    Rule("password", "Password must contain at least one number!", [("lacks", r"[0-9]")]),
+    Rule("password", "Password must contain at least one special character!",
+         [("lacks", r'[!@#$%^&*(),.?":{}|<>]')]),
+]
+# _register báo cùng lúc mọi trường trống, sau đó dừng ở luật đầu tiên không qua
+REGISTER_REQUIRED_RULES = [
+    Rule("email", "Email không được để trống!", [("empty", None)]),
+    Rule("password", "Mật khẩu không được để trống!", [("empty", None)]),
+    Rule("confirm_password", "Nhập lại mật khẩu không được để trống!", [("empty", None)]),
+]
+REGISTER_RULES = [
+    Rule("email", "Email không hợp lệ!", [("lacks", r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")]),
+    Rule("password", "Mật khẩu ít nhất 6 ký tự, chứa 1 số và 1 chữ in hoa!",
+         [("shorter", 8), ("lacks", r"^(?=.*[A-Z])(?=.*\d).+$")]),
+    Rule("confirm_password", "Mật khẩu không khớp!", [("differs", "password")]),
+]
+FORMS = {"login": ("email", "password"), "register": ("email", "password", "confirm_password")}
+
+
+def dart_trim(text):
+    return text.strip(DART_TRIM)
+
+
+def dart_length(text):
+    """String.length của Dart: số đơn vị UTF-16, emoji tính là 2"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def js_regex(source):
+    """Dịch RegExp JavaScript (cú pháp Dart dùng) sang re của Python, giữ nguyên nghĩa"""
+    out, in_class, after_class_escape, i = [], False, False, 0
+    while i < len(source):
+        c = source[i]
+        if c == "\\":
+            c = source[i + 1]
+            i += 2
+            if c == "s":
+                out.append(JS_WHITESPACE if in_class else f"[{JS_WHITESPACE}]")
+            elif c == "S" and not in_class:
+                out.append(f"[^{JS_WHITESPACE}]")
+            else:
+                out.append("\\" + c)
+            after_class_escape = c in "wWdDsS"
+            continue
+        if in_class and c == "-" and after_class_escape and source[i + 1:i + 2] != "]":
+            # [\w-\.]: JavaScript coi "-" sau \w là ký tự thường, Python báo lỗi khoảng không hợp lệ
+            out.append("\\-")
+        elif c == "[" and not in_class:
+            in_class = True
+            out.append(c)
+        elif c == "]" and in_class:
+            in_class = False
+            out.append(c)
+        elif c == "." and not in_class:
+            out.append(f"[^{JS_LINE_TERMINATORS}]")
+        elif c == "$" and not in_class:
+            out.append(r"\Z")  # $ của JavaScript không khớp trước "\n" cuối chuỗi
+        else:
+            out.append(c)
+        after_class_escape = False
+        i += 1
+    # \w và \d của JavaScript chỉ gồm ký tự ASCII
+    return re.compile("".join(out), re.ASCII)
+
+
+_patterns = {}
+
+
+def _pattern(source):
+    if source not in _patterns:
+        _patterns[source] = js_regex(source)
+    return _patterns[source]
+
+
+def _fails(condition, value, values):
+    kind, arg = condition
+    if kind == "empty":
+        return value == ""
+    if kind == "longer":
+        return dart_length(value) > arg
+    if kind == "shorter":
+        return dart_length(value) < arg
+    if kind == "contains":
+        return _pattern(arg).search(value) is not None
+    if kind == "lacks":
+        return _pattern(arg).search(value) is None
+    if kind == "differs":
+        return value != values[arg]
+    raise ValueError(f"Unknown condition {kind}")
+
+
+def _broken(rule, values):
+    return any(_fails(condition, values[rule.field], values) for condition in rule.conditions)
+
+
+def first_error(rules, values):
+    """Thông báo của luật đầu tiên không qua, None nếu qua hết"""
+    for rule in rules:
+        if _broken(rule, values):
+            return rule.message
+    return None
+
+
+def login_errors(email, password):
+    """Các thông báo LoginScreen._login hiện trước khi gọi API (mỗi trường tối đa một)"""
+    values = {"email": dart_trim(email), "password": dart_trim(password)}
+    errors = [first_error(LOGIN_EMAIL_RULES, values), first_error(LOGIN_PASSWORD_RULES, values)]
+    return [error for error in errors if error is not None]
+
+
+def register_errors(email, password, confirm_password):
+    """Các thông báo RegisterScreen._register hiện trước khi gọi API"""
+    values = {"email": dart_trim(email), "password": dart_trim(password),
+              "confirm_password": dart_trim(confirm_password)}
+    errors = [rule.message for rule in REGISTER_REQUIRED_RULES if _broken(rule, values)]
+    if errors:
+        return errors
+    error = first_error(REGISTER_RULES, values)
+    return [error] if error is not None else []
+
+
+def form_errors(form, data):
+    return (login_errors if form == "login" else register_errors)(*(data.get(field, "") for field in FORMS[form]))
+
+
+# --- So khớp với mã Dart ---
+
+def _dart_body(source, signature):
+    """Thân hàm Dart bắt đầu bằng `signature`, tính theo ngoặc nhọn"""
+    start = source.index("{", source.index(signature))
+    depth = 0
+    for end in range(start, len(source)):
+        depth += {"{": 1, "}": -1}.get(source[end], 0)
+        if depth == 0:
+            return source[start:end + 1]
+    raise ValueError(f"Unbalanced body for {signature}")
+
+
+def dart_rules(body):
+    """Thông báo, RegExp và giới hạn độ dài xuất hiện trong một đoạn Dart, theo thứ tự"""
+    return {
+        "messages": re.findall(r'"([^"\n]*!)"', body),
+        "patterns": re.findall(r"RegExp\(\s*r'([^']*)'", body),
+        "limits": [(op, int(n)) for op, n in re.findall(r"\.length\s*([<>])\s*(\d+)", body)],
+    }
+
+
+def oracle_rules(rules):
+    """Cùng dạng với dart_rules, lấy từ các luật của oracle"""
+    limits = {"longer": ">", "shorter": "<"}
+    conditions = [condition for rule in rules for condition in rule.conditions]
+    return {
+        "messages": [rule.message for rule in rules],
+        "patterns": [arg for kind, arg in conditions if kind in ("contains", "lacks")],
+        "limits": [(limits[kind], arg) for kind, arg in conditions if kind in limits],
+    }
+
+
+def parity_problems(login_source=None, register_source=None):
+    """Các chỗ luật Dart và oracle khác nhau; rỗng nghĩa là khớp"""
+    if login_source is None:
+        with open(LOGIN_SCREEN, encoding="utf-8") as f:
+            login_source = f.read()
+    if register_source is None:
+        with open(REGISTER_SCREEN, encoding="utf-8") as f:
+            register_source = f.read()
+    register_body = _dart_body(register_source, "Future<void> _register()")
+    # Chỉ phần validate, trước khi gọi API (phần sau là thông báo của server)
+    register_body = register_body[:register_body.index("_isLoading = true")]
+    pairs = [
+        ("login_screen.dart _validateEmail", _dart_body(login_source, "String? _validateEmail("), LOGIN_EMAIL_RULES),
+        ("login_screen.dart _validatePassword", _dart_body(login_source, "String? _validatePassword("),
+         LOGIN_PASSWORD_RULES),
+        ("register_screen.dart _register", register_body, REGISTER_REQUIRED_RULES + REGISTER_RULES),
+    ]
+    problems = []
+    for name, body, rules in pairs:
+        dart, oracle = dart_rules(body), oracle_rules(rules)
+        for key in ("messages", "patterns", "limits"):
+            if dart[key] != oracle[key]:
+                problems.append(f"{name}: {key} in Dart {dart[key]} != oracle {oracle[key]}")
+    return problems
+
+
+# --- Kiểm tra TEST_DATA và sinh input ---
+
+def check_test_data(form, test_data):
+    """Case nào kỳ vọng một lỗi validate mà app sẽ không hiện: {test_id: (kỳ vọng, thông báo app)}
+
+    Case có input qua hết luật validate thì phụ thuộc server, không kiểm ở đây.
+    """
+    mismatches = {}
+    for test_id, data in test_data.items():
+        errors = form_errors(form, data)
+        expected = data["expected"]
+        if errors and not (expected.startswith("error:") and expected[len("error:"):] in errors):
+            mismatches[test_id] = (expected, errors)
+    return mismatches
+
+
+# Mảnh ghép để sinh input: biên độ dài, khoảng trắng, ký tự đặc biệt, Unicode
+EMAIL_LOCALS = ["user", "u", "ab", "1user", "first.last", "first-last", "first_last", "a+b", "us er", "ü", "x" * 40,
+                "", " user", "user\t", "😀"]
+EMAIL_DOMAINS = ["example.com", "example", "example.c", "example.comm", "mail.example.co", "ex-ample.com",
+                 "example..com", "exam ple.com", "example.com ", "exa_mple.com", "x" * 40 + ".com", ""]
+PASSWORD_PARTS = ["pass", "Pass", "PASS", "123", "1", "@", "!", "_", " ", " ", "word", "W", "😀", "é"]
+
+
+def generate_inputs(form, count, seed=0):
+    """Sinh `count` input ngẫu nhiên (có seed) cho form login hoặc register"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        local, domain = rng.choice(EMAIL_LOCALS), rng.choice(EMAIL_DOMAINS)
+        email = rng.choice([f"{local}@{domain}", f"{local}{domain}", f"{local}@@{domain}", local])
+        password = "".join(rng.choice(PASSWORD_PARTS) for _ in range(rng.choice([0, 1, 2, 3, 4, 6, 40])))
+        data = {"email": email, "password": password}
+        if form == "register":
+            data["confirm_password"] = rng.choice([password, password, "", password + "x", password.upper()])
+        yield data
+
+
+def representatives(form, inputs):
+    """Gom input theo thông báo app sẽ hiện, giữ input ngắn nhất mỗi nhóm: {(thông báo, ...): (input, số input)}"""
+    groups = {}
+    for data in inputs:
+        key = tuple(form_errors(form, data))
+        size = sum(dart_length(value) for value in data.values())
+        best, seen = groups.get(key, (None, 0))
+        if best is None or size < sum(dart_length(value) for value in best.values()):
+            best = data
+        groups[key] = (best, seen + 1)
+    return groups
+
+
+def covering(groups):
+    """Ít nhóm nhất (tham lam) sao cho mỗi thông báo, và trường hợp qua validate, có ít nhất một input"""
+    remaining = {message for errors in groups for message in errors or ("",)}
+    chosen = {}
+    while remaining:
+        errors = max(groups, key=lambda key: (len(remaining.intersection(key or ("",))), groups[key][1]))
+        remaining.difference_update(errors or ("",))
+        chosen[errors] = groups[errors]
+    return chosen
+
+
+def sample_cases(form, groups, prefix=None):
+    """Các nhóm thành TEST_DATA (cùng dạng với login_test / register_test) để chạy xác nhận trên thiết bị"""
+    prefix = prefix or f"ORACLE_{form.upper()}"
+    cases = {}
+    for number, (errors, (data, seen)) in enumerate(sorted(groups.items(), key=lambda item: item[0]), 1):
+        case = {"description": f"Oracle sample: {', '.join(errors) or 'passes validation'} ({seen} input(s))"}
+        if form == "register":
+            case["username"] = "Test User"
+        case.update(data)
+        if errors:
+            case["expected"] = f"error:{errors[0]}"
+        else:
+            # Qua validate thì kết quả do server quyết định: tài khoản ngẫu nhiên không đăng nhập được
+            case["expected"] = "error:Invalid email or password" if form == "login" else "login_screen"
+        cases[f"{prefix}_{number:02d}"] = case
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline oracle for the login/register form validation")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("parity", help="Compare the oracle rules with the Dart validators")
+    sub.add_parser("check", help="Check the expectations in TEST_DATA of login_test and register_test")
+    sample = sub.add_parser("sample", help="Generate inputs and keep one per validation outcome")
+    sample.add_argument("--form", choices=sorted(FORMS), default="login")
+    sample.add_argument("--count", type=int, default=5000)
+    sample.add_argument("--seed", type=int, default=0)
+    sample.add_argument("--all-outcomes", action="store_true",
+                        help="Keep one case per combination of messages instead of a covering subset")
+    sample.add_argument("--output", help="Write the representative cases as TEST_DATA JSON")
+    args = parser.parse_args()
+
+    if args.command == "parity":
+        problems = parity_problems()
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            sys.exit(1)
+        print("✅ Oracle matches login_screen.dart and register_screen.dart")
+    elif args.command == "check":
+        mismatched = False
+        for form, module in (("login", "login_test"), ("register", "register_test")):
+            mismatches = check_test_data(form, importlib.import_module(module).TEST_DATA)
+            for test_id, (expected, errors) in mismatches.items():
+                mismatched = True
+                print(f"❌ {test_id}: expects {expected!r}, the app shows {' / '.join(errors)!r}")
+        if mismatched:
+            sys.exit(1)
+        print("✅ Every validation expectation in TEST_DATA matches the app rules")
+    else:
+        start = time.perf_counter()
+        groups = representatives(args.form, generate_inputs(args.form, args.count, args.seed))
+        elapsed = time.perf_counter() - start
+        chosen = groups if args.all_outcomes else covering(groups)
+        for errors, (data, seen) in sorted(chosen.items(), key=lambda item: -item[1][1]):
+            print(f"{seen:>6}  {' / '.join(errors) or 'passes validation'}  <- {json.dumps(data, ensure_ascii=False)}")
+        print(f"⚡ {args.count} input(s) checked in {elapsed * 1000:.0f}ms: {len(groups)} outcome(s), "
+              f"{len(chosen)} case(s) to confirm on a device")
+        if args.output:
+            os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(sample_cases(args.form, chosen), f, indent=2, ensure_ascii=False)
+            print(f"📝 Sample cases saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
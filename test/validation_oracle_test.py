@@ -0,0 +1,80 @@
+"""Kiểm tra validation_oracle và độ khớp của nó với mã Dart (không cần thiết bị).
+
+    python -m unittest validation_oracle_test
+"""
+import unittest
+from validation_oracle import (LOGIN_SCREEN, REGISTER_SCREEN, check_test_data, covering, dart_length, generate_inputs,
+                               js_regex, login_errors, parity_problems, register_errors, representatives,
+                               sample_cases)
+
+
+class TestParity(unittest.TestCase):
+    def test_oracle_matches_dart_validators(self):
+        self.assertEqual(parity_problems(), [])
+
+    def test_drift_in_dart_is_reported(self):
+        with open(LOGIN_SCREEN, encoding="utf-8") as f:
+            login = f.read()
+        with open(REGISTER_SCREEN, encoding="utf-8") as f:
+            register = f.read()
+        problems = parity_problems(login.replace("password.length < 8", "password.length < 10"),
+                                   register.replace('"Mật khẩu không khớp!"', '"Mật khẩu nhập lại không khớp!"'))
+        self.assertEqual(len(problems), 2)
+        self.assertIn("_validatePassword: limits", problems[0])
+        self.assertIn("_register: messages", problems[1])
+
+
+class TestRules(unittest.TestCase):
+    def test_login_reports_one_message_per_field(self):
+        self.assertEqual(login_errors("user@example.com", "Pass@123"), [])
+        self.assertEqual(login_errors("", "pass@123"),
+                         ["Email cannot be empty!", "Password must contain at least one uppercase letter!"])
+        self.assertEqual(login_errors("1user@example.com", "Pass123"),
+                         ["Email cannot start with a number!", "Password must be at least 8 characters long!"])
+        # Như _login: trim() trước khi validate
+        self.assertEqual(login_errors("  user@example.com　", " Pass@123 "), [])
+
+    def test_register_reports_empty_fields_together_then_stops_at_first_rule(self):
+        self.assertEqual(register_errors("", "", "Pass@123"),
+                         ["Email không được để trống!", "Mật khẩu không được để trống!"])
+        self.assertEqual(register_errors("test@example", "pass", "other"), ["Email không hợp lệ!"])
+        self.assertEqual(register_errors("test@example.com", "Pass1234", "Pass12345"), ["Mật khẩu không khớp!"])
+
+    def test_dart_semantics(self):
+        self.assertEqual(dart_length("Pass😀1"), 7)
+        self.assertEqual(login_errors("user@example.com", "Pass@1😀"), [])
+        # [\w-\.] của JavaScript: "-" là ký tự thường, \w chỉ gồm ASCII
+        email = js_regex(r"^[\w-\.]+@([\w-]+\.)+[\w-]{2,4}$")
+        self.assertTrue(email.search("first-last@mail.example.co"))
+        self.assertFalse(email.search("ü@example.com"))
+        self.assertFalse(email.search("user@example.com\n"))
+        self.assertTrue(js_regex(r"\s").search("Pass @123"))
+
+    def test_test_data_expectations(self):
+        mismatches = check_test_data("register", {
+            "TC_A": {"email": "", "password": "Pass@123", "confirm_password": "Pass@123",
+                     "expected": "error:Email không được để trống!"},
+            "TC_B": {"email": "test@example.com", "password": "pass123", "confirm_password": "pass123",
+                     "expected": "error:Mật khẩu ít nhất 8 ký tự, chứa 1 số và 1 chữ in hoa!"},
+            "TC_C": {"email": "test@example.com", "password": "Pass@123", "confirm_password": "Pass@123",
+                     "expected": "error:User already exists!"},
+        })
+        self.assertEqual(list(mismatches), ["TC_B"])
+
+
+class TestSampling(unittest.TestCase):
+    def test_covering_sample_shows_every_message(self):
+        groups = representatives("login", generate_inputs("login", 3000, seed=1))
+        self.assertEqual(groups, representatives("login", generate_inputs("login", 3000, seed=1)))
+        chosen = covering(groups)
+        self.assertLess(len(chosen), len(groups))
+        messages = {message for errors in groups for message in errors}
+        self.assertEqual({message for errors in chosen for message in errors}, messages)
+        self.assertIn((), chosen)
+        for case in sample_cases("login", chosen).values():
+            errors = login_errors(case["email"], case["password"])
+            self.assertEqual(case["expected"], f"error:{errors[0]}" if errors else "error:Invalid email or password")
+
+
+if __name__ == "__main__":
+    unittest.main()
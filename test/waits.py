@@ -0,0 +1,114 @@
+import hashlib
+import os
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from harness_log import get_logger
+
+log = get_logger("waits")
+
+# Thời gian poll và deadline mặc định cho mỗi bước, có thể chỉnh qua biến môi trường
+DEFAULT_POLL = float(os.environ.get("WAIT_POLL", "0.25"))
+DEFAULT_STEP_TIMEOUT = float(os.environ.get("WAIT_STEP_TIMEOUT", "10"))
+# Số lần poll liên tiếp page_source không đổi để coi là "idle"
+DEFAULT_STABLE_POLLS = int(os.environ.get("WAIT_STABLE_POLLS", "2"))
+
+IGNORED_EXCEPTIONS = (NoSuchElementException, StaleElementReferenceException)
+
+
+def wait_for(driver, condition, timeout=None, poll=None, message=""):
+    """Chờ đến khi condition(driver) trả về giá trị truthy, trả về giá trị đó"""
+    wait = WebDriverWait(
+        driver,
+        DEFAULT_STEP_TIMEOUT if timeout is None else timeout,
+        poll_frequency=DEFAULT_POLL if poll is None else poll,
+        ignored_exceptions=IGNORED_EXCEPTIONS,
+    )
+    return wait.until(condition, message)
+
+
+class hierarchy_idle:
+    """Condition: page_source không đổi trong stable_polls lần poll liên tiếp"""
+
+    def __init__(self, stable_polls=DEFAULT_STABLE_POLLS):
+        self.stable_polls = stable_polls
+        self.last_digest = None
+        self.stable_count = 0
+
+    def __call__(self, driver):
+        digest = hashlib.md5(driver.page_source.encode("utf-8")).hexdigest()
+        if digest == self.last_digest:
+            self.stable_count += 1
+        else:
+            self.last_digest = digest
+            self.stable_count = 0
+        return self.stable_count >= self.stable_polls
+
+
+def wait_for_idle(driver, timeout=None, poll=None, stable_polls=DEFAULT_STABLE_POLLS):
+    """Chờ UI hierarchy ngừng thay đổi (hết animation/chuyển màn hình)"""
+    return wait_for(driver, hierarchy_idle(stable_polls), timeout, poll,
+                    f"UI hierarchy did not go idle after {stable_polls} stable polls")
+
+
+def settle(driver, timeout=None, poll=None):
+    """wait_for_idle không bắt buộc: hết giờ thì đi tiếp vì bước sau tự chờ phần tử cụ thể của nó"""
+    try:
+        wait_for_idle(driver, timeout, poll)
+        return True
+    except TimeoutException as e:
+        # Animation lặp (spinner, banner) không bao giờ idle, không phải lỗi của test case
+        log.debug("⏳ %s, continuing", e.msg, extra={"step": "idle"})
+        return False
+
+
+def xpath_literal(text):
+    """Chuỗi XPath 1.0 cho text bất kỳ (không có escape: text có cả ' lẫn " phải ghép bằng concat)"""
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in text.split("'")) + ")"
+
+
+def text_locator(*texts):
+    """XPath tìm phần tử có text hoặc content-desc chứa một trong các đoạn text"""
+    # Flutter hiển thị nhãn qua content-desc, còn SnackBar/TextField dùng text
+    predicates = []
+    for text in texts:
+        literal = xpath_literal(text)
+        predicates.append(f"contains(@text, {literal}) or contains(@content-desc, {literal})")
+    return (AppiumBy.XPATH, f"//*[{' or '.join(predicates)}]")
+
+
+class text_visible:
+    """Condition: một phần tử hiển thị chứa một trong các đoạn text (một lệnh find_elements mỗi lần poll)"""
+
+    def __init__(self, *texts):
+        self.locator = text_locator(*texts)
+
+    def __call__(self, driver):
+        for element in driver.find_elements(*self.locator):
+            if element.is_displayed():
+                return element
+        return False
+
+
+def wait_for_text(driver, text, timeout=None, poll=None):
+    """Chờ một đoạn text xuất hiện trên màn hình, trả về phần tử tìm được"""
+    return wait_for(driver, text_visible(text), timeout, poll, f"Text '{text}' did not appear")
+
+
+def wait_for_any(driver, conditions, timeout=None, poll=None):
+    """Chờ một trong các condition thỏa, trả về (index, giá trị)"""
+    def _any(d):
+        for index, condition in enumerate(conditions):
+            try:
+                value = condition(d)
+            except IGNORED_EXCEPTIONS:
+                continue
+            if value:
+                return index, value
+        return False
+
+    return wait_for(driver, _any, timeout, poll, "None of the conditions were met")
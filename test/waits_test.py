@@ -0,0 +1,74 @@
+"""Kiểm tra waits trên fake_appium: wait_for, chờ idle, settle, tìm theo text, wait_for_any.
+
+    python -m unittest waits_test
+"""
+import itertools
+import unittest
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import TimeoutException
+from fake_session import FakeAppiumTestCase
+from waits import (hierarchy_idle, settle, text_locator, text_visible, wait_for, wait_for_any, wait_for_idle,
+                   wait_for_text, xpath_literal)
+
+EMAIL = "(//android.widget.EditText)[1]"
+LOGIN = "//android.widget.Button[@content-desc='Login']"
+
+
+class ChangingDriver:
+    """Driver giả có page_source đổi sau mỗi lần đọc, như màn hình có spinner"""
+
+    def __init__(self):
+        self.counter = itertools.count()
+
+    @property
+    def page_source(self):
+        return f"<frame index='{next(self.counter)}'/>"
+
+
+class TestWaits(FakeAppiumTestCase):
+    def test_wait_for_returns_the_condition_value(self):
+        values = iter([False, None, "ready"])
+        self.assertEqual(wait_for(self.driver, lambda d: next(values), timeout=1, poll=0.01), "ready")
+        with self.assertRaisesRegex(TimeoutException, "never"):
+            wait_for(self.driver, lambda d: False, timeout=0.1, poll=0.02, message="never")
+
+    def test_idle_needs_stable_polls(self):
+        condition = hierarchy_idle(stable_polls=2)
+        self.assertEqual([condition(self.driver) for _ in range(3)], [False, False, True])
+        self.assertTrue(wait_for_idle(self.driver, timeout=1, poll=0.01, stable_polls=1))
+        self.assertEqual(self.commands()["getPageSource"], 5)
+
+    def test_settle_is_best_effort(self):
+        self.assertTrue(settle(self.driver, timeout=1, poll=0.01))
+        # Màn hình không bao giờ idle: settle trả về False thay vì ném TimeoutException
+        self.assertFalse(settle(ChangingDriver(), timeout=0.1, poll=0.01))
+        with self.assertRaises(TimeoutException):
+            wait_for_idle(ChangingDriver(), timeout=0.1, poll=0.01)
+
+    def test_text_locator_quotes_any_text(self):
+        self.assertEqual(xpath_literal("Login"), "'Login'")
+        self.assertEqual(xpath_literal("Can't login"), '"Can\'t login"')
+        self.assertEqual(xpath_literal("""it's "new\""""), """concat('it', "'", 's "new"')""")
+        text = """O'Brien says "hi\""""
+        self.driver.find_element(AppiumBy.XPATH, EMAIL).send_keys(text)
+        [element] = self.driver.find_elements(*text_locator("Không có", text))
+        self.assertEqual(element.text, text)
+
+    def test_wait_for_text_matches_text_and_content_desc(self):
+        self.assertEqual(wait_for_text(self.driver, "Login", timeout=1).get_attribute("content-desc"), "Login")
+        self.driver.find_element(AppiumBy.XPATH, LOGIN).click()
+        self.assertTrue(wait_for_text(self.driver, "cannot be empty", timeout=1, poll=0.05).is_displayed())
+        with self.assertRaisesRegex(TimeoutException, "Text 'Không có' did not appear"):
+            wait_for_text(self.driver, "Không có", timeout=0.1, poll=0.05)
+
+    def test_wait_for_any_returns_the_matching_index(self):
+        index, element = wait_for_any(self.driver, [text_visible("Không có"), lambda d: d.find_element(
+            AppiumBy.XPATH, "//*[@content-desc='Không có']"), text_visible("Create an account")], timeout=1)
+        self.assertEqual(index, 2)
+        self.assertEqual(element.get_attribute("content-desc"), "Create an account")
+        with self.assertRaisesRegex(TimeoutException, "None of the conditions"):
+            wait_for_any(self.driver, [text_visible("Không có")], timeout=0.1, poll=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()